@@ -14,16 +14,24 @@ class Settings(BaseSettings):
     # Redis Configuration
     redis_url: str = "redis://localhost:6379"
     redis_prefix: str = "cui"
+    job_record_encoding: str = "json"  # "json" (v1) or "msgpack" (v2, needs the msgpack package)
 
     # ARQ (Job Queue) Configuration
     arq_queue_name: str = "default"
+    job_batch_max_size: int = 1000  # Jobs accepted by one POST /api/v1/jobs:batch
+    job_batch_chunk_size: int = 100  # Jobs created/enqueued per pipelined round trip
     arq_max_jobs: int = 1000
     arq_worker_concurrency: int = 5
 
     # Job Settings
     job_timeout: int = 1200  # 20 minutes max per job
+    abtest_follow_timeout: int = 1800  # Seconds an A/B test follows its variant jobs before leaving them to GET
     max_batch_size: int = 10  # Max images per batch
     max_megapixels: int = 4  # 2048x2048 ~ 4.2MP
+    progress_min_interval: float = 1.0  # seconds between sampler progress updates per job
+    worker_batching_enabled: bool = False  # Coalesce compatible jobs into one ComfyUI prompt
+    worker_batch_window: float = 0.05  # Seconds a worker waits for compatible jobs before submitting
+    worker_batch_max_jobs: int = 4  # Jobs per coalesced prompt (also bounded by arq_worker_concurrency)
 
     # Storage Configuration (MinIO/S3)
     minio_endpoint: str = "localhost:9000"
@@ -32,14 +40,38 @@ class Settings(BaseSettings):
     minio_bucket: str = "comfyui-artifacts"
     minio_secure: bool = False  # Use HTTPS
     artifact_url_ttl: int = 3600  # 1 hour for presigned URLs
+    artifact_url_resign_interval: int = 900  # Re-sign URLs this often (seconds); returned URLs stay valid >= ttl - interval
+    artifact_url_cache_size: int = 10000  # Signed URLs kept in the per-process LRU cache
+    artifact_part_size: int = 5 * 1024 * 1024  # Multipart chunk size (S3 minimum is 5 MiB)
+    artifact_transfer_concurrency: int = 4  # Parallel artifact transfers per job
+    storage_max_workers: int = 8  # Threads running blocking MinIO calls
+    storage_max_pool_connections: int = 16  # MinIO HTTP pool size (>= workers)
 
     # ComfyUI Configuration
     comfyui_url: str = "http://localhost:8188"
+    comfyui_urls: str = ""  # Comma-separated ComfyUI backends (overrides comfyui_url when set)
+    comfyui_backend_refresh_interval: float = 5.0  # seconds between per-backend health and /queue probes
+    comfyui_affinity_max_queue_gap: int = 2  # Extra queued prompts accepted to reach a backend with the checkpoint loaded
+    comfyui_health_failure_threshold: int = 3  # Consecutive failed probes before a backend's circuit opens
+    comfyui_health_probe_timeout: float = 2.0  # seconds per health probe request
     comfyui_timeout: float = 600.0
+    comfyui_max_connections: int = 100  # Shared HTTP pool size per process
+    comfyui_max_keepalive: int = 20  # Idle connections kept open for reuse
+    comfyui_keepalive_expiry: float = 30.0  # seconds before idle connections close
+    comfyui_http2: bool = True  # Use HTTP/2 when the h2 package is installed
+    comfyui_drain_timeout: float = 10.0  # seconds to wait for in-flight requests on shutdown
+    comfyui_ws_enabled: bool = True  # Track completion via ComfyUI /ws events instead of polling
+    comfyui_ws_recheck_interval: float = 30.0  # seconds between /history safety checks while on events
 
     # Feature Flags
     jobs_enabled: bool = True  # Enable async job queue
     websocket_enabled: bool = True  # Enable WebSocket progress updates
+    websocket_queue_size: int = 256  # Undelivered events per socket before it is dropped as too slow
+    job_event_stream_maxlen: int = 1000  # Events kept per job for replay (?since=), approximate cap
+    sse_enabled: bool = True  # Enable Server-Sent Events progress streams (/api/v1/jobs/{id}/events)
+    sse_keepalive_interval: int = 15  # Seconds between keepalive comments on idle SSE streams
+    sse_max_jobs: int = 50  # Job IDs accepted by one multi-job SSE stream
+    long_poll_max_wait: int = 60  # Upper bound for GET /api/v1/jobs/{id}?wait= in seconds
     auth_enabled: bool = False  # Enable API key authentication (disable for development)
     rate_limit_enabled: bool = False  # Enable rate limiting
 
@@ -51,6 +83,9 @@ class Settings(BaseSettings):
     # Authentication
     api_key_length: int = 32  # bytes (44 chars base64)
     api_key_ttl: int = 86400 * 365  # 1 year
+    api_key_cache_ttl: float = 60.0  # seconds a validated key is trusted in-process
+    api_key_cache_size: int = 10000  # Validated keys kept in the per-process LRU cache
+    api_key_last_used_flush_interval: float = 30.0  # seconds between batched last_used_at writes
 
     # Rate Limiting
     rate_limit_window: int = 60  # seconds (1 minute window)
@@ -69,17 +104,20 @@ ROLE_QUOTAS = {
     "free": {
         "quota_daily": 10,
         "quota_concurrent": 1,
-        "rate_limit_per_minute": 5
+        "rate_limit_per_minute": 5,
+        "rate_limit_burst": 10
     },
     "pro": {
         "quota_daily": 100,
         "quota_concurrent": 3,
-        "rate_limit_per_minute": 20
+        "rate_limit_per_minute": 20,
+        "rate_limit_burst": 40
     },
     "internal": {
         "quota_daily": -1,  # unlimited
         "quota_concurrent": 10,
-        "rate_limit_per_minute": -1  # unlimited
+        "rate_limit_per_minute": -1,  # unlimited
+        "rate_limit_burst": -1
     }
 }
 
@@ -15,13 +15,19 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
-from .routers import generate, health, jobs, websocket, metrics, admin, monitoring, abtest
+from .routers import generate, health, events, jobs, websocket, metrics, admin, monitoring, abtest
 from .middleware.request_id import RequestIDMiddleware
 from .middleware.limit_upload_size import LimitUploadSizeMiddleware
 from .middleware.version_headers import VersionHeadersMiddleware
 from .middleware.rate_limit import RateLimitMiddleware
 from .services.redis_client import redis_client
 from .services.job_queue import job_queue
+from .services.comfyui_backends import comfyui_backends
+from .services.async_storage import async_storage_client
+from .services.api_key_cache import api_key_cache
+from .services.job_events import job_event_hub
+from .services.abtest_runner import abtest_runner
+from .services.workflow_templates import workflow_registry
 from .config import settings
 
 # Configure logging
@@ -41,16 +47,42 @@ async def lifespan(app: FastAPI):
     Handles startup and shutdown events for:
     - Redis connection
     - ARQ job queue
-    - Storage client initialization
+    - ComfyUI connection pool
+    - Workflow template registry
+    - Storage client (artifact URL signing)
+    - API key cache (revocation listener, last_used_at flusher)
+    - Job event hub (shared pub/sub for WebSocket progress)
     """
     # Startup
     logger.info("Starting ComfyUI API Service...")
 
+    # Open shared ComfyUI connection pools (one per backend)
+    await comfyui_backends.connect()
+    logger.info("✓ ComfyUI connection pools ready")
+
+    # Load and validate workflow templates once
+    workflow_registry.load_all()
+
+    # Storage thread pool (signs artifact URLs on job reads)
+    try:
+        await async_storage_client.connect()
+        logger.info("✓ Storage client ready")
+    except Exception as e:
+        logger.error(f"✗ Failed to initialize storage client: {e}")
+        logger.warning("Artifact URLs will be unavailable")
+
     # Connect to Redis
     if settings.jobs_enabled:
         try:
             await redis_client.connect()
             logger.info("✓ Connected to Redis")
+
+            await api_key_cache.connect(redis_client._client)
+            logger.info("✓ API key cache ready")
+
+            # Feeds WebSockets, SSE streams and long-polling job reads
+            await job_event_hub.start()
+            logger.info("✓ Job event hub subscribed")
         except Exception as e:
             logger.error(f"✗ Failed to connect to Redis: {e}")
             logger.warning("Job queue features will be unavailable")
@@ -69,6 +101,8 @@ async def lifespan(app: FastAPI):
     logger.info(f"Metrics available at /metrics")
     if settings.websocket_enabled:
         logger.info(f"WebSocket available at /ws/jobs/{{job_id}}")
+    if settings.sse_enabled:
+        logger.info(f"Server-Sent Events available at /api/v1/jobs/{{job_id}}/events")
 
     yield
 
@@ -77,6 +111,22 @@ async def lifespan(app: FastAPI):
 
     # Disconnect from services
     if settings.jobs_enabled:
+        try:
+            await abtest_runner.stop()
+        except Exception as e:
+            logger.error(f"Error stopping A/B test runner: {e}")
+
+        try:
+            await job_event_hub.stop()
+        except Exception as e:
+            logger.error(f"Error stopping job event hub: {e}")
+
+        try:
+            await api_key_cache.disconnect()
+            logger.info("✓ API key cache flushed")
+        except Exception as e:
+            logger.error(f"Error flushing API key cache: {e}")
+
         try:
             await job_queue.disconnect()
             logger.info("✓ Disconnected from ARQ")
@@ -89,6 +139,18 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.error(f"Error disconnecting from Redis: {e}")
 
+    try:
+        await comfyui_backends.disconnect()
+        logger.info("✓ ComfyUI connection pool drained")
+    except Exception as e:
+        logger.error(f"Error closing ComfyUI connection pool: {e}")
+
+    try:
+        await async_storage_client.disconnect()
+        logger.info("✓ Storage client closed")
+    except Exception as e:
+        logger.error(f"Error closing storage client: {e}")
+
     logger.info("Shutdown complete")
 
 
@@ -176,6 +238,7 @@ app.add_middleware(
 # Register routers
 app.include_router(health.router)
 app.include_router(generate.router)  # Synchronous endpoints (backwards compatible)
+app.include_router(events.router)  # SSE progress streams (before jobs: /jobs/events)
 app.include_router(jobs.router)  # Async job queue endpoints
 app.include_router(websocket.router)  # WebSocket for real-time progress
 app.include_router(metrics.router)  # Prometheus metrics
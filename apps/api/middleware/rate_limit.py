@@ -10,7 +10,7 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from typing import Callable
 import logging
 
-from ..services.rate_limiter import get_rate_limiter, RateLimitInfo
+from ..services.rate_limiter import get_rate_limiter, get_role_burst, RateLimitInfo
 from ..services.auth_service import get_auth_service
 from ..config import settings
 
@@ -68,6 +68,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             rate_limit_info = await self.rate_limiter.check_rate_limit(
                 user_id=user.user_id,
                 limit=user.rate_limit_per_minute,
+                burst=get_role_burst(user.role.value),
             )
 
             # Store rate limit info in request state for later use
@@ -10,6 +10,8 @@ from typing import Optional, Any
 from datetime import datetime
 from enum import Enum
 
+from .requests import GenerateImageRequest
+
 
 class JobStatus(str, Enum):
     """Job lifecycle states."""
@@ -23,7 +25,7 @@ class JobStatus(str, Enum):
 
 class JobArtifact(BaseModel):
     """Generated artifact (image) with metadata."""
-    url: str = Field(..., description="Presigned URL to download artifact")
+    url: Optional[str] = Field(None, description="Presigned URL to download artifact (unset if it could not be signed)")
     seed: Optional[int] = Field(None, description="Seed used for generation")
     width: Optional[int] = Field(None, description="Image width")
     height: Optional[int] = Field(None, description="Image height")
@@ -40,6 +42,14 @@ class JobResult(BaseModel):
         None,
         description="Time taken to generate (seconds)"
     )
+    partial: bool = Field(
+        False,
+        description="True if some generated images could not be stored"
+    )
+    failed_artifacts: list[int] = Field(
+        default_factory=list,
+        description="Indexes of generated images that could not be stored"
+    )
 
 
 class JobTimestamps(BaseModel):
@@ -158,9 +168,9 @@ class JobListResponse(BaseModel):
     Returned by GET /api/v1/jobs
     """
     jobs: list[JobResponse] = Field(..., description="List of jobs")
-    total: int = Field(..., description="Total number of jobs")
+    total: int = Field(..., description="Total number of matching jobs")
     limit: int = Field(..., description="Page size")
-    offset: int = Field(..., description="Page offset")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page (None on the last page)")
 
     class Config:
         json_schema_extra = {
@@ -179,7 +189,132 @@ class JobListResponse(BaseModel):
                 ],
                 "total": 1,
                 "limit": 20,
-                "offset": 0
+                "next_cursor": None
+            }
+        }
+
+
+class JobBatchGetRequest(BaseModel):
+    """
+    Request to fetch several jobs at once.
+
+    Sent to POST /api/v1/jobs:batchGet
+    """
+    job_ids: list[str] = Field(
+        ...,
+        min_length=1,
+        max_length=500,
+        description="Job IDs to fetch (1-500, duplicates are returned once)"
+    )
+
+
+class JobBatchGetError(BaseModel):
+    """Per-job failure in a batch get."""
+    job_id: str = Field(..., description="Job identifier")
+    code: str = Field(..., description="Error code (JOB_NOT_FOUND, JOB_UNREADABLE)")
+    message: str = Field(..., description="Error message")
+
+
+class JobBatchGetResponse(BaseModel):
+    """
+    Response for a batch get.
+
+    Returned by POST /api/v1/jobs:batchGet. Jobs that could not be returned
+    are listed in ``errors``; the request itself still succeeds.
+    """
+    jobs: list[JobResponse] = Field(..., description="Found jobs, in request order")
+    errors: list[JobBatchGetError] = Field(
+        default_factory=list,
+        description="Jobs that were not found or could not be read"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "jobs": [
+                    {
+                        "job_id": "j_a1b2c3d4e5f6",
+                        "status": "running",
+                        "progress": 0.4,
+                        "timestamps": {
+                            "queued_at": "2025-11-06T12:00:00Z",
+                            "started_at": "2025-11-06T12:00:02Z"
+                        }
+                    }
+                ],
+                "errors": [
+                    {
+                        "job_id": "j_000000000000",
+                        "code": "JOB_NOT_FOUND",
+                        "message": "Job j_000000000000 not found"
+                    }
+                ]
+            }
+        }
+
+
+class JobBatchCreateItem(BaseModel):
+    """One job of a batch submission."""
+    request: GenerateImageRequest = Field(..., description="Image generation parameters")
+    idempotency_key: Optional[str] = Field(
+        None,
+        max_length=255,
+        description="Per-item Idempotency-Key (same 24h semantics as the header)"
+    )
+
+
+class JobBatchCreateRequest(BaseModel):
+    """
+    Request to submit several jobs at once.
+
+    Sent to POST /api/v1/jobs:batch
+    """
+    jobs: list[JobBatchCreateItem] = Field(
+        ...,
+        min_length=1,
+        description="Jobs to submit (at most JOB_BATCH_MAX_SIZE)"
+    )
+
+
+class JobBatchItemError(BaseModel):
+    """Why one item of a batch submission failed."""
+    code: str = Field(..., description="Error code")
+    message: str = Field(..., description="Error message")
+
+
+class JobBatchCreateResult(BaseModel):
+    """Outcome of one item of a batch submission (job or error)."""
+    index: int = Field(..., description="Position of the item in the request")
+    job: Optional[JobCreateResponse] = Field(None, description="Submitted (or existing) job")
+    error: Optional[JobBatchItemError] = Field(None, description="Set if the item failed")
+
+
+class JobBatchCreateResponse(BaseModel):
+    """
+    Response for a batch submission.
+
+    Returned by POST /api/v1/jobs:batch; results are in request order.
+    """
+    results: list[JobBatchCreateResult] = Field(..., description="Per-item results")
+    submitted: int = Field(..., description="Items that returned a job")
+    failed: int = Field(..., description="Items that failed")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "results": [
+                    {
+                        "index": 0,
+                        "job": {
+                            "job_id": "j_a1b2c3d4e5f6",
+                            "status": "queued",
+                            "queued_at": "2025-11-06T12:00:00Z",
+                            "location": "/api/v1/jobs/j_a1b2c3d4e5f6"
+                        }
+                    }
+                ],
+                "submitted": 1,
+                "failed": 0
             }
         }
 
@@ -213,6 +213,15 @@ class ABTestRequest(BaseModel):
         examples=["Testing step count impact on quality"]
     )
 
+    @field_validator("variants")
+    @classmethod
+    def validate_variant_names(cls, v: list[ABTestVariant]) -> list[ABTestVariant]:
+        """Variant names key the results, so they must be unique."""
+        names = [variant.name for variant in v]
+        if len(set(names)) != len(names):
+            raise ValueError("Variant names must be unique")
+        return v
+
     model_config = {
         "json_schema_extra": {
             "examples": [
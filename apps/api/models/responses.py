@@ -1,6 +1,6 @@
 """Response models for API endpoints."""
 
-from typing import Optional, Any
+from typing import Optional, Any, List
 from datetime import datetime
 from pydantic import BaseModel, Field
 from enum import Enum
@@ -43,6 +43,11 @@ class ImageResponse(BaseModel):
         description="URL to download the generated image (available when status=completed)"
     )
 
+    image_urls: List[str] = Field(
+        default_factory=list,
+        description="URLs of every generated image, across all output nodes (image_url is the first)"
+    )
+
     image_data: Optional[str] = Field(
         None,
         description="Base64-encoded image data (if requested)"
@@ -202,6 +207,10 @@ class ABTestResponse(BaseModel):
     """Response for an A/B test."""
 
     test_id: str = Field(..., description="Unique identifier for this A/B test")
+    status: str = Field(
+        "completed",
+        description="'running' until every variant's job has finished, then 'completed'"
+    )
     base_prompt: str = Field(..., description="Base prompt used")
     description: Optional[str] = Field(None, description="Test description")
     variants: list[ABTestVariantResult] = Field(..., description="Results for each variant")
@@ -217,6 +226,7 @@ class ABTestResponse(BaseModel):
             "examples": [
                 {
                     "test_id": "abtest_abc123",
+                    "status": "completed",
                     "base_prompt": "A serene lake surrounded by mountains at sunset",
                     "description": "Testing step count impact",
                     "variants": [
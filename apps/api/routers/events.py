@@ -0,0 +1,298 @@
+"""
+Server-Sent Events endpoints for job progress.
+
+Same events as ``/ws/jobs/{job_id}`` (fed by the shared job event hub) over
+plain HTTP, for clients behind proxies that break WebSockets. Streams
+resume with the standard ``Last-Event-ID`` header, and one connection can
+follow several jobs.
+"""
+
+from fastapi import APIRouter, HTTPException, Header, Query, Depends
+from fastapi.responses import Response, StreamingResponse
+from typing import AsyncIterator, Dict, List, Optional
+import asyncio
+import json
+import logging
+
+from .jobs import check_jobs_enabled
+from ..services.redis_client import event_offset
+from ..services.artifact_urls import artifact_url_service
+from ..services.job_events import job_event_hub, JobEventStream
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Registered ahead of the jobs router so /api/v1/jobs/events is not taken
+# for a job ID
+router = APIRouter(
+    prefix="/api/v1/jobs",
+    tags=["jobs"],
+    responses={
+        503: {"description": "Job queue or event streaming unavailable"}
+    }
+)
+
+# Reconnect delay suggested to EventSource clients, in milliseconds
+SSE_RETRY_MS = 3000
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # disable nginx response buffering
+}
+
+
+def _error(status_code: int, code: str, message: str, details: dict) -> HTTPException:
+    return HTTPException(
+        status_code=status_code,
+        detail={
+            "error": {
+                "code": code,
+                "message": message,
+                "details": details
+            }
+        }
+    )
+
+
+async def check_sse_enabled():
+    """Dependency to check that SSE is enabled and events can be delivered."""
+    if not settings.sse_enabled:
+        raise _error(503, "FEATURE_DISABLED", "Server-Sent Events are currently disabled", {"feature": "sse"})
+    if not job_event_hub.running:
+        raise _error(503, "EVENTS_UNAVAILABLE", "Progress updates unavailable", {})
+
+
+def _format_event(event: dict, event_id: Optional[str]) -> str:
+    """Serialize one SSE message."""
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event.get('type', 'message')}")
+    lines.append(f"data: {json.dumps(event)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _format_offsets(offsets: Dict[str, str]) -> str:
+    """Multi-job event ID: the last event ID seen for every job."""
+    return ",".join(f"{job_id}:{offset}" for job_id, offset in offsets.items())
+
+
+def _parse_offsets(last_event_id: str) -> Dict[str, str]:
+    """
+    Parse a multi-job ``Last-Event-ID``.
+
+    Raises:
+        ValueError: If it is malformed
+    """
+    offsets = {}
+    for part in last_event_id.split(","):
+        job_id, sep, offset = part.partition(":")
+        if not sep or not job_id:
+            raise ValueError(f"Invalid event ID: {last_event_id!r}")
+        event_offset(offset)
+        offsets[job_id] = offset
+    return offsets
+
+
+async def _event_stream(
+    streams: List[JobEventStream],
+    multi: bool,
+    missing: Optional[List[str]] = None
+) -> AsyncIterator[str]:
+    """
+    Interleave the events of opened streams as SSE messages.
+
+    Jobs in ``missing`` get a single ``not_found`` message up front.
+
+    Ends once every job sent ``done``, or as soon as one subscription is
+    dropped for falling behind (the client reconnects with Last-Event-ID).
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=settings.websocket_queue_size)
+
+    async def pump(stream: JobEventStream) -> None:
+        try:
+            async for event in stream.events():
+                await queue.put((stream, await artifact_url_service.sign_event(event)))
+        except Exception as e:
+            logger.exception(f"SSE error for job {stream.job_id}: {e}")
+        await queue.put((stream, None))
+
+    offsets = {stream.job_id: stream.since for stream in streams if stream.since}
+    tasks = [asyncio.create_task(pump(stream)) for stream in streams]
+    remaining = len(streams)
+
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        for job_id in missing or []:
+            yield _format_event({"type": "not_found", "job_id": job_id}, None)
+
+        while remaining:
+            try:
+                stream, event = await asyncio.wait_for(
+                    queue.get(), timeout=settings.sse_keepalive_interval
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+
+            if event is None:
+                if stream.dropped:
+                    logger.warning(f"SSE stream for job {stream.job_id} fell behind, closing")
+                    break
+                remaining -= 1
+                continue
+
+            if event.get("event_id"):
+                offsets[stream.job_id] = event["event_id"]
+
+            if multi:
+                event["job_id"] = stream.job_id
+                yield _format_event(event, _format_offsets(offsets) if offsets else None)
+            else:
+                yield _format_event(event, event.get("event_id"))
+
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for stream in streams:
+            stream.close()
+
+
+@router.get(
+    "/events",
+    summary="Stream progress for several jobs (SSE)",
+    description="""
+    Follow several jobs over one Server-Sent Events connection.
+
+    Each message carries the job's `job_id`. Message IDs list the last
+    event ID of every job (`j_a:1700000000000-0,j_b:...`), so an
+    EventSource reconnect resumes all jobs at once. The stream ends when
+    every job is done; a reconnect after that returns `204 No Content`.
+
+    **Example:**
+    ```bash
+    curl -N "http://localhost:8000/api/v1/jobs/events?ids=j_abc123def456,j_def456abc123"
+    ```
+    """,
+    responses={
+        200: {"description": "Event stream (text/event-stream)"},
+        204: {"description": "Every job finished and the client has seen it"},
+        400: {"description": "Invalid job IDs or Last-Event-ID"},
+        404: {"description": "None of the jobs exist"}
+    }
+)
+async def stream_jobs_events(
+    ids: str = Query(..., description="Comma-separated job IDs"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    _enabled: None = Depends(check_jobs_enabled),
+    _sse: None = Depends(check_sse_enabled)
+):
+    """
+    Stream events for a list of jobs.
+
+    Unknown (or expired) jobs get a single ``not_found`` event.
+    """
+    job_ids = list(dict.fromkeys(job_id.strip() for job_id in ids.split(",") if job_id.strip()))
+    if not job_ids or len(job_ids) > settings.sse_max_jobs:
+        raise _error(
+            400, "INVALID_JOB_IDS",
+            f"Provide between 1 and {settings.sse_max_jobs} job IDs",
+            {"count": len(job_ids)}
+        )
+
+    try:
+        offsets = _parse_offsets(last_event_id) if last_event_id else {}
+    except ValueError as e:
+        raise _error(400, "INVALID_EVENT_ID", str(e), {"last_event_id": last_event_id})
+
+    streams = [JobEventStream(job_event_hub, job_id, offsets.get(job_id)) for job_id in job_ids]
+    try:
+        found = await asyncio.gather(*(stream.open() for stream in streams))
+    except Exception:
+        for stream in streams:
+            stream.close()
+        raise
+
+    missing = [stream.job_id for stream, job_data in zip(streams, found) if not job_data]
+    if len(missing) == len(streams):
+        raise _error(404, "JOB_NOT_FOUND", "None of the jobs exist", {"job_ids": job_ids})
+
+    active = []
+    for stream, job_data in zip(streams, found):
+        if job_data and stream.finished:
+            stream.close()
+        elif job_data:
+            active.append(stream)
+
+    if not active:
+        return Response(status_code=204)
+
+    logger.info(f"SSE stream opened for {len(active)} jobs")
+    return StreamingResponse(
+        _event_stream(active, multi=True, missing=missing),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
+@router.get(
+    "/{job_id}/events",
+    summary="Stream job progress (SSE)",
+    description="""
+    Server-Sent Events stream of a job's progress, with the same messages as
+    `/ws/jobs/{job_id}` (`status`, `progress`, `log`, `artifact`, `done`).
+
+    The first message is the current status, unless the request carries
+    `Last-Event-ID` (sent automatically by EventSource on reconnect): then
+    the events after that ID are replayed first. The stream ends after
+    `done`; a reconnect after that returns `204 No Content`, which stops
+    EventSource from retrying.
+
+    **Example:**
+    ```javascript
+    const events = new EventSource('/api/v1/jobs/j_abc123def456/events');
+    events.addEventListener('progress', (e) => console.log(JSON.parse(e.data)));
+    events.addEventListener('done', (e) => events.close());
+    ```
+    """,
+    responses={
+        200: {"description": "Event stream (text/event-stream)"},
+        204: {"description": "Job finished and the client has seen it"},
+        400: {"description": "Invalid Last-Event-ID"},
+        404: {"description": "Job not found"}
+    }
+)
+async def stream_job_events(
+    job_id: str,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    _enabled: None = Depends(check_jobs_enabled),
+    _sse: None = Depends(check_sse_enabled)
+):
+    """
+    Stream events for one job.
+
+    Polling clients re-read the whole job hash every few seconds; this
+    holds one connection on the process-wide subscription instead.
+    """
+    if last_event_id:
+        try:
+            event_offset(last_event_id)
+        except ValueError as e:
+            raise _error(400, "INVALID_EVENT_ID", str(e), {"last_event_id": last_event_id})
+
+    stream = JobEventStream(job_event_hub, job_id, last_event_id or None)
+    if not await stream.open():
+        logger.warning(f"SSE stream rejected: job {job_id} not found")
+        raise _error(404, "JOB_NOT_FOUND", f"Job {job_id} not found", {"job_id": job_id})
+
+    if stream.finished:
+        stream.close()
+        return Response(status_code=204)
+
+    logger.info(f"SSE stream opened for job {job_id}")
+    return StreamingResponse(
+        _event_stream([stream], multi=False),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
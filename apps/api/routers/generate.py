@@ -1,11 +1,14 @@
 """Image generation endpoints."""
 
+import json
 import logging
+import uuid
 from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Optional
 
 from ..models.requests import GenerateImageRequest, BatchGenerateRequest
-from ..models.responses import ImageResponse, BatchImageResponse, ErrorResponse
+from ..models.responses import ImageResponse, BatchImageResponse, ErrorResponse, JobStatus
 from ..services.comfyui_client import (
     ComfyUIClient,
     get_comfyui_client,
@@ -13,6 +16,7 @@ from ..services.comfyui_client import (
     ComfyUITimeoutError,
     ComfyUIClientError
 )
+from ..services.comfyui_backends import comfyui_backends
 
 logger = logging.getLogger(__name__)
 
@@ -78,15 +82,10 @@ async def generate_image(
     try:
         logger.info(f"Generating image with prompt: {request.prompt[:100]}...")
 
-        async with client:
-            # Check if ComfyUI is available
-            is_healthy = await client.health_check()
-            if not is_healthy:
-                raise HTTPException(
-                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                    detail="ComfyUI service is not available"
-                )
+        # Check if ComfyUI is available (cached by the health monitor)
+        _check_comfyui()
 
+        async with client:
             # Generate image
             response = await client.generate_image(request)
 
@@ -132,7 +131,8 @@ async def generate_image(
     response_model=BatchImageResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Generate multiple images",
-    description="Generate multiple images in a batch. Each request is processed sequentially.",
+    description="Generate multiple images in a batch. All requests are queued in ComfyUI at once "
+                "and processed concurrently; results are returned in request order.",
     responses={
         201: {
             "description": "Batch generation initiated",
@@ -150,68 +150,130 @@ async def generate_batch(
     """
     Generate multiple images in a batch.
 
-    This endpoint processes multiple generation requests sequentially.
+    This endpoint submits every request to ComfyUI up front and waits for
+    all of them together, so a batch takes about as long as ComfyUI needs
+    to work through its queue rather than the sum of per-request round trips.
     Each request is independent and failures in one request don't affect others.
 
     **Note:** This is a synchronous operation that waits for all images to be generated.
-    For large batches, consider using individual requests instead.
+    Use `POST /api/v1/generate/batch/stream` to receive each image as soon as it is ready.
 
     **Parameters:**
     - **requests**: List of generation requests (max 10)
 
     **Returns:**
     - **batch_id**: Unique identifier for this batch
-    - **jobs**: List of individual job responses
+    - **jobs**: List of individual job responses, in request order
     - **total**: Total number of jobs
     - **completed**: Number of successfully completed jobs
     - **failed**: Number of failed jobs
     """
-    import uuid
-
     batch_id = str(uuid.uuid4())
-    jobs: List[ImageResponse] = []
-    completed_count = 0
-    failed_count = 0
+    jobs: List[Optional[ImageResponse]] = [None] * len(batch_request.requests)
 
     logger.info(f"Processing batch {batch_id} with {len(batch_request.requests)} requests")
 
+    _check_comfyui()
+
     async with client:
-        # Check if ComfyUI is available
-        is_healthy = await client.health_check()
-        if not is_healthy:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="ComfyUI service is not available"
-            )
-
-        # Process each request
-        for idx, request in enumerate(batch_request.requests, 1):
-            logger.info(f"Processing batch item {idx}/{len(batch_request.requests)}")
-
-            try:
-                response = await client.generate_image(request)
-                jobs.append(response)
-
-                if response.status == "completed":
-                    completed_count += 1
-                else:
-                    failed_count += 1
-
-            except Exception as e:
-                logger.error(f"Error processing batch item {idx}: {e}")
-                # Create a failed response for this item
-                failed_response = ImageResponse(
-                    job_id=f"batch_{batch_id}_item_{idx}",
-                    status="failed",
-                    error=str(e)
-                )
-                jobs.append(failed_response)
-                failed_count += 1
+        async for index, response in client.generate_images(batch_request.requests):
+            logger.info(f"Batch {batch_id}: item {index + 1}/{len(jobs)} {response.status.value}")
+            jobs[index] = response
+
+    completed_count = sum(1 for job in jobs if job.status == JobStatus.COMPLETED)
 
     return BatchImageResponse(
         batch_id=batch_id,
         jobs=jobs,
         total=len(batch_request.requests),
         completed=completed_count,
-        failed=failed_count
+        failed=len(jobs) - completed_count
+    )
+
+
+@router.post(
+    "/batch/stream",
+    summary="Generate multiple images (streamed)",
+    description="""
+    Same as `POST /api/v1/generate/batch`, but streams newline-delimited JSON
+    so each image is delivered as soon as it finishes instead of after the
+    whole batch.
+
+    One line per request, in completion order, carrying its position in
+    the batch:
+    `{"type": "image", "index": 2, "job": {...ImageResponse...}}`
+
+    followed by a final summary line:
+    `{"type": "summary", "batch_id": "...", "total": 3, "completed": 3, "failed": 0}`
+
+    Closing the connection early removes the prompts that haven't started
+    yet from the ComfyUI queue.
+
+    **Example:**
+    ```bash
+    curl -N -X POST http://localhost:8000/api/v1/generate/batch/stream \\
+      -H "Content-Type: application/json" \\
+      -d '{"requests": [{"prompt": "A cat"}, {"prompt": "A dog"}]}'
+    ```
+    """,
+    responses={
+        200: {"description": "Result stream (application/x-ndjson)"},
+        400: {
+            "description": "Invalid request parameters"
+        }
+    }
+)
+async def generate_batch_stream(
+    batch_request: BatchGenerateRequest,
+    client: ComfyUIClient = Depends(get_comfyui_client)
+) -> StreamingResponse:
+    """
+    Generate multiple images, streaming each result as NDJSON.
+
+    ComfyUI availability is checked before the stream starts, so an
+    unavailable backend still yields a 503 rather than an empty stream.
+    """
+    batch_id = str(uuid.uuid4())
+
+    _check_comfyui()
+
+    logger.info(f"Streaming batch {batch_id} with {len(batch_request.requests)} requests")
+
+    return StreamingResponse(
+        _batch_stream(client, batch_id, batch_request.requests),
+        media_type="application/x-ndjson"
     )
+
+
+def _check_comfyui() -> None:
+    """Raise 503 if no ComfyUI backend passed its last health probe."""
+    if not comfyui_backends.healthy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="ComfyUI service is not available"
+        )
+
+
+async def _batch_stream(
+    client: ComfyUIClient,
+    batch_id: str,
+    requests: List[GenerateImageRequest]
+) -> AsyncIterator[str]:
+    """One NDJSON line per finished image, then a summary line."""
+    completed_count = 0
+
+    async with client:
+        async for index, response in client.generate_images(requests):
+            if response.status == JobStatus.COMPLETED:
+                completed_count += 1
+            line = {"type": "image", "index": index, "job": response.model_dump(mode="json")}
+            yield json.dumps(line) + "\n"
+
+    summary = {
+        "type": "summary",
+        "batch_id": batch_id,
+        "total": len(requests),
+        "completed": completed_count,
+        "failed": len(requests) - completed_count,
+    }
+    yield json.dumps(summary) + "\n"
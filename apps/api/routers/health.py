@@ -7,7 +7,7 @@ from fastapi.responses import JSONResponse
 from datetime import datetime
 
 from ..models.responses import HealthResponse, ModelsListResponse, ModelInfo
-from ..services.comfyui_client import ComfyUIClient, get_comfyui_client
+from ..services.comfyui_client import ComfyUIClient, get_comfyui_status_client
 
 logger = logging.getLogger(__name__)
 
@@ -40,7 +40,7 @@ async def liveness_check():
     status_code=status.HTTP_200_OK
 )
 async def readiness_check(
-    client: ComfyUIClient = Depends(get_comfyui_client)
+    client: ComfyUIClient = Depends(get_comfyui_status_client)
 ):
     """
     Readiness check - verifies service can handle requests.
@@ -85,7 +85,7 @@ async def readiness_check(
     status_code=status.HTTP_200_OK
 )
 async def health_check(
-    client: ComfyUIClient = Depends(get_comfyui_client)
+    client: ComfyUIClient = Depends(get_comfyui_status_client)
 ) -> HealthResponse:
     """
     Check service health.
@@ -128,7 +128,7 @@ async def health_check(
     status_code=status.HTTP_200_OK
 )
 async def list_models(
-    client: ComfyUIClient = Depends(get_comfyui_client)
+    client: ComfyUIClient = Depends(get_comfyui_status_client)
 ) -> ModelsListResponse:
     """
     List available models.
@@ -4,25 +4,38 @@ Job management API endpoints.
 Provides async job submission, status checking, and cancellation.
 """
 
-from fastapi import APIRouter, HTTPException, status, Header, Depends
+from fastapi import APIRouter, HTTPException, status, Header, Depends, Request
 from fastapi.responses import JSONResponse
 from typing import Optional
+import asyncio
 import logging
 
 from ..models.requests import GenerateImageRequest
+from ..models.auth import AuthenticatedUser, UserRole
 from ..models.jobs import (
     JobCreateResponse,
     JobResponse,
     JobStatus,
     JobCancelResponse,
     JobListResponse,
+    JobBatchCreateRequest,
+    JobBatchCreateResult,
+    JobBatchCreateResponse,
+    JobBatchItemError,
+    JobBatchGetRequest,
+    JobBatchGetError,
+    JobBatchGetResponse,
     JobTimestamps,
     JobResult,
     JobError
 )
 from ..services.job_queue import job_queue
 from ..services.redis_client import redis_client
-from ..config import settings
+from ..services.artifact_urls import artifact_url_service
+from ..services.job_events import job_event_hub
+from ..services.rate_limiter import get_rate_limiter, get_role_burst
+from ..middleware.auth import get_current_user, get_optional_user
+from ..config import settings, ROLE_QUOTAS
 
 logger = logging.getLogger(__name__)
 
@@ -97,6 +110,7 @@ async def create_job(
     request: GenerateImageRequest,
     idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     x_request_id: Optional[str] = Header(None, alias="X-Request-ID"),
+    user: Optional[AuthenticatedUser] = Depends(get_optional_user),
     _enabled: None = Depends(check_jobs_enabled)
 ) -> JSONResponse:
     """
@@ -104,9 +118,9 @@ async def create_job(
 
     The job will be processed asynchronously by background workers.
     """
-    # Extract token from auth header (for now, use request_id as token)
-    # TODO: Implement proper authentication and extract real token
-    token = x_request_id or "anonymous"
+    # Jobs are owned by the authenticated user; anonymous jobs (auth
+    # disabled) fall back to the request ID
+    token = user.user_id if user else (x_request_id or "anonymous")
 
     logger.info(
         f"Job submission request",
@@ -150,6 +164,239 @@ async def create_job(
         )
 
 
+@router.post(
+    ":batch",
+    response_model=JobBatchCreateResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Submit several image generation jobs",
+    description="""
+    Submit up to 1000 jobs in one request. Jobs are created, indexed and
+    enqueued in pipelined batches, so the Redis cost per job is a small
+    fraction of individual `POST /api/v1/jobs` calls.
+
+    Each item takes the same parameters as `POST /api/v1/jobs` plus an
+    optional `idempotency_key` (same 24h semantics as the header). Results
+    are returned per item, in request order; an item that fails carries an
+    `error` instead of a `job`, without failing the others.
+
+    Each job costs one rate-limit token (anonymous callers are limited at
+    the free tier's rate). A batch larger than the caller's rate-limit
+    burst is rejected with 400; one the bucket can't cover right now gets
+    429. Nothing is enqueued in either case.
+
+    **Example:**
+    ```bash
+    curl -X POST http://localhost:8000/api/v1/jobs:batch \\
+      -H "Content-Type: application/json" \\
+      -d '{"jobs": [{"request": {"prompt": "A sunset"}, "idempotency_key": "sunset-1"},
+                    {"request": {"prompt": "A forest"}}]}'
+    ```
+    """,
+    responses={
+        202: {"description": "Jobs accepted (see per-item results)"},
+        400: {"description": "Too many jobs in one batch (or more than the rate-limit burst)"},
+        422: {"description": "Validation error"},
+        429: {"description": "Rate limit exceeded (each job costs one token)"},
+        503: {"description": "Job queue unavailable"}
+    }
+)
+async def create_jobs_batch(
+    request: JobBatchCreateRequest,
+    http_request: Request,
+    x_request_id: Optional[str] = Header(None, alias="X-Request-ID"),
+    user: Optional[AuthenticatedUser] = Depends(get_optional_user),
+    _enabled: None = Depends(check_jobs_enabled)
+) -> JobBatchCreateResponse:
+    """
+    Submit many image generation jobs at once.
+    """
+    if len(request.jobs) > settings.job_batch_max_size:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": {
+                    "code": "BATCH_TOO_LARGE",
+                    "message": f"At most {settings.job_batch_max_size} jobs per batch",
+                    "details": {"count": len(request.jobs), "max": settings.job_batch_max_size}
+                }
+            }
+        )
+
+    await _charge_batch(user, http_request, len(request.jobs))
+
+    token = user.user_id if user else (x_request_id or "anonymous")
+
+    try:
+        outcomes = await job_queue.submit_jobs(
+            [(item.request, item.idempotency_key) for item in request.jobs],
+            token=token
+        )
+    except Exception as e:
+        logger.error(f"Failed to submit job batch: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "error": {
+                    "code": "JOB_SUBMISSION_FAILED",
+                    "message": "Failed to submit jobs",
+                    "details": {"reason": str(e)}
+                }
+            }
+        )
+
+    results = []
+    for index, outcome in enumerate(outcomes):
+        if isinstance(outcome, Exception):
+            results.append(JobBatchCreateResult(
+                index=index,
+                error=JobBatchItemError(code="JOB_SUBMISSION_FAILED", message=str(outcome))
+            ))
+        else:
+            results.append(JobBatchCreateResult(index=index, job=outcome))
+
+    failed = sum(1 for result in results if result.error)
+    logger.info(f"Job batch submitted by {token}: {len(results) - failed} ok, {failed} failed")
+
+    return JobBatchCreateResponse(
+        results=results,
+        submitted=len(results) - failed,
+        failed=failed
+    )
+
+
+async def _charge_batch(user: Optional[AuthenticatedUser], http_request: Request, count: int) -> None:
+    """
+    Take one rate-limit token per job in a batch, or raise.
+
+    RateLimitMiddleware already took one token for the HTTP request from
+    authenticated callers, so they are charged ``count - 1`` more.
+    Anonymous callers (not seen by the middleware) are charged ``count``
+    at the free role's rate, per client address. A batch larger than the
+    bucket's burst capacity could never be admitted, so it is rejected
+    with 400 instead of a 429 whose Retry-After would never succeed.
+    """
+    if not settings.rate_limit_enabled:
+        return
+
+    if user:
+        bucket = user.user_id
+        limit = user.rate_limit_per_minute
+        burst = get_role_burst(user.role.value)
+        cost = count - 1
+    else:
+        bucket = f"anonymous:{http_request.client.host if http_request.client else 'unknown'}"
+        limit = ROLE_QUOTAS["free"]["rate_limit_per_minute"]
+        burst = get_role_burst("free")
+        cost = count
+
+    capacity = burst if burst is not None else limit
+    if limit == -1 or capacity == -1:
+        return
+
+    if count > capacity:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": {
+                    "code": "BATCH_EXCEEDS_RATE_LIMIT_BURST",
+                    "message": f"At most {capacity} jobs per batch for this caller (rate-limit burst)",
+                    "details": {"count": count, "burst": capacity}
+                }
+            }
+        )
+
+    if cost <= 0:
+        return
+
+    info = await get_rate_limiter().check_rate_limit(bucket, limit=limit, burst=burst, requested=cost)
+    if info.allowed:
+        return
+
+    raise HTTPException(
+        status_code=429,
+        detail={
+            "error": {
+                "code": "RATE_LIMIT_EXCEEDED",
+                "message": f"Not enough rate-limit tokens for {count} jobs",
+                "details": {"requested": count, "limit": info.limit, "burst": burst, "retry_after": info.retry_after}
+            }
+        },
+        headers={
+            "X-RateLimit-Limit": str(info.limit),
+            "X-RateLimit-Remaining": str(info.remaining),
+            "X-RateLimit-Reset": str(info.reset),
+            "Retry-After": str(info.retry_after or 0),
+        }
+    )
+
+
+@router.post(
+    ":batchGet",
+    response_model=JobBatchGetResponse,
+    summary="Get several jobs",
+    description="""
+    Get the status and result of up to 500 jobs in one request, read from
+    Redis in a single pipelined round trip.
+
+    Partial failures don't fail the request: jobs that don't exist (or
+    can't be read) are reported in `errors` and the rest are returned in
+    `jobs`, in request order.
+
+    **Example:**
+    ```bash
+    curl -X POST http://localhost:8000/api/v1/jobs:batchGet \\
+      -H "Content-Type: application/json" \\
+      -d '{"job_ids": ["j_abc123def456", "j_def456abc123"]}'
+    ```
+    """,
+    responses={
+        200: {"description": "Jobs returned (see errors for missing ones)"},
+        422: {"description": "Empty list or more than 500 job IDs"}
+    }
+)
+async def batch_get_jobs(
+    request: JobBatchGetRequest,
+    _enabled: None = Depends(check_jobs_enabled)
+) -> JobBatchGetResponse:
+    """
+    Get several jobs at once.
+
+    Replaces one GET per job for dashboards and the A/B tester.
+    """
+    found = await redis_client.get_jobs_many(request.job_ids)
+
+    job_ids = [job_id for job_id, job_data in found.items() if job_data]
+    built = await asyncio.gather(
+        *(_build_job_response(found[job_id]) for job_id in job_ids),
+        return_exceptions=True
+    )
+    responses = dict(zip(job_ids, built))
+
+    jobs = []
+    errors = []
+    for job_id in found:
+        response = responses.get(job_id)
+        if response is None:
+            errors.append(JobBatchGetError(
+                job_id=job_id,
+                code="JOB_NOT_FOUND",
+                message=f"Job {job_id} not found"
+            ))
+        elif isinstance(response, Exception):
+            logger.error(f"Failed to read job {job_id} in batch get: {response}")
+            errors.append(JobBatchGetError(
+                job_id=job_id,
+                code="JOB_UNREADABLE",
+                message=f"Job {job_id} could not be read"
+            ))
+        else:
+            jobs.append(response)
+
+    logger.debug(f"Batch get of {len(found)} jobs: {len(jobs)} returned, {len(errors)} errors")
+
+    return JobBatchGetResponse(jobs=jobs, errors=errors)
+
+
 @router.get(
     "/{job_id}",
     response_model=JobResponse,
@@ -165,9 +412,15 @@ async def create_job(
     - `canceled`: Cancelled by user
     - `expired`: Expired before completion
 
+    **Long polling:** with `wait=N` the request blocks for up to N seconds
+    (max 60) until the job's status or progress changes, then returns the
+    updated job. With `since_status`, it returns at once if the status
+    already differs. Finished jobs return immediately.
+
     **Example:**
     ```bash
     curl http://localhost:8000/api/v1/jobs/j_abc123def456
+    curl "http://localhost:8000/api/v1/jobs/j_abc123def456?wait=30&since_status=running"
     ```
     """,
     responses={
@@ -177,6 +430,8 @@ async def create_job(
 )
 async def get_job(
     job_id: str,
+    wait: int = 0,
+    since_status: Optional[JobStatus] = None,
     _enabled: None = Depends(check_jobs_enabled)
 ) -> JobResponse:
     """
@@ -188,7 +443,17 @@ async def get_job(
     - Error details (if failed)
     - Timestamps
     """
-    job_data = await redis_client.get_job(job_id)
+    wait = max(0, min(wait, settings.long_poll_max_wait))
+
+    if wait and job_event_hub.running:
+        # Blocks on the shared event subscription, not on repeated reads
+        job_data = await job_event_hub.wait_for_change(
+            job_id,
+            timeout=wait,
+            since_status=since_status.value if since_status else None
+        )
+    else:
+        job_data = await redis_client.get_job(job_id)
 
     if not job_data:
         logger.warning(f"Job {job_id} not found")
@@ -203,6 +468,15 @@ async def get_job(
             }
         )
 
+    response = await _build_job_response(job_data)
+
+    logger.debug(f"Returning status for job {job_id}: {response.status}")
+
+    return response
+
+
+async def _build_job_response(job_data: dict) -> JobResponse:
+    """Build a JobResponse from a parsed job hash, signing artifact URLs."""
     # Parse timestamps
     timestamps = JobTimestamps(
         queued_at=job_data["queued_at"],
@@ -210,10 +484,10 @@ async def get_job(
         finished_at=job_data.get("finished_at")
     )
 
-    # Parse result if present
+    # Parse result if present (artifact URLs are signed on read)
     result = None
     if job_data.get("result"):
-        result = JobResult(**job_data["result"])
+        result = JobResult(**await artifact_url_service.sign_result(job_data["result"]))
 
     # Parse error if present
     error = None
@@ -222,7 +496,7 @@ async def get_job(
         if isinstance(error_data, dict):
             error = JobError(**error_data)
 
-    response = JobResponse(
+    return JobResponse(
         job_id=job_data["job_id"],
         status=JobStatus(job_data["status"]),
         progress=float(job_data.get("progress", 0.0)),
@@ -233,10 +507,6 @@ async def get_job(
         timestamps=timestamps
     )
 
-    logger.debug(f"Returning status for job {job_id}: {response.status}")
-
-    return response
-
 
 @router.delete(
     "/{job_id}",
@@ -306,48 +576,71 @@ async def cancel_job(
     response_model=JobListResponse,
     summary="List jobs",
     description="""
-    List recent jobs (filtered by authenticated user).
+    List jobs, newest first.
 
-    **Note:** This endpoint requires authentication to prevent listing
-    all jobs. In the current version, it returns a placeholder response.
+    Regular users see only their own jobs; internal users (and every caller
+    while authentication is disabled) see all jobs.
 
     **Query Parameters:**
     - `limit`: Number of jobs per page (default: 20, max: 100)
-    - `offset`: Page offset (default: 0)
+    - `status`: Only jobs currently in this status
+    - `cursor`: `next_cursor` from the previous page
 
     **Example:**
     ```bash
-    curl "http://localhost:8000/api/v1/jobs?limit=10&offset=0"
+    curl "http://localhost:8000/api/v1/jobs?limit=10&status=succeeded"
+    curl "http://localhost:8000/api/v1/jobs?limit=10&cursor=WzE3NjA..."
     ```
     """,
     responses={
         200: {"description": "List of jobs"},
+        400: {"description": "Invalid cursor"},
         401: {"description": "Authentication required"}
     }
 )
 async def list_jobs(
     limit: int = 20,
-    offset: int = 0,
+    status: Optional[JobStatus] = None,
+    cursor: Optional[str] = None,
+    user: AuthenticatedUser = Depends(get_current_user),
     _enabled: None = Depends(check_jobs_enabled)
 ) -> JobListResponse:
     """
     List jobs for the authenticated user.
 
-    **TODO:** Implement with proper authentication and Redis SCAN.
-
-    For now, returns empty list with note that feature is pending.
+    Served from sorted-set indexes with cursor pagination, so the cost of
+    a page does not depend on how many jobs exist.
     """
-    # TODO: Implement job listing
-    # - Authenticate user
-    # - Query Redis for user's jobs (use SCAN with pattern)
-    # - Apply pagination
-    # - Return results
+    limit = max(1, min(limit, 100))  # Cap at 100
+    owner = None if user.role == UserRole.INTERNAL else user.user_id
 
-    logger.info(f"Job list requested (limit={limit}, offset={offset})")
+    try:
+        jobs, total, next_cursor = await redis_client.list_jobs(
+            owner=owner,
+            status=status.value if status else None,
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": {
+                    "code": "INVALID_CURSOR",
+                    "message": str(e),
+                    "details": {"cursor": cursor}
+                }
+            }
+        )
+
+    logger.info(
+        f"Job list requested (owner={owner}, status={status}, limit={limit}): "
+        f"{len(jobs)} of {total}"
+    )
 
     return JobListResponse(
-        jobs=[],
-        total=0,
-        limit=min(limit, 100),  # Cap at 100
-        offset=offset
+        jobs=[await _build_job_response(job_data) for job_data in jobs],
+        total=total,
+        limit=limit,
+        next_cursor=next_cursor
     )
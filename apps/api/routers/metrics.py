@@ -27,6 +27,7 @@ http_requests_total = None
 http_request_duration_seconds = None
 storage_uploads_total = None
 storage_upload_bytes = None
+storage_upload_duration_seconds = None
 redis_operations_total = None
 comfyui_requests_total = None
 comfyui_request_duration_seconds = None
@@ -38,7 +39,7 @@ def _ensure_metrics_registered():
     global jobs_total, jobs_created, job_duration_seconds, queue_depth
     global active_workers, jobs_in_progress, http_requests_total
     global http_request_duration_seconds, storage_uploads_total
-    global storage_upload_bytes, redis_operations_total
+    global storage_upload_bytes, storage_upload_duration_seconds, redis_operations_total
     global comfyui_requests_total, comfyui_request_duration_seconds
 
     if _metrics_registered:
@@ -52,8 +53,10 @@ def _ensure_metrics_registered():
             ["status"]
         )
 
+        # Not "comfyui_jobs_created_total": that clashes with the
+        # "comfyui_jobs_created" sample exported by comfyui_jobs_total
         jobs_created = Counter(
-            "comfyui_jobs_created_total",
+            "comfyui_jobs_submitted_total",
             "Total number of jobs created"
         )
 
@@ -108,6 +111,12 @@ def _ensure_metrics_registered():
             "Total bytes uploaded to storage"
         )
 
+        storage_upload_duration_seconds = Histogram(
+            "comfyui_storage_upload_duration_seconds",
+            "Artifact transfer duration (ComfyUI download + storage upload)",
+            buckets=[0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+        )
+
         # Redis metrics
         redis_operations_total = Counter(
             "comfyui_redis_operations_total",
@@ -153,7 +162,7 @@ _ensure_metrics_registered()
 
     **Job Metrics:**
     - `comfyui_jobs_total{status}` - Total jobs by status
-    - `comfyui_jobs_created_total` - Total jobs created
+    - `comfyui_jobs_submitted_total` - Total jobs created
     - `comfyui_job_duration_seconds` - Job processing duration histogram
     - `comfyui_queue_depth` - Current queue depth
     - `comfyui_jobs_in_progress` - Jobs currently processing
@@ -166,6 +175,7 @@ _ensure_metrics_registered()
     **Storage Metrics:**
     - `comfyui_storage_uploads_total{status}` - Upload operations
     - `comfyui_storage_upload_bytes_total` - Bytes uploaded
+    - `comfyui_storage_upload_duration_seconds` - Artifact transfer duration
 
     **Backend Metrics:**
     - `comfyui_backend_requests_total{status}` - ComfyUI requests
@@ -284,13 +294,15 @@ def record_http_duration(method: str, endpoint: str, duration_seconds: float):
     http_request_duration_seconds.labels(method=method, endpoint=endpoint).observe(duration_seconds)
 
 
-def record_storage_upload(success: bool, bytes_uploaded: int = 0):
+def record_storage_upload(success: bool, bytes_uploaded: int = 0, duration_seconds: float = None):
     """Record storage upload."""
     _ensure_metrics_registered()
     status_label = "success" if success else "failure"
     storage_uploads_total.labels(status=status_label).inc()
     if success and bytes_uploaded > 0:
         storage_upload_bytes.inc(bytes_uploaded)
+    if duration_seconds is not None:
+        storage_upload_duration_seconds.observe(duration_seconds)
 
 
 def record_redis_operation(operation: str, success: bool):
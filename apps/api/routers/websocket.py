@@ -4,12 +4,13 @@ WebSocket endpoints for real-time job progress updates.
 Provides live streaming of job status, progress, and completion events.
 """
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException, Depends
-import json
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException, Depends, Query
+from typing import Optional
 import logging
-import asyncio
 
-from ..services.redis_client import redis_client
+from ..services.redis_client import event_offset
+from ..services.artifact_urls import artifact_url_service
+from ..services.job_events import job_event_hub, JobEventStream
 from ..config import settings
 
 logger = logging.getLogger(__name__)
@@ -29,7 +30,8 @@ async def check_websocket_enabled():
 @router.websocket("/ws/jobs/{job_id}")
 async def job_progress_websocket(
     websocket: WebSocket,
-    job_id: str
+    job_id: str,
+    since: Optional[str] = Query(None, description="Last event_id received; replay events after it")
 ):
     """
     WebSocket endpoint for real-time job progress updates.
@@ -96,6 +98,11 @@ async def job_progress_websocket(
     }
     ```
 
+    Every event (and the initial status) carries an ``event_id``. To resume
+    after a disconnect, reconnect with ``?since=<last event_id>``: missed
+    events are replayed in order before live updates continue, and no
+    initial status is sent.
+
     **Connection closes automatically after job completion.**
     """
     # Check if WebSocket is enabled
@@ -103,82 +110,43 @@ async def job_progress_websocket(
         await websocket.close(code=1008, reason="WebSocket support disabled")
         return
 
-    # Check if job exists
-    job_data = await redis_client.get_job(job_id)
-    if not job_data:
-        await websocket.close(code=1008, reason=f"Job {job_id} not found")
-        logger.warning(f"WebSocket connection rejected: job {job_id} not found")
-        return
-
-    # Accept WebSocket connection
-    await websocket.accept()
-    logger.info(f"WebSocket connected for job {job_id}")
-
-    # Send current status immediately
-    try:
-        await websocket.send_json({
-            "type": "status",
-            "status": job_data["status"],
-            "progress": float(job_data.get("progress", 0.0))
-        })
-    except Exception as e:
-        logger.error(f"Failed to send initial status for job {job_id}: {e}")
-        await websocket.close()
+    if not job_event_hub.running:
+        await websocket.close(code=1011, reason="Progress updates unavailable")
+        logger.error(f"WebSocket connection rejected for job {job_id}: job event hub not running")
         return
 
-    # If job is already finished, send final message and close
-    if job_data["status"] in ["succeeded", "failed", "canceled", "expired"]:
+    if since is not None:
         try:
-            done_message = {
-                "type": "done",
-                "status": job_data["status"]
-            }
-
-            if job_data.get("result"):
-                done_message["result"] = job_data["result"]
-
-            if job_data.get("error"):
-                done_message["error"] = job_data["error"]
-
-            await websocket.send_json(done_message)
-            logger.info(f"Job {job_id} already finished, sent final message")
-        except Exception as e:
-            logger.error(f"Failed to send final message for job {job_id}: {e}")
-        finally:
-            await websocket.close()
+            event_offset(since)
+        except ValueError:
+            await websocket.close(code=1008, reason="Invalid since offset")
             return
 
-    # Subscribe to Redis pub/sub for progress updates
-    pubsub = await redis_client.subscribe_progress(job_id)
+    # Subscribes before reading the job so no event published in between is
+    # lost (one shared Redis subscription per process, see JobEventHub)
+    stream = JobEventStream(job_event_hub, job_id, since)
 
     try:
-        # Listen for messages from Redis pub/sub
-        async for message in pubsub.listen():
-            if message["type"] == "message":
-                try:
-                    # Parse and forward message to WebSocket client
-                    data = json.loads(message["data"])
-
-                    await websocket.send_json(data)
-
-                    logger.debug(f"Forwarded progress update for job {job_id}: {data.get('type')}")
-
-                    # Close connection after "done" event
-                    if data.get("type") == "done":
-                        logger.info(f"Job {job_id} completed, closing WebSocket")
-                        break
+        # Check if job exists
+        if not await stream.open():
+            await websocket.close(code=1008, reason=f"Job {job_id} not found")
+            logger.warning(f"WebSocket connection rejected: job {job_id} not found")
+            return
 
-                except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse message for job {job_id}: {e}")
-                    continue
+        # Accept WebSocket connection
+        await websocket.accept()
+        logger.info(f"WebSocket connected for job {job_id}")
 
-                except WebSocketDisconnect:
-                    logger.info(f"WebSocket disconnected for job {job_id}")
-                    break
+        async for event in stream.events():
+            await websocket.send_json(await artifact_url_service.sign_event(event))
+            logger.debug(f"Forwarded progress update for job {job_id}: {event.get('type')}")
 
-                except Exception as e:
-                    logger.error(f"Error forwarding message for job {job_id}: {e}")
-                    break
+        if stream.dropped:
+            # Dropped for falling behind; the client should reconnect with
+            # ?since= to pick up where it left off
+            await websocket.close(code=1013, reason="Client too slow, reconnect")
+        else:
+            logger.info(f"Job {job_id} completed, closing WebSocket")
 
     except WebSocketDisconnect:
         logger.info(f"Client disconnected WebSocket for job {job_id}")
@@ -187,13 +155,7 @@ async def job_progress_websocket(
         logger.exception(f"WebSocket error for job {job_id}: {e}")
 
     finally:
-        # Clean up pub/sub subscription
-        try:
-            await pubsub.unsubscribe()
-            await pubsub.close()
-            logger.debug(f"Unsubscribed from Redis channel for job {job_id}")
-        except Exception as e:
-            logger.error(f"Error unsubscribing from Redis for job {job_id}: {e}")
+        stream.close()
 
         # Close WebSocket if still open
         try:
@@ -0,0 +1,326 @@
+"""
+Asynchronous A/B test orchestration.
+
+An A/B test submits its variants as one job batch, stores the variant ->
+job mapping in Redis and returns. A background task per test follows the
+variant jobs through the shared job event hub (no polling: each follower
+sleeps until its job's ``done`` event) and records each variant's result
+as soon as its job finishes.
+
+Reads reconcile variants still marked pending against their jobs in one
+pipelined read, so a test stays readable and completes even if the process
+that followed it restarted or the event hub was down.
+"""
+
+import asyncio
+import logging
+import secrets
+from datetime import datetime, timezone
+from typing import Dict, Optional, Set
+
+from .job_events import JobEventHub, job_event_hub, TERMINAL_STATUSES
+from .job_queue import job_queue
+from .redis_client import RedisClient, redis_client
+from .artifact_urls import artifact_url_service
+from .monitoring import cost_tracker
+from ..models.requests import ABTestRequest, GenerateImageRequest
+from ..models.responses import ABTestResponse, ABTestVariantResult, ImageMetadata, JobStatus
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Worker job statuses -> JobStatus reported per variant
+VARIANT_STATUSES = {
+    "queued": JobStatus.QUEUED,
+    "running": JobStatus.PROCESSING,
+    "succeeded": JobStatus.COMPLETED,
+    "failed": JobStatus.FAILED,
+    "canceled": JobStatus.CANCELLED,
+    "expired": JobStatus.FAILED,
+}
+
+
+def variant_summary(job_data: Optional[dict]) -> dict:
+    """
+    Reduce a variant's job to the fields an A/B test reports.
+
+    Args:
+        job_data: Job data, or None if the job no longer exists
+
+    Returns:
+        Status, error, generation time and first artifact of the job
+    """
+    if not job_data:
+        return {"status": "failed", "error": "Job not found"}
+
+    generation_time = None
+    if job_data.get("started_at") and job_data.get("finished_at"):
+        started = datetime.fromisoformat(job_data["started_at"].replace('Z', '+00:00'))
+        finished = datetime.fromisoformat(job_data["finished_at"].replace('Z', '+00:00'))
+        generation_time = (finished - started).total_seconds()
+
+    artifacts = (job_data.get("result") or {}).get("artifacts") or []
+    error = job_data.get("error")
+
+    return {
+        "status": job_data.get("status", "failed"),
+        "error": error.get("message") if error else None,
+        "generation_time": generation_time,
+        "artifact": artifacts[0] if artifacts else None,
+    }
+
+
+class ABTestRunner:
+    """
+    Runs A/B tests as Redis-backed resources followed by job events.
+
+    Usage:
+        abtest = await abtest_runner.start_test(request)
+        ...
+        abtest = await abtest_runner.get_test(abtest.test_id)
+    """
+
+    def __init__(
+        self,
+        redis: RedisClient,
+        hub: JobEventHub,
+        follow_timeout: float = 1800
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            redis: Client the tests and their jobs are stored with
+            hub: Event hub the variant jobs are followed through
+            follow_timeout: Seconds to follow a test's jobs; later reads
+                still pick up results
+        """
+        self.redis = redis
+        self.hub = hub
+        self.follow_timeout = follow_timeout
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def start_test(self, request: ABTestRequest) -> ABTestResponse:
+        """
+        Submit every variant and start following their jobs.
+
+        Args:
+            request: A/B test request
+
+        Returns:
+            The new test, with every submitted variant queued
+
+        Raises:
+            RuntimeError: If the job queue is not connected
+        """
+        test_id = f"abtest_{secrets.token_hex(8)}"
+
+        results = await job_queue.submit_jobs([(variant.request, None) for variant in request.variants])
+
+        jobs: Dict[str, Optional[str]] = {}
+        for variant, result in zip(request.variants, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to submit variant '{variant.name}' of A/B test {test_id}: {result}")
+                jobs[variant.name] = None
+            else:
+                jobs[variant.name] = result.job_id
+
+        abtest = {
+            "test_id": test_id,
+            "request": request.model_dump(mode="json"),
+            "jobs": jobs,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        await self.redis.create_abtest(test_id, abtest)
+
+        task = asyncio.create_task(self._follow(test_id, jobs))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+        logger.info(
+            f"Started A/B test {test_id}: "
+            f"{sum(1 for job_id in jobs.values() if job_id)}/{len(jobs)} variants submitted"
+        )
+        queued = {name: {"status": "queued"} for name in jobs}
+        return await self._build_response(abtest, {}, queued)
+
+    async def get_test(self, test_id: str) -> Optional[ABTestResponse]:
+        """
+        Read an A/B test with the results gathered so far.
+
+        Variants not recorded yet are checked against their jobs; any that
+        finished meanwhile are recorded now.
+
+        Args:
+            test_id: A/B test identifier
+
+        Returns:
+            The test, or None if it doesn't exist (or expired)
+        """
+        abtest = await self.redis.get_abtest(test_id)
+        if not abtest:
+            return None
+
+        results = abtest["results"]
+        pending = {
+            name: job_id for name, job_id in abtest["jobs"].items()
+            if job_id and name not in results
+        }
+
+        live = {}
+        if pending:
+            jobs = await self.redis.get_jobs_many(list(pending.values()))
+            finished = {}
+            for name, job_id in pending.items():
+                summary = variant_summary(jobs.get(job_id))
+                if summary["status"] in TERMINAL_STATUSES:
+                    finished[name] = summary
+                else:
+                    live[name] = summary
+            await self.redis.record_abtest_variants(test_id, finished)
+            results.update(finished)
+
+        return await self._build_response(abtest, results, live)
+
+    async def stop(self) -> None:
+        """Stop following running tests (their results are picked up on read)."""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _follow(self, test_id: str, jobs: Dict[str, Optional[str]]) -> None:
+        """Record each variant's result when its job finishes."""
+        deadline = asyncio.get_running_loop().time() + self.follow_timeout
+        await asyncio.gather(*(
+            self._follow_variant(test_id, name, job_id, deadline)
+            for name, job_id in jobs.items()
+            if job_id
+        ))
+        logger.info(f"A/B test {test_id} finished following its jobs")
+
+    async def _follow_variant(self, test_id: str, name: str, job_id: str, deadline: float) -> None:
+        """Wait for one variant's job to finish and record its result."""
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    logger.warning(f"A/B test {test_id}: stopped following job {job_id} of variant '{name}'")
+                    return
+
+                # Only done events wake the follower; a resync re-reads as well
+                job_data = await self.hub.wait_for_change(job_id, remaining, wake_on=("done",))
+                if not job_data or job_data["status"] in TERMINAL_STATUSES:
+                    await self.redis.record_abtest_variants(test_id, {name: variant_summary(job_data)})
+                    return
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"A/B test {test_id}: failed to follow variant '{name}': {e}")
+
+    async def _build_response(
+        self,
+        abtest: dict,
+        results: Dict[str, dict],
+        live: Dict[str, dict]
+    ) -> ABTestResponse:
+        """Aggregate the variant results of a test."""
+        request = ABTestRequest.model_validate(abtest["request"])
+
+        variants = []
+        completed = failed = 0
+        total_cost = total_time = 0.0
+
+        for variant in request.variants:
+            job_id = abtest["jobs"].get(variant.name)
+            if not job_id:
+                variants.append(ABTestVariantResult(
+                    name=variant.name,
+                    job_id="",
+                    status=JobStatus.FAILED,
+                    error="Failed to submit job"
+                ))
+                failed += 1
+                continue
+
+            summary = results.get(variant.name) or live.get(variant.name)
+            result = await self._variant_result(variant.name, variant.request, job_id, summary)
+
+            if result.status == JobStatus.COMPLETED:
+                completed += 1
+            elif result.status == JobStatus.FAILED:
+                failed += 1
+            total_time += result.generation_time or 0.0
+            total_cost += result.estimated_cost or 0.0
+            variants.append(result)
+
+        finished = all(
+            name in results or not job_id for name, job_id in abtest["jobs"].items()
+        )
+
+        return ABTestResponse(
+            test_id=abtest["test_id"],
+            status="completed" if finished else "running",
+            base_prompt=request.base_prompt,
+            description=request.description,
+            variants=variants,
+            total_variants=len(request.variants),
+            completed_variants=completed,
+            failed_variants=failed,
+            total_cost=total_cost,
+            total_time=total_time,
+            created_at=datetime.fromisoformat(abtest["created_at"])
+        )
+
+    async def _variant_result(
+        self,
+        name: str,
+        request: GenerateImageRequest,
+        job_id: str,
+        summary: dict
+    ) -> ABTestVariantResult:
+        """Build one variant's result from its job summary."""
+        raw_status = summary["status"]
+        generation_time = summary.get("generation_time")
+
+        estimated_cost = 0.0
+        if generation_time:
+            cost_data = cost_tracker.estimate_cost(request.width, request.height, request.steps, 1)
+            estimated_cost = cost_data.get("estimated_cost_usd", 0.0)
+
+        metadata = None
+        if raw_status == "succeeded":
+            metadata = ImageMetadata(
+                prompt=request.prompt,
+                negative_prompt=request.negative_prompt,
+                width=request.width,
+                height=request.height,
+                steps=request.steps,
+                cfg_scale=request.cfg_scale,
+                sampler=request.sampler.value,
+                seed=request.seed or -1,
+                model=request.model,
+                generation_time=generation_time
+            )
+
+        # Signed at read time: stored URLs would expire
+        image_url = None
+        if summary.get("artifact"):
+            artifacts = await artifact_url_service.sign_artifacts([summary["artifact"]])
+            image_url = artifacts[0].get("url")
+
+        return ABTestVariantResult(
+            name=name,
+            job_id=job_id,
+            status=VARIANT_STATUSES.get(raw_status, JobStatus.FAILED),
+            image_url=image_url,
+            error=summary.get("error"),
+            metadata=metadata,
+            generation_time=generation_time,
+            estimated_cost=estimated_cost
+        )
+
+
+# Global instance
+abtest_runner = ABTestRunner(redis_client, job_event_hub, follow_timeout=settings.abtest_follow_timeout)
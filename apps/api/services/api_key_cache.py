@@ -0,0 +1,273 @@
+"""
+In-process cache for validated API keys.
+
+Every authenticated request validates its key at least twice (rate limit
+middleware, then the auth dependency). Validated keys are cached by key
+hash for a short TTL so repeat validations skip SHA256 lookups in Redis,
+revocations are broadcast over Redis pub/sub so every API process drops the
+key immediately, and ``last_used_at`` writes are coalesced into a periodic
+background flush instead of one blocking HSET per request.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from prometheus_client import Counter
+
+from ..models.auth import AuthenticatedUser
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Pub/sub channel carrying key hashes to evict
+INVALIDATION_CHANNEL = "cui:auth:invalidate"
+
+# Prometheus metrics
+API_KEY_CACHE = Counter(
+    "api_key_cache_total",
+    "API key validations by cache result",
+    ["result"]  # hit, miss
+)
+
+# Set last_used_at only on keys that still exist, so a flush never
+# resurrects a deleted or expired key as a TTL-less stub hash
+FLUSH_LAST_USED_LUA = """
+for i, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        redis.call('HSET', key, 'last_used_at', ARGV[i])
+    end
+end
+return #KEYS
+"""
+
+
+class APIKeyCache:
+    """
+    TTL-bounded LRU of key hash -> AuthenticatedUser.
+
+    Lifecycle:
+    - ``connect(redis)`` at startup starts the invalidation listener and
+      the ``last_used_at`` flusher
+    - ``disconnect()`` on shutdown flushes pending updates and stops both
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        max_entries: int = 10000,
+        flush_interval: float = 30.0
+    ):
+        """
+        Initialize cache (does not connect).
+
+        Args:
+            ttl: Seconds a validated key is trusted without re-checking Redis
+            max_entries: Maximum cached keys
+            flush_interval: Seconds between ``last_used_at`` flushes
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.flush_interval = flush_interval
+
+        self._entries: "OrderedDict[str, Tuple[AuthenticatedUser, float]]" = OrderedDict()
+        self._last_used: Dict[str, str] = {}
+        self._redis = None
+        self._flush_script = None
+        self._tasks: list[asyncio.Task] = []
+
+    # -------------------------------------------------------------------------
+    # Cache
+    # -------------------------------------------------------------------------
+
+    def get(self, key_hash: str) -> Optional[AuthenticatedUser]:
+        """
+        Get the cached user for a key hash.
+
+        Args:
+            key_hash: SHA256 of the API key
+
+        Returns:
+            AuthenticatedUser, or None if not cached or expired
+        """
+        entry = self._entries.get(key_hash)
+        if entry is None:
+            API_KEY_CACHE.labels(result="miss").inc()
+            return None
+
+        user, expires = entry
+        if time.monotonic() >= expires:
+            del self._entries[key_hash]
+            API_KEY_CACHE.labels(result="miss").inc()
+            return None
+
+        self._entries.move_to_end(key_hash)
+        API_KEY_CACHE.labels(result="hit").inc()
+        return user
+
+    def put(
+        self,
+        key_hash: str,
+        user: AuthenticatedUser,
+        key_expires_at: Optional[datetime] = None
+    ) -> None:
+        """
+        Cache a validated key.
+
+        Args:
+            key_hash: SHA256 of the API key
+            user: Validated user
+            key_expires_at: Key expiry (UTC); the entry never outlives it
+        """
+        ttl = self.ttl
+        if key_expires_at is not None:
+            ttl = min(ttl, (key_expires_at - datetime.utcnow()).total_seconds())
+        if ttl <= 0:
+            return
+
+        self._entries[key_hash] = (user, time.monotonic() + ttl)
+        self._entries.move_to_end(key_hash)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key_hash: str) -> None:
+        """Drop a key from this process's cache."""
+        self._entries.pop(key_hash, None)
+
+    def clear(self) -> None:
+        """Drop all cached keys."""
+        self._entries.clear()
+
+    async def broadcast_invalidation(self, key_hash: str) -> None:
+        """
+        Drop a key here and in every other API process.
+
+        Args:
+            key_hash: SHA256 of the revoked API key
+        """
+        self.invalidate(key_hash)
+        if self._redis is not None:
+            await self._redis.publish(INVALIDATION_CHANNEL, key_hash)
+
+    # -------------------------------------------------------------------------
+    # last_used_at coalescing
+    # -------------------------------------------------------------------------
+
+    def touch(self, redis_key: str) -> None:
+        """
+        Record that a key was used; written on the next flush.
+
+        Args:
+            redis_key: Redis hash holding the API key
+        """
+        self._last_used[redis_key] = datetime.utcnow().isoformat()
+
+    async def flush(self) -> int:
+        """
+        Write pending ``last_used_at`` values in one round trip.
+
+        Returns:
+            Number of keys flushed
+        """
+        if not self._last_used or self._redis is None:
+            return 0
+
+        pending, self._last_used = self._last_used, {}
+        if self._flush_script is None:
+            self._flush_script = self._redis.register_script(FLUSH_LAST_USED_LUA)
+
+        try:
+            await self._flush_script(keys=list(pending), args=list(pending.values()))
+        except Exception as e:
+            # Keep newer touches, retry the rest next time
+            for key, value in pending.items():
+                self._last_used.setdefault(key, value)
+            logger.warning(f"Failed to flush last_used_at for {len(pending)} API keys: {e}")
+            return 0
+
+        return len(pending)
+
+    # -------------------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------------------
+
+    async def connect(self, redis_conn) -> None:
+        """
+        Start the invalidation listener and periodic flusher.
+
+        Args:
+            redis_conn: Connected redis.asyncio client
+        """
+        if self._tasks:
+            return
+
+        self._redis = redis_conn
+        self._tasks = [
+            asyncio.create_task(self._listen()),
+            asyncio.create_task(self._flush_loop()),
+        ]
+        logger.info(
+            f"API key cache ready (ttl={self.ttl}s, max_entries={self.max_entries}, "
+            f"flush_interval={self.flush_interval}s)"
+        )
+
+    async def disconnect(self) -> None:
+        """Stop background tasks and flush pending updates."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        await self.flush()
+        self._redis = None
+        self.clear()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def _listen(self) -> None:
+        """Evict keys revoked by any process; clear everything after reconnects."""
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Revocations may have been missed while unsubscribed
+                self.clear()
+
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._handle_message(message["data"])
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"API key invalidation listener error: {e}")
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+            await asyncio.sleep(1.0)
+
+    def _handle_message(self, data) -> None:
+        key_hash = data.decode() if isinstance(data, bytes) else data
+        self.invalidate(key_hash)
+        logger.debug(f"Invalidated cached API key {key_hash[:16]}...")
+
+
+# Global instance
+api_key_cache = APIKeyCache(
+    ttl=settings.api_key_cache_ttl,
+    max_entries=settings.api_key_cache_size,
+    flush_interval=settings.api_key_last_used_flush_interval
+)
@@ -0,0 +1,154 @@
+"""
+Streaming artifact transfer from ComfyUI to object storage.
+
+Images are piped from ComfyUI's ``/view`` endpoint straight into a
+multipart upload: the HTTP response is read chunk by chunk on the event
+loop while the (synchronous) MinIO upload runs on the storage thread pool
+(see ``AsyncStorageClient``), so at most one multipart part is held in
+memory per transfer and the loop is never blocked by storage I/O. Batches
+fan out over several transfers at once, bounded by
+``settings.artifact_transfer_concurrency``.
+"""
+
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, List, Optional, Tuple, Union
+
+import httpx
+
+from ..config import settings
+from ..routers.metrics import record_storage_upload
+
+logger = logging.getLogger(__name__)
+
+
+class _AsyncStreamReader:
+    """
+    Blocking file-like view over an async byte iterator.
+
+    ``read()`` is called from a worker thread and fetches the next chunk
+    by scheduling ``__anext__`` on the event loop that owns the iterator.
+    """
+
+    def __init__(self, chunks: AsyncIterator[bytes], loop: asyncio.AbstractEventLoop):
+        self._chunks = chunks
+        self._loop = loop
+        self._buffer = bytearray()
+        self._eof = False
+        self.bytes_read = 0
+
+    def _next_chunk(self) -> Optional[bytes]:
+        future = asyncio.run_coroutine_threadsafe(self._chunks.__anext__(), self._loop)
+        try:
+            return future.result()
+        except StopAsyncIteration:
+            return None
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._eof and (size < 0 or len(self._buffer) < size):
+            chunk = self._next_chunk()
+            if chunk is None:
+                self._eof = True
+            else:
+                self._buffer.extend(chunk)
+
+        if size < 0 or size >= len(self._buffer):
+            data = bytes(self._buffer)
+            self._buffer.clear()
+        else:
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+
+        self.bytes_read += len(data)
+        return data
+
+
+async def transfer_artifact(
+    http: httpx.AsyncClient,
+    url: str,
+    storage,
+    object_name: str,
+    content_type: str = "image/png",
+    part_size: Optional[int] = None,
+    timeout: float = 60.0
+) -> int:
+    """
+    Stream a ComfyUI output into object storage.
+
+    Args:
+        http: HTTP client used to fetch the artifact
+        url: Artifact URL (ComfyUI ``/view``)
+        storage: AsyncStorageClient
+        object_name: Destination object key
+        content_type: MIME type
+        part_size: Multipart chunk size (defaults to ``settings.artifact_part_size``)
+        timeout: Download timeout in seconds
+
+    Returns:
+        Number of bytes transferred
+
+    Raises:
+        httpx.HTTPError: If the download fails
+        RuntimeError: If the artifact is empty
+        S3Error: If the upload fails
+    """
+    part_size = part_size or settings.artifact_part_size
+    loop = asyncio.get_running_loop()
+    start = time.monotonic()
+
+    try:
+        async with http.stream("GET", url, timeout=timeout) as response:
+            response.raise_for_status()
+            reader = _AsyncStreamReader(response.aiter_bytes(), loop)
+
+            await storage.upload_stream(object_name, reader, content_type, part_size)
+
+        if reader.bytes_read == 0:
+            raise RuntimeError(f"Downloaded 0 bytes from {url}")
+
+    except Exception:
+        record_storage_upload(False)
+        raise
+
+    duration = time.monotonic() - start
+    record_storage_upload(True, reader.bytes_read, duration)
+    logger.debug(f"Transferred {reader.bytes_read} bytes to {object_name} in {duration:.2f}s")
+    return reader.bytes_read
+
+
+async def transfer_artifacts(
+    http: httpx.AsyncClient,
+    transfers: List[Tuple[str, str]],
+    storage,
+    content_type: str = "image/png",
+    concurrency: Optional[int] = None
+) -> List[Union[int, Exception]]:
+    """
+    Stream several ComfyUI outputs into object storage concurrently.
+
+    A failed transfer does not cancel the others; its exception is
+    returned in place of the byte count.
+
+    Args:
+        http: HTTP client used to fetch the artifacts
+        transfers: ``(url, object_name)`` pairs
+        storage: AsyncStorageClient
+        content_type: MIME type
+        concurrency: Maximum parallel transfers
+            (defaults to ``settings.artifact_transfer_concurrency``)
+
+    Returns:
+        Bytes transferred or the raised exception, in input order
+    """
+    semaphore = asyncio.Semaphore(concurrency or settings.artifact_transfer_concurrency)
+
+    async def run(url: str, object_name: str) -> Union[int, Exception]:
+        async with semaphore:
+            try:
+                return await transfer_artifact(http, url, storage, object_name, content_type)
+            except Exception as e:
+                logger.error(f"Failed to transfer {url} to {object_name}: {e}")
+                return e
+
+    return await asyncio.gather(*(run(url, name) for url, name in transfers))
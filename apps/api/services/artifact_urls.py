@@ -0,0 +1,182 @@
+"""
+Lazy presigned-URL signing for job artifacts.
+
+Workers store only the object key of each artifact; URLs are signed when a
+job is read, so links handed to clients are always fresh. Signing time is
+aligned to ``artifact_url_resign_interval`` buckets, which makes the URL for
+a given object identical within a bucket (and across API processes), so it
+can be memoized in an in-process LRU cache and re-signed only once the
+bucket rolls over. Every returned URL stays valid for at least
+``artifact_url_ttl - artifact_url_resign_interval`` seconds.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from prometheus_client import Counter
+
+from .async_storage import AsyncStorageClient, async_storage_client
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics
+ARTIFACT_URL_CACHE = Counter(
+    "artifact_url_cache_total",
+    "Artifact URL lookups by cache result",
+    ["result"]  # hit, miss
+)
+
+
+class ArtifactURLService:
+    """
+    Signs artifact URLs on demand with an LRU cache.
+
+    Cache entries are keyed by ``(object_key, bucket_start)``; entries for
+    an old bucket are never hit again and age out of the LRU.
+    """
+
+    def __init__(
+        self,
+        storage: AsyncStorageClient,
+        ttl: int = 3600,
+        resign_interval: int = 900,
+        max_entries: int = 10000
+    ):
+        """
+        Initialize the service.
+
+        Args:
+            storage: Storage client used for signing
+            ttl: Validity of each signed URL in seconds
+            resign_interval: Signing-time bucket size in seconds
+                (must be smaller than ``ttl``)
+            max_entries: Maximum cached URLs
+        """
+        if resign_interval >= ttl:
+            raise ValueError("resign_interval must be smaller than ttl")
+
+        self.storage = storage
+        self.ttl = ttl
+        self.resign_interval = resign_interval
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple[str, int], str]" = OrderedDict()
+
+    def _bucket_start(self, now: Optional[float] = None) -> int:
+        now = time.time() if now is None else now
+        return int(now) - int(now) % self.resign_interval
+
+    async def get_url(self, object_key: str) -> str:
+        """
+        Get a presigned GET URL for an object.
+
+        Args:
+            object_key: Object key/path in the artifacts bucket
+
+        Returns:
+            Presigned URL valid for at least ``ttl - resign_interval`` seconds
+        """
+        bucket = self._bucket_start()
+        key = (object_key, bucket)
+
+        url = self._cache.get(key)
+        if url is not None:
+            self._cache.move_to_end(key)
+            ARTIFACT_URL_CACHE.labels(result="hit").inc()
+            return url
+
+        ARTIFACT_URL_CACHE.labels(result="miss").inc()
+        url = await self.storage.get_presigned_url(
+            object_key,
+            expires=timedelta(seconds=self.ttl),
+            request_date=datetime.fromtimestamp(bucket, tz=timezone.utc)
+        )
+
+        self._cache[key] = url
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+        return url
+
+    async def _try_get_url(self, object_key: str) -> Optional[str]:
+        """Like ``get_url``, but logs and returns None if signing fails."""
+        try:
+            return await self.get_url(object_key)
+        except Exception as e:
+            logger.warning(f"Could not sign URL for artifact {object_key}: {e}")
+            return None
+
+    async def sign_artifacts(self, artifacts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Fill in ``url`` for every artifact that has an ``object_key``.
+
+        Artifacts without a key (jobs stored before lazy signing) are
+        returned unchanged. If signing fails (e.g. storage is not
+        connected), ``url`` is left unset so the job stays readable.
+
+        Args:
+            artifacts: Artifact dicts as stored in the job result
+
+        Returns:
+            New list of artifact dicts
+        """
+        signed = []
+        for artifact in artifacts:
+            object_key = artifact.get("object_key")
+            if object_key:
+                url = await self._try_get_url(object_key)
+                if url is not None:
+                    artifact = {**artifact, "url": url}
+            signed.append(artifact)
+        return signed
+
+    async def sign_result(self, result: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Sign the artifacts of a job result.
+
+        Args:
+            result: Job result dict (``artifacts``, ``generation_time``) or None
+
+        Returns:
+            Copy of the result with artifact URLs filled in
+        """
+        if not result or not result.get("artifacts"):
+            return result
+        return {**result, "artifacts": await self.sign_artifacts(result["artifacts"])}
+
+    async def sign_event(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Sign the URLs in a job progress event.
+
+        Workers publish ``artifact`` events with an ``object_key`` and
+        ``done`` events with the raw result; both get URLs filled in.
+
+        Args:
+            event: Event dict (modified in place)
+
+        Returns:
+            The event
+        """
+        if event.get("type") == "artifact" and event.get("object_key"):
+            url = await self._try_get_url(event["object_key"])
+            if url is not None:
+                event["url"] = url
+        elif event.get("result"):
+            event["result"] = await self.sign_result(event["result"])
+        return event
+
+    def clear(self) -> None:
+        """Drop all cached URLs."""
+        self._cache.clear()
+
+
+# Global instance
+artifact_url_service = ArtifactURLService(
+    storage=async_storage_client,
+    ttl=settings.artifact_url_ttl,
+    resign_interval=settings.artifact_url_resign_interval,
+    max_entries=settings.artifact_url_cache_size
+)
@@ -0,0 +1,203 @@
+"""
+Non-blocking facade over the synchronous storage client.
+
+The MinIO SDK is blocking, so every call is run on a dedicated, bounded
+thread pool instead of the event loop that also serves other requests and
+jobs. The pool size caps concurrent storage calls per process; the MinIO
+HTTP connection pool (``storage_max_pool_connections``) should be at least
+as large so threads never wait on a connection.
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, BinaryIO, Callable, Optional, TYPE_CHECKING
+
+from prometheus_client import Gauge, Histogram
+
+from ..config import settings
+
+if TYPE_CHECKING:
+    from .storage_client import StorageClient
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics
+STORAGE_OPERATION_SECONDS = Histogram(
+    "storage_operation_duration_seconds",
+    "Storage operation latency, including time queued for a thread",
+    ["operation", "status"],
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+)
+STORAGE_OPERATIONS_IN_FLIGHT = Gauge(
+    "storage_operations_in_flight",
+    "Storage operations submitted to the thread pool and not yet finished"
+)
+
+
+class AsyncStorageClient:
+    """
+    Async wrapper running ``StorageClient`` calls on a bounded executor.
+
+    Lifecycle:
+    - ``connect()`` during application/worker startup (creates the pool and,
+      unless a client was injected, the MinIO client off the event loop)
+    - ``disconnect()`` on shutdown waits for running calls, then stops the pool
+    """
+
+    def __init__(
+        self,
+        storage: Optional["StorageClient"] = None,
+        max_workers: int = 8
+    ):
+        """
+        Initialize facade (does not connect).
+
+        Args:
+            storage: Synchronous client to wrap (defaults to the global
+                ``storage_client``, loaded on ``connect()``)
+            max_workers: Maximum concurrent storage calls
+        """
+        self._storage = storage
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def connected(self) -> bool:
+        """Whether the thread pool is running."""
+        return self._executor is not None
+
+    async def connect(self) -> None:
+        """Start the thread pool and load the storage client."""
+        if self._executor is not None:
+            return
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="storage"
+        )
+
+        if self._storage is None:
+            # Importing the module creates the MinIO client and checks the
+            # bucket, which is network I/O
+            loop = asyncio.get_running_loop()
+            try:
+                self._storage = await loop.run_in_executor(self._executor, _load_default_storage)
+            except Exception:
+                executor, self._executor = self._executor, None
+                executor.shutdown(wait=False)
+                raise
+
+        logger.info(f"Async storage client ready (max_workers={self.max_workers})")
+
+    async def disconnect(self) -> None:
+        """Wait for running calls to finish and stop the thread pool."""
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return
+
+        await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+        logger.info("Async storage client closed")
+
+    def _get_storage(self) -> "StorageClient":
+        if self._storage is None:
+            raise RuntimeError("Async storage client not connected. Call connect() first.")
+        return self._storage
+
+    async def _run(self, operation: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking storage call on the pool and record its latency."""
+        if self._executor is None:
+            raise RuntimeError("Async storage client not connected. Call connect() first.")
+
+        loop = asyncio.get_running_loop()
+        start = time.monotonic()
+        status = "success"
+        STORAGE_OPERATIONS_IN_FLIGHT.inc()
+
+        try:
+            return await loop.run_in_executor(self._executor, lambda: func(*args, **kwargs))
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            STORAGE_OPERATIONS_IN_FLIGHT.dec()
+            STORAGE_OPERATION_SECONDS.labels(operation=operation, status=status).observe(
+                time.monotonic() - start
+            )
+
+    async def upload_bytes(
+        self,
+        object_name: str,
+        data: bytes,
+        content_type: str = "application/octet-stream"
+    ) -> str:
+        """Upload bytes. See ``StorageClient.upload_bytes``."""
+        storage = self._get_storage()
+        return await self._run("upload_bytes", storage.upload_bytes, object_name, data, content_type)
+
+    async def upload_stream(
+        self,
+        object_name: str,
+        data: BinaryIO,
+        content_type: str = "application/octet-stream",
+        part_size: int = 5 * 1024 * 1024
+    ) -> str:
+        """Multipart-upload a stream. See ``StorageClient.upload_stream``."""
+        storage = self._get_storage()
+        return await self._run(
+            "upload_stream", storage.upload_stream, object_name, data, content_type, part_size
+        )
+
+    async def upload_json(self, object_name: str, data: dict) -> str:
+        """Upload a dict as JSON. See ``StorageClient.upload_json``."""
+        storage = self._get_storage()
+        return await self._run("upload_json", storage.upload_json, object_name, data)
+
+    async def get_presigned_url(
+        self,
+        object_name: str,
+        expires: timedelta = timedelta(hours=1),
+        request_date: Optional[datetime] = None
+    ) -> str:
+        """Generate a presigned GET URL. See ``StorageClient.get_presigned_url``."""
+        storage = self._get_storage()
+        return await self._run(
+            "presign", storage.get_presigned_url, object_name,
+            expires=expires, request_date=request_date
+        )
+
+    async def delete_object(self, object_name: str) -> None:
+        """Delete an object. See ``StorageClient.delete_object``."""
+        storage = self._get_storage()
+        await self._run("delete_object", storage.delete_object, object_name)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        """Delete all objects under a prefix. See ``StorageClient.delete_prefix``."""
+        storage = self._get_storage()
+        await self._run("delete_prefix", storage.delete_prefix, prefix)
+
+    async def object_exists(self, object_name: str) -> bool:
+        """Check if an object exists. See ``StorageClient.object_exists``."""
+        storage = self._get_storage()
+        return await self._run("stat", storage.object_exists, object_name)
+
+    async def get_object_info(self, object_name: str) -> Optional[dict]:
+        """Get object metadata. See ``StorageClient.get_object_info``."""
+        storage = self._get_storage()
+        return await self._run("stat", storage.get_object_info, object_name)
+
+    async def health_check(self) -> bool:
+        """Check if storage is accessible. See ``StorageClient.health_check``."""
+        storage = self._get_storage()
+        return await self._run("health_check", storage.health_check)
+
+
+def _load_default_storage() -> "StorageClient":
+    from .storage_client import storage_client
+    return storage_client
+
+
+# Global instance
+async_storage_client = AsyncStorageClient(max_workers=settings.storage_max_workers)
@@ -27,12 +27,14 @@ from ..models.auth import (
 )
 from ..config import settings, ROLE_QUOTAS
 from .redis_client import redis_client
+from .api_key_cache import api_key_cache
 
 logger = logging.getLogger(__name__)
 
 # Redis key prefixes
 USER_KEY_PREFIX = "cui:user:"
 APIKEY_KEY_PREFIX = "cui:apikey:"
+APIKEY_ID_PREFIX = "cui:apikey_id:"  # key_id -> key_hash index
 USER_KEYS_PREFIX = "cui:user_keys:"  # Set of key IDs for a user
 
 
@@ -243,9 +245,13 @@ class AuthService:
             revoked_at=None,
         )
 
-        # Store in Redis
+        # Store key, key_id index and user's key set in one transaction
         key_key = f"{APIKEY_KEY_PREFIX}{key_hash}"
-        await self.redis.hset(
+        index_key = f"{APIKEY_ID_PREFIX}{key_id}"
+        user_keys_key = f"{USER_KEYS_PREFIX}{user_id}"
+
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(
             key_key,
             mapping={
                 "key_id": api_key_obj.key_id,
@@ -261,14 +267,17 @@ class AuthService:
             }
         )
 
-        # Add TTL if expires
+        pipe.set(index_key, key_hash)
+
+        # Add TTL if expires (index expires with the key)
         if expires_at:
             ttl_seconds = int((expires_at - created_at).total_seconds())
-            await self.redis.expire(key_key, ttl_seconds)
+            pipe.expire(key_key, ttl_seconds)
+            pipe.expire(index_key, ttl_seconds)
 
         # Add to user's key set
-        user_keys_key = f"{USER_KEYS_PREFIX}{user_id}"
-        await self.redis.sadd(user_keys_key, key_id)
+        pipe.sadd(user_keys_key, key_id)
+        await pipe.execute()
 
         logger.info(f"Created API key {key_id} for user {user_id}")
 
@@ -296,6 +305,12 @@ class AuthService:
         key_hash = self.hash_api_key(api_key)
         key_key = f"{APIKEY_KEY_PREFIX}{key_hash}"
 
+        # Recently validated keys skip Redis (revocations evict via pub/sub)
+        cached = api_key_cache.get(key_hash)
+        if cached is not None:
+            api_key_cache.touch(key_key)
+            return cached
+
         # Get key data
         key_data = await self.redis.hgetall(key_key)
         if not key_data:
@@ -308,6 +323,7 @@ class AuthService:
             return None
 
         # Check if expired
+        expires_at = None
         if key_data["expires_at"]:
             expires_at = datetime.fromisoformat(key_data["expires_at"])
             if datetime.utcnow() > expires_at:
@@ -325,12 +341,12 @@ class AuthService:
             logger.warning(f"User inactive: {user.user_id}")
             return None
 
-        # Update last_used_at (async, no need to wait)
-        await self.redis.hset(key_key, "last_used_at", datetime.utcnow().isoformat())
+        # Update last_used_at on the next background flush
+        api_key_cache.touch(key_key)
 
         logger.debug(f"API key validated for user {user.user_id}")
 
-        return AuthenticatedUser(
+        authenticated = AuthenticatedUser(
             user_id=user.user_id,
             email=user.email,
             role=user.role,
@@ -338,11 +354,18 @@ class AuthService:
             quota_concurrent=user.quota_concurrent,
             rate_limit_per_minute=user.rate_limit_per_minute,
         )
+        api_key_cache.put(key_hash, authenticated, key_expires_at=expires_at)
+
+        return authenticated
 
     async def list_user_keys(self, user_id: str) -> list[APIKeyInfo]:
         """
         List all API keys for a user.
 
+        Resolves key IDs through the key_id index and fetches every key in
+        one pipeline, so the number of round trips does not grow with the
+        number of keys.
+
         Args:
             user_id: User ID
 
@@ -350,60 +373,58 @@ class AuthService:
             List of APIKeyInfo objects
         """
         user_keys_key = f"{USER_KEYS_PREFIX}{user_id}"
-        key_ids = await self.redis.smembers(user_keys_key)
+        key_ids = sorted(await self.redis.smembers(user_keys_key))
 
         if not key_ids:
             return []
 
-        keys = []
-        for key_id in key_ids:
-            # Find key by key_id (need to scan)
-            # This is inefficient - in production, maintain a key_id -> key_hash index
-            key_info = await self._get_key_by_id(key_id)
-            if key_info:
-                keys.append(key_info)
+        key_hashes = await self.redis.mget([f"{APIKEY_ID_PREFIX}{key_id}" for key_id in key_ids])
 
-        return keys
+        pipe = self.redis.pipeline(transaction=False)
+        for key_hash in key_hashes:
+            if key_hash:
+                pipe.hgetall(f"{APIKEY_KEY_PREFIX}{key_hash}")
+        results = await pipe.execute()
+
+        # Keys that expired (or predate the index) are skipped
+        return [self._parse_key_info(key_data) for key_data in results if key_data]
 
     async def _get_key_by_id(self, key_id: str) -> Optional[APIKeyInfo]:
         """
         Get API key info by key_id.
 
-        This is a helper that scans for the key. In production,
-        maintain a key_id -> key_hash index.
-
         Args:
             key_id: Key ID
 
         Returns:
             APIKeyInfo or None
         """
-        # Scan all apikey:* keys (inefficient but works for now)
-        pattern = f"{APIKEY_KEY_PREFIX}*"
-        cursor = 0
-        while True:
-            cursor, keys = await self.redis.scan(cursor, match=pattern, count=100)
-            for key in keys:
-                key_data = await self.redis.hgetall(key)
-                if key_data and key_data.get("key_id") == key_id:
-                    return APIKeyInfo(
-                        key_id=key_data["key_id"],
-                        user_id=key_data["user_id"],
-                        name=key_data["name"] or None,
-                        role=UserRole(key_data["role"]),
-                        created_at=datetime.fromisoformat(key_data["created_at"]),
-                        last_used_at=datetime.fromisoformat(key_data["last_used_at"])
-                        if key_data["last_used_at"]
-                        else None,
-                        expires_at=datetime.fromisoformat(key_data["expires_at"])
-                        if key_data["expires_at"]
-                        else None,
-                        is_active=key_data["is_active"] == "True",
-                    )
-            if cursor == 0:
-                break
+        key_hash = await self.redis.get(f"{APIKEY_ID_PREFIX}{key_id}")
+        if not key_hash:
+            return None
+
+        key_data = await self.redis.hgetall(f"{APIKEY_KEY_PREFIX}{key_hash}")
+        if not key_data:
+            return None
 
-        return None
+        return self._parse_key_info(key_data)
+
+    def _parse_key_info(self, key_data: dict) -> APIKeyInfo:
+        """Build APIKeyInfo from a stored API key hash."""
+        return APIKeyInfo(
+            key_id=key_data["key_id"],
+            user_id=key_data["user_id"],
+            name=key_data["name"] or None,
+            role=UserRole(key_data["role"]),
+            created_at=datetime.fromisoformat(key_data["created_at"]),
+            last_used_at=datetime.fromisoformat(key_data["last_used_at"])
+            if key_data["last_used_at"]
+            else None,
+            expires_at=datetime.fromisoformat(key_data["expires_at"])
+            if key_data["expires_at"]
+            else None,
+            is_active=key_data["is_active"] == "True",
+        )
 
     async def revoke_api_key(self, key_id: str, user_id: str) -> bool:
         """
@@ -419,40 +440,79 @@ class AuthService:
         Raises:
             ValueError: If key doesn't belong to user
         """
-        # Get key info
-        key_info = await self._get_key_by_id(key_id)
-        if not key_info:
+        # Resolve key_id -> key_hash via the index
+        key_hash = await self.redis.get(f"{APIKEY_ID_PREFIX}{key_id}")
+        if not key_hash:
+            return False
+
+        key_key = f"{APIKEY_KEY_PREFIX}{key_hash}"
+        key_data = await self.redis.hgetall(key_key)
+        if not key_data:
             return False
 
         # Check ownership
-        if key_info.user_id != user_id:
+        if key_data["user_id"] != user_id:
             raise ValueError(f"API key {key_id} does not belong to user {user_id}")
 
-        # Find the actual key in Redis (we have key_id, need key_hash)
-        # Scan to find it (inefficient, but works)
-        pattern = f"{APIKEY_KEY_PREFIX}*"
+        # Mark as inactive and remove from user's key set atomically
+        # (the index is kept so revoked keys stay addressable until they expire)
+        revoked_at = datetime.utcnow()
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(key_key, mapping={"is_active": "False", "revoked_at": revoked_at.isoformat()})
+        pipe.srem(f"{USER_KEYS_PREFIX}{user_id}", key_id)
+        await pipe.execute()
+
+        # Drop cached validations in every API process
+        await api_key_cache.broadcast_invalidation(key_hash)
+
+        logger.info(f"Revoked API key {key_id} for user {user_id}")
+        return True
+
+    async def backfill_key_id_index(self, batch_size: int = 500) -> int:
+        """
+        Build the key_id -> key_hash index for keys created before it existed.
+
+        Scans ``cui:apikey:*`` once; each index entry gets the remaining TTL
+        of its key. Safe to run repeatedly.
+
+        Args:
+            batch_size: Keys handled per SCAN page / pipeline
+
+        Returns:
+            Number of index entries written
+        """
+        written = 0
         cursor = 0
         while True:
-            cursor, keys = await self.redis.scan(cursor, match=pattern, count=100)
-            for key in keys:
-                key_data = await self.redis.hgetall(key)
-                if key_data and key_data.get("key_id") == key_id:
-                    # Mark as inactive
-                    revoked_at = datetime.utcnow()
-                    await self.redis.hset(key, "is_active", "False")
-                    await self.redis.hset(key, "revoked_at", revoked_at.isoformat())
-
-                    # Remove from user's key set
-                    user_keys_key = f"{USER_KEYS_PREFIX}{user_id}"
-                    await self.redis.srem(user_keys_key, key_id)
-
-                    logger.info(f"Revoked API key {key_id} for user {user_id}")
-                    return True
+            cursor, keys = await self.redis.scan(
+                cursor, match=f"{APIKEY_KEY_PREFIX}*", count=batch_size
+            )
+
+            if keys:
+                pipe = self.redis.pipeline(transaction=False)
+                for key in keys:
+                    pipe.hget(key, "key_id")
+                    pipe.pttl(key)
+                fetched = await pipe.execute()
+
+                pipe = self.redis.pipeline(transaction=False)
+                for key, key_id, pttl in zip(keys, fetched[::2], fetched[1::2]):
+                    # pttl is -2 if the key expired since the scan
+                    if not key_id or pttl == -2:
+                        continue
+                    pipe.set(
+                        f"{APIKEY_ID_PREFIX}{key_id}",
+                        key[len(APIKEY_KEY_PREFIX):],
+                        px=pttl if pttl > 0 else None
+                    )
+                    written += 1
+                await pipe.execute()
 
             if cursor == 0:
                 break
 
-        return False
+        logger.info(f"Backfilled {written} API key index entries")
+        return written
 
 
 # Singleton instance
@@ -0,0 +1,308 @@
+"""
+Checkpoint-affinity scheduling across several ComfyUI backends.
+
+Loading a different checkpoint (``CheckpointLoaderSimple``) is the most
+expensive step ComfyUI takes, so jobs are routed to a backend that already
+has their model loaded, unless its queue is more than ``max_queue_gap``
+prompts deeper than the least loaded backend's. Each backend keeps its
+own connection pool and event listener (``ComfyUIConnectionPool``).
+
+A background task (one per process) probes every backend with a single
+``health_check()`` attempt and reads ``/queue`` for its depth and for the
+checkpoint its last queued prompt loads, so state written by other API
+processes and workers is picked up too. Between probes, routing decisions
+made here update both.
+
+Health is cached behind a circuit breaker per backend: after
+``failure_threshold`` consecutive failed probes the breaker opens and the
+backend is skipped; the next successful probe closes it. Request paths
+read ``comfyui_backends.healthy`` instead of probing ComfyUI themselves.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from prometheus_client import Counter, Gauge
+
+from .comfyui_client import ComfyUIClient, COMFY_QUEUE_DEPTH
+from .comfyui_pool import ComfyUIConnectionPool, comfyui_pool
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics
+COMFY_ROUTING_DECISIONS = Counter(
+    "comfy_routing_decisions_total",
+    "ComfyUI backend selections",
+    ["backend", "reason"]  # warm, cold (checkpoint switch), least_loaded, no_healthy_backend
+)
+COMFY_BACKEND_HEALTHY = Gauge(
+    "comfy_backend_healthy",
+    "Whether a ComfyUI backend passed its last health check (1) or not (0)",
+    ["backend"]
+)
+COMFY_BREAKER_TRANSITIONS = Counter(
+    "comfy_breaker_transitions_total",
+    "ComfyUI backend circuit breaker transitions",
+    ["backend", "state"]  # open, closed
+)
+COMFY_BACKEND_QUEUE_DEPTH = Gauge(
+    "comfy_backend_queue_depth",
+    "Prompts running or pending on a ComfyUI backend at the last probe",
+    ["backend"]
+)
+
+
+def queued_checkpoint(queue: Dict[str, Any]) -> Optional[str]:
+    """
+    Checkpoint the backend will have loaded once its queue drains.
+
+    Args:
+        queue: ComfyUI ``/queue`` response; entries are
+            ``[number, prompt_id, prompt, extra_data, outputs]``
+
+    Returns:
+        ``ckpt_name`` of the last queued (or running) prompt's
+        CheckpointLoaderSimple, or None if the queue is empty
+    """
+    entries = sorted(queue.get("queue_pending") or [], key=lambda entry: entry[0])
+    entries = (queue.get("queue_running") or []) + entries
+
+    for entry in reversed(entries):
+        prompt = entry[2] if len(entry) > 2 and isinstance(entry[2], dict) else {}
+        for node in prompt.values():
+            if isinstance(node, dict) and node.get("class_type") == "CheckpointLoaderSimple":
+                return node.get("inputs", {}).get("ckpt_name")
+    return None
+
+
+class ComfyUIBackend:
+    """One ComfyUI instance and what the scheduler knows about it."""
+
+    def __init__(self, pool: ComfyUIConnectionPool):
+        self.pool = pool
+        self.name = urlsplit(pool.base_url).netloc or pool.base_url
+        self.healthy = True  # until the first probe says otherwise
+        self.probed = False
+        self.failures = 0  # consecutive failed probes
+        self.queue_depth = 0
+        self.routed = 0  # prompts routed here since the last probe
+        self.checkpoint: Optional[str] = None
+
+    @property
+    def load(self) -> int:
+        """Estimated queue depth: last probe plus what was routed since."""
+        return self.queue_depth + self.routed
+
+
+class ComfyUIBackendPool:
+    """
+    Routes ComfyUI clients to backends by checkpoint affinity and load.
+
+    Lifecycle mirrors ``ComfyUIConnectionPool``: ``connect()`` at startup,
+    ``get_client(checkpoint)`` per request or job, ``disconnect()`` on
+    shutdown. With a single backend every call returns that backend, and
+    the pool serves as the process's ComfyUI health monitor.
+    """
+
+    def __init__(
+        self,
+        pools: List[ComfyUIConnectionPool],
+        refresh_interval: float = 5.0,
+        max_queue_gap: int = 2,
+        failure_threshold: int = 3,
+        probe_timeout: float = 2.0
+    ):
+        """
+        Initialize the backend pool (does not connect).
+
+        Args:
+            pools: One connection pool per ComfyUI backend
+            refresh_interval: Seconds between health and queue probes
+            max_queue_gap: How many more queued prompts a backend with the
+                checkpoint loaded may have than the least loaded one and
+                still be preferred
+            failure_threshold: Consecutive failed probes that open a
+                backend's circuit breaker
+            probe_timeout: Timeout of each probe request in seconds
+        """
+        if not pools:
+            raise ValueError("At least one ComfyUI backend is required")
+
+        self.backends = [ComfyUIBackend(pool) for pool in pools]
+        self.refresh_interval = refresh_interval
+        self.max_queue_gap = max_queue_gap
+        self.failure_threshold = failure_threshold
+        self.probe_timeout = probe_timeout
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def healthy(self) -> bool:
+        """Whether any backend's breaker is closed (cached, no I/O)."""
+        return any(backend.healthy for backend in self.backends)
+
+    async def connect(self) -> None:
+        """Open every backend's connection pool, probe once and keep probing."""
+        for backend in self.backends:
+            await backend.pool.connect()
+
+        if self._task is None:
+            await self.refresh()
+            self._task = asyncio.create_task(self._run())
+            logger.info(
+                f"ComfyUI health monitor probing {len(self.backends)} backend(s) "
+                f"every {self.refresh_interval}s: "
+                f"{', '.join(backend.name for backend in self.backends)}"
+            )
+
+    async def disconnect(self) -> None:
+        """Stop probing and drain every backend's connection pool."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        for backend in self.backends:
+            await backend.pool.disconnect()
+
+    def select(self, checkpoint: Optional[str] = None, record: bool = True) -> ComfyUIBackend:
+        """
+        Pick the backend for a prompt.
+
+        Among healthy backends (all of them if none is healthy), prefer
+        the least loaded one that already has ``checkpoint`` loaded,
+        unless it is more than ``max_queue_gap`` prompts deeper than the
+        least loaded backend overall.
+
+        Args:
+            checkpoint: Checkpoint the prompt loads (None if unknown)
+            record: Count the selection as a routed prompt; False for
+                callers that do not submit one (health checks, /models)
+
+        Returns:
+            The chosen backend (its state is updated for the new prompt
+            when ``record`` is set)
+        """
+        candidates = [backend for backend in self.backends if backend.healthy]
+        if candidates:
+            reason = "least_loaded"
+        else:
+            candidates = self.backends
+            reason = "no_healthy_backend"
+
+        chosen = min(candidates, key=lambda backend: backend.load)
+
+        if checkpoint:
+            warm = [backend for backend in candidates if backend.checkpoint == checkpoint]
+            if warm:
+                best_warm = min(warm, key=lambda backend: backend.load)
+                if best_warm.load - chosen.load <= self.max_queue_gap:
+                    chosen, reason = best_warm, "warm"
+            if reason == "least_loaded" and chosen.checkpoint is not None:
+                reason = "cold"  # the backend switches checkpoints
+
+        if not record:
+            return chosen
+
+        chosen.routed += 1
+        if checkpoint:
+            chosen.checkpoint = checkpoint
+
+        COMFY_ROUTING_DECISIONS.labels(backend=chosen.name, reason=reason).inc()
+        logger.debug(f"Routed prompt ({checkpoint or 'any checkpoint'}) to {chosen.name}: {reason}")
+        return chosen
+
+    def get_client(self, checkpoint: Optional[str] = None, record: bool = True) -> ComfyUIClient:
+        """
+        Get a ComfyUIClient for the backend chosen for ``checkpoint``.
+
+        Args:
+            checkpoint: Checkpoint the prompt will load (None if unknown)
+            record: Count this as a routed prompt (see ``select``)
+
+        Returns:
+            ComfyUIClient bound to that backend's connection pool
+        """
+        return self.select(checkpoint, record=record).pool.get_client()
+
+    async def refresh(self) -> None:
+        """Probe every backend once."""
+        await asyncio.gather(*(self._refresh_backend(backend) for backend in self.backends))
+        COMFY_QUEUE_DEPTH.set(sum(backend.queue_depth for backend in self.backends))
+
+    async def _refresh_backend(self, backend: ComfyUIBackend) -> None:
+        """Update a backend's breaker, queue depth and loaded checkpoint."""
+        try:
+            async with backend.pool.get_client() as client:
+                ok = await client.health_check(attempts=1, timeout=self.probe_timeout)
+                queue = await client.get_queue() if ok else None
+        except Exception as e:
+            logger.debug(f"ComfyUI backend {backend.name} probe failed: {e}")
+            ok, queue = False, None
+
+        backend.failures = 0 if ok else backend.failures + 1
+        if ok or backend.failures >= self.failure_threshold or not backend.probed:
+            self._set_breaker(backend, closed=ok)
+        backend.probed = True
+
+        if queue is not None:
+            backend.queue_depth = len(queue.get("queue_running") or []) + len(queue.get("queue_pending") or [])
+            backend.routed = 0
+            backend.checkpoint = queued_checkpoint(queue) or backend.checkpoint
+            COMFY_BACKEND_QUEUE_DEPTH.labels(backend=backend.name).set(backend.queue_depth)
+
+    def _set_breaker(self, backend: ComfyUIBackend, closed: bool) -> None:
+        """Close or open a backend's circuit breaker."""
+        if closed != backend.healthy:
+            state = "closed" if closed else "open"
+            COMFY_BREAKER_TRANSITIONS.labels(backend=backend.name, state=state).inc()
+            if closed:
+                logger.info(f"ComfyUI backend {backend.name} is healthy again, circuit closed")
+            else:
+                logger.warning(
+                    f"ComfyUI backend {backend.name} failed {backend.failures} probe(s), circuit open"
+                )
+        backend.healthy = closed
+        COMFY_BACKEND_HEALTHY.labels(backend=backend.name).set(1 if closed else 0)
+
+    async def _run(self) -> None:
+        """Probe on an interval until cancelled."""
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"ComfyUI backend refresh failed: {e}")
+
+
+def _backend_pool(base_url: str) -> ComfyUIConnectionPool:
+    if base_url.rstrip("/") == comfyui_pool.base_url:
+        return comfyui_pool
+    return ComfyUIConnectionPool(
+        base_url=base_url,
+        timeout=settings.comfyui_timeout,
+        max_connections=settings.comfyui_max_connections,
+        max_keepalive=settings.comfyui_max_keepalive,
+        keepalive_expiry=settings.comfyui_keepalive_expiry,
+        http2=settings.comfyui_http2,
+        drain_timeout=settings.comfyui_drain_timeout,
+        ws_enabled=settings.comfyui_ws_enabled,
+        ws_recheck_interval=settings.comfyui_ws_recheck_interval
+    )
+
+
+# Global instance
+comfyui_backends = ComfyUIBackendPool(
+    [_backend_pool(url.strip()) for url in (settings.comfyui_urls or settings.comfyui_url).split(",") if url.strip()],
+    refresh_interval=settings.comfyui_backend_refresh_interval,
+    max_queue_gap=settings.comfyui_affinity_max_queue_gap,
+    failure_threshold=settings.comfyui_health_failure_threshold,
+    probe_timeout=settings.comfyui_health_probe_timeout
+)
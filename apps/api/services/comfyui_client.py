@@ -1,17 +1,21 @@
 """ComfyUI HTTP client service for API communication."""
 
 import httpx
-import json
 import uuid
 import asyncio
 import os
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator, Callable, Awaitable, TYPE_CHECKING
+from urllib.parse import quote
 from datetime import datetime
 import logging
 from prometheus_client import Counter, Histogram, Gauge
 
 from ..models.requests import GenerateImageRequest
 from ..models.responses import ImageResponse, JobStatus, ImageMetadata
+from .workflow_templates import WorkflowTemplate, workflow_registry, WORKFLOWS_DIR
+
+if TYPE_CHECKING:
+    from .comfyui_events import ComfyUIEventListener
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +41,13 @@ COMFY_REQUEST_TOTAL = Counter(
 )
 
 
+# Async callback receiving (step, total_steps) during sampling
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+
+# Cleanups of abandoned batches still running (referenced so they aren't GC'd)
+_cleanup_tasks: "set[asyncio.Task]" = set()
+
+
 class ComfyUIClientError(Exception):
     """Base exception for ComfyUI client errors."""
     pass
@@ -65,7 +76,10 @@ class ComfyUIClient:
         base_url: str = "http://localhost:8188",
         timeout: float = 300.0,
         poll_interval: float = 1.0,
-        workflow_path: Optional[str] = None
+        workflow_path: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        events: Optional["ComfyUIEventListener"] = None,
+        event_recheck_interval: float = 30.0
     ):
         """
         Initialize ComfyUI client.
@@ -75,34 +89,44 @@ class ComfyUIClient:
             timeout: Request timeout in seconds
             poll_interval: Interval between status checks in seconds
             workflow_path: Path to workflow JSON template (optional)
+            http_client: Shared httpx client from the connection pool (optional).
+                When provided, the context manager neither opens nor closes it.
+            events: Shared WebSocket event listener (optional). When provided,
+                prompts are submitted with its client ID and completion is
+                event-driven; ``/history`` polling is only used as a fallback.
+            event_recheck_interval: While waiting on events, confirm via
+                ``/history`` this often in seconds in case an event was missed
         """
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
         self.poll_interval = poll_interval
-        self.client_id = str(uuid.uuid4())
-        self.workflow_path = workflow_path or os.path.join(
-            os.path.dirname(__file__), "../../../workflows/t2i_basic.json"
-        )
+        self.events = events
+        self.event_recheck_interval = event_recheck_interval
+        self.client_id = events.client_id if events is not None else str(uuid.uuid4())
+        self.workflow_path = workflow_path or os.path.join(WORKFLOWS_DIR, "t2i_basic.json")
 
-        # Configure httpx client
-        self._client: Optional[httpx.AsyncClient] = None
+        # Configure httpx client (shared clients are owned by the pool)
+        self._client: Optional[httpx.AsyncClient] = http_client
+        self._owns_client = http_client is None
 
-        # Load workflow template
-        self._workflow_template: Optional[Dict[str, Any]] = None
+        # Workflow template (resolved from the registry on first use)
+        self._workflow_template: Optional[WorkflowTemplate] = None
 
     async def __aenter__(self):
         """Async context manager entry."""
-        self._client = httpx.AsyncClient(
-            base_url=self.base_url,
-            timeout=httpx.Timeout(self.timeout),
-            follow_redirects=True
-        )
+        if self._owns_client:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout),
+                follow_redirects=True
+            )
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
-        if self._client:
+        if self._owns_client and self._client:
             await self._client.aclose()
+            self._client = None
 
     @property
     def client(self) -> httpx.AsyncClient:
@@ -111,35 +135,55 @@ class ComfyUIClient:
             raise RuntimeError("Client not initialized. Use 'async with ComfyUIClient()' context manager.")
         return self._client
 
-    async def health_check(self) -> bool:
+    async def health_check(self, attempts: int = 5, timeout: float = 5.0) -> bool:
         """
         Check if ComfyUI service is available.
 
         Uses retry logic with multiple endpoints to ensure robust connectivity.
-        Creates its own HTTP client to avoid dependency on context manager.
+        Uses the shared pool client when bound to one, otherwise creates its
+        own HTTP client to avoid dependency on context manager.
+
+        Request paths should read ``comfyui_backends.healthy`` instead; this
+        probe is what the background health monitor runs.
+
+        Args:
+            attempts: Rounds over the endpoints before giving up
+            timeout: Per-request timeout in seconds
 
         Returns:
             True if service is healthy, False otherwise
         """
         endpoints = ["/queue", "/system_stats", "/"]
 
-        async with httpx.AsyncClient(base_url=self.base_url, timeout=5.0) as health_client:
-            for attempt in range(5):
-                for endpoint in endpoints:
-                    try:
-                        response = await health_client.get(endpoint)
-                        if response.status_code == 200:
-                            logger.debug(f"Health check succeeded on {endpoint} (attempt {attempt + 1})")
-                            return True
-                    except Exception as e:
-                        logger.debug(f"Health check failed for {endpoint} (attempt {attempt + 1}): {e}")
-                        pass
-
-                # Exponential backoff
-                if attempt < 4:  # Don't sleep on last attempt
-                    await asyncio.sleep(0.6 * (attempt + 1))
-
-        logger.error("Health check failed after all retry attempts")
+        if self._client is not None and not self._owns_client:
+            return await self._probe(self._client, endpoints, attempts, timeout)
+
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=timeout) as health_client:
+            return await self._probe(health_client, endpoints, attempts, timeout)
+
+    async def _probe(
+        self,
+        health_client: httpx.AsyncClient,
+        endpoints: list[str],
+        attempts: int,
+        timeout: float
+    ) -> bool:
+        for attempt in range(attempts):
+            for endpoint in endpoints:
+                try:
+                    response = await health_client.get(endpoint, timeout=timeout)
+                    if response.status_code == 200:
+                        logger.debug(f"Health check succeeded on {endpoint} (attempt {attempt + 1})")
+                        return True
+                except Exception as e:
+                    logger.debug(f"Health check failed for {endpoint} (attempt {attempt + 1}): {e}")
+                    pass
+
+            # Exponential backoff
+            if attempt < attempts - 1:  # Don't sleep on last attempt
+                await asyncio.sleep(0.6 * (attempt + 1))
+
+        logger.error(f"Health check failed after {attempts} attempt(s)")
         return False
 
     async def get_models(self) -> list[str]:
@@ -179,46 +223,33 @@ class ComfyUIClient:
             logger.error(f"Error getting models: {e}")
             raise ComfyUIClientError(f"Failed to get models: {str(e)}") from e
 
-    def _load_workflow_template(self) -> Dict[str, Any]:
+    @property
+    def workflow_template(self) -> WorkflowTemplate:
+        """The workflow template prompts are built from."""
+        return self._get_workflow_template()
+
+    def _get_workflow_template(self) -> WorkflowTemplate:
         """
-        Load workflow template from JSON file.
+        Get the cached, pre-validated workflow template.
 
         Returns:
-            Workflow template dictionary
+            WorkflowTemplate from the registry (built-in if the file is missing)
         """
         if self._workflow_template is None:
             try:
-                with open(self.workflow_path, 'r') as f:
-                    self._workflow_template = json.load(f)
-                logger.info(f"Loaded workflow template from {self.workflow_path}")
+                self._workflow_template = workflow_registry.get(self.workflow_path)
             except FileNotFoundError:
                 logger.warning(f"Workflow template not found at {self.workflow_path}, using built-in")
                 # Fallback to built-in workflow
-                self._workflow_template = self._get_default_workflow()
-        return json.loads(json.dumps(self._workflow_template))  # Deep copy
-
-    def _get_default_workflow(self) -> Dict[str, Any]:
-        """
-        Get default built-in workflow template.
-
-        Returns:
-            Default workflow dictionary
-        """
-        return {
-            "3": {"inputs": {"seed": 42, "steps": 20, "cfg": 7.0, "sampler_name": "euler_a", "scheduler": "normal", "denoise": 1.0, "model": ["4", 0], "positive": ["6", 0], "negative": ["7", 0], "latent_image": ["5", 0]}, "class_type": "KSampler"},
-            "4": {"inputs": {"ckpt_name": "v1-5-pruned-emaonly.ckpt"}, "class_type": "CheckpointLoaderSimple"},
-            "5": {"inputs": {"width": 512, "height": 512, "batch_size": 1}, "class_type": "EmptyLatentImage"},
-            "6": {"inputs": {"text": "beautiful scenery", "clip": ["4", 1]}, "class_type": "CLIPTextEncode"},
-            "7": {"inputs": {"text": "", "clip": ["4", 1]}, "class_type": "CLIPTextEncode"},
-            "8": {"inputs": {"samples": ["3", 0], "vae": ["4", 2]}, "class_type": "VAEDecode"},
-            "9": {"inputs": {"filename_prefix": "ComfyUI", "images": ["8", 0]}, "class_type": "SaveImage"}
-        }
+                self._workflow_template = workflow_registry.default()
+        return self._workflow_template
 
     def _build_workflow(self, request: GenerateImageRequest) -> Dict[str, Any]:
         """
         Build ComfyUI workflow from generation request.
 
-        Loads workflow template and injects parameters.
+        Injects parameters through the template's precompiled bindings;
+        only the nodes that receive parameters are copied.
 
         Args:
             request: Image generation request
@@ -226,51 +257,47 @@ class ComfyUIClient:
         Returns:
             ComfyUI workflow dictionary
         """
-        # Load template
-        workflow = self._load_workflow_template()
+        return self._get_workflow_template().build(self.workflow_values(request))
+
+    def workflow_values(self, request: GenerateImageRequest) -> Dict[str, Any]:
+        """
+        Template parameter values for a generation request.
 
+        Args:
+            request: Image generation request
+
+        Returns:
+            Values keyed by binding name (see ``WorkflowTemplate``)
+        """
         # Generate a random seed if not provided
         seed = request.seed if request.seed is not None and request.seed >= 0 else \
                int(datetime.utcnow().timestamp() * 1000000) % (2**32)
 
-        # Inject parameters into workflow nodes
-        # Node 3: KSampler
-        if "3" in workflow:
-            workflow["3"]["inputs"]["seed"] = seed
-            workflow["3"]["inputs"]["steps"] = request.steps
-            workflow["3"]["inputs"]["cfg"] = request.cfg_scale
-            workflow["3"]["inputs"]["sampler_name"] = request.sampler.value
-
-        # Node 4: Checkpoint Loader
-        if "4" in workflow:
-            workflow["4"]["inputs"]["ckpt_name"] = request.model
-
-        # Node 5: Empty Latent Image
-        if "5" in workflow:
-            workflow["5"]["inputs"]["width"] = request.width
-            workflow["5"]["inputs"]["height"] = request.height
-            workflow["5"]["inputs"]["batch_size"] = request.batch_size
-
-        # Node 6: Positive Prompt
-        if "6" in workflow:
-            workflow["6"]["inputs"]["text"] = request.prompt
-
-        # Node 7: Negative Prompt
-        if "7" in workflow:
-            workflow["7"]["inputs"]["text"] = request.negative_prompt or ""
-
-        # Node 9: Save Image
-        if "9" in workflow:
-            workflow["9"]["inputs"]["filename_prefix"] = f"api_generated_{uuid.uuid4().hex[:8]}"
-
-        return workflow
+        return {
+            "seed": seed,
+            "steps": request.steps,
+            "cfg": request.cfg_scale,
+            "sampler_name": request.sampler.value,
+            "ckpt_name": request.model,
+            "width": request.width,
+            "height": request.height,
+            "batch_size": request.batch_size,
+            "prompt": request.prompt,
+            "negative_prompt": request.negative_prompt or "",
+            "filename_prefix": f"api_generated_{uuid.uuid4().hex[:8]}",
+        }
 
-    async def submit_prompt(self, request: GenerateImageRequest) -> str:
+    async def submit_prompt(
+        self,
+        request: GenerateImageRequest,
+        workflow: Optional[Dict[str, Any]] = None
+    ) -> str:
         """
         Submit a generation request to ComfyUI.
 
         Args:
             request: Image generation request
+            workflow: Prebuilt workflow (optional, built from request if omitted)
 
         Returns:
             Prompt ID (job ID)
@@ -279,7 +306,8 @@ class ComfyUIClient:
             ComfyUIClientError: If submission fails
         """
         try:
-            workflow = self._build_workflow(request)
+            if workflow is None:
+                workflow = self._build_workflow(request)
 
             payload = {
                 "prompt": workflow,
@@ -368,17 +396,127 @@ class ComfyUIClient:
             logger.error(f"Error getting queue: {e}")
             raise ComfyUIClientError(f"Failed to get queue: {str(e)}") from e
 
+    def _check_history(self, prompt_id: str, history: Optional[Dict[str, Any]]) -> bool:
+        """
+        Inspect history for a terminal state.
+
+        Returns:
+            True if the prompt completed successfully, False if still running
+
+        Raises:
+            ComfyUIClientError: If execution failed
+        """
+        if history is None:
+            return False
+
+        status = history.get("status", {})
+
+        if status.get("completed", False):
+            logger.info(f"Job {prompt_id} completed successfully")
+            return True
+
+        if "error" in status or status.get("status_str") == "error":
+            error_msg = status.get("error", "Unknown error")
+            logger.error(f"Job {prompt_id} failed: {error_msg}")
+            raise ComfyUIClientError(f"Execution failed: {error_msg}")
+
+        return False
+
+    async def _wait_for_event(
+        self,
+        prompt_id: str,
+        deadline: float,
+        max_wait: float,
+        progress_callback: Optional[ProgressCallback] = None,
+        sampler_nodes: Optional[set[str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Wait for completion via the shared WebSocket listener.
+
+        Args:
+            prompt_id: The prompt ID to wait for
+            deadline: Event loop time after which to give up
+            max_wait: Total wait budget in seconds (for error messages)
+            progress_callback: Async callback receiving sampler (value, max) steps
+            sampler_nodes: Node IDs whose progress events are forwarded
+                (None = all nodes)
+
+        Returns:
+            History data when completed, or None if the socket dropped
+            (caller should fall back to polling)
+
+        Raises:
+            ComfyUITimeoutError: If the deadline passes
+            ComfyUIClientError: If execution fails
+        """
+        loop = asyncio.get_event_loop()
+        watch = self.events.watch(prompt_id, progress=progress_callback is not None)
+        next_recheck = loop.time() + self.event_recheck_interval
+
+        try:
+            while True:
+                now = loop.time()
+                if now >= deadline:
+                    raise ComfyUITimeoutError(f"Job {prompt_id} did not complete within {max_wait}s")
+
+                if now >= next_recheck:
+                    # Safety net in case an event was missed
+                    history = await self.get_history(prompt_id)
+                    if self._check_history(prompt_id, history):
+                        return history
+                    next_recheck = loop.time() + self.event_recheck_interval
+                    continue
+
+                try:
+                    event = await asyncio.wait_for(
+                        watch.queue.get(),
+                        timeout=min(deadline, next_recheck) - now
+                    )
+                except asyncio.TimeoutError:
+                    continue
+
+                if event["type"] == "progress":
+                    if sampler_nodes is None or event.get("node") in sampler_nodes:
+                        if event.get("value") is not None and event.get("max"):
+                            await progress_callback(event["value"], event["max"])
+                    continue
+
+                if event["type"] == "error":
+                    logger.error(f"Job {prompt_id} failed: {event['error']}")
+                    raise ComfyUIClientError(f"Execution failed: {event['error']}")
+
+                if event["type"] == "completed":
+                    history = await self.get_history(prompt_id)
+                    if self._check_history(prompt_id, history):
+                        return history
+                    # History not written yet - poll instead
+                    return None
+
+                if event["type"] == "disconnected":
+                    return None
+        finally:
+            self.events.unwatch(prompt_id)
+
     async def wait_for_completion(
         self,
         prompt_id: str,
-        max_wait_time: Optional[float] = None
+        max_wait_time: Optional[float] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+        sampler_nodes: Optional[set[str]] = None
     ) -> Dict[str, Any]:
         """
         Wait for a prompt to complete execution.
 
+        Uses the shared WebSocket listener when it is connected and falls
+        back to polling ``/history`` every ``poll_interval`` otherwise.
+        Step progress is only available while on events.
+
         Args:
             prompt_id: The prompt ID to wait for
             max_wait_time: Maximum time to wait in seconds (None = use default timeout)
+            progress_callback: Async callback receiving sampler (value, max) steps
+            sampler_nodes: Node IDs whose progress events are forwarded
+                (None = all nodes)
 
         Returns:
             History data when completed
@@ -388,39 +526,86 @@ class ComfyUIClient:
             ComfyUIClientError: If execution fails
         """
         max_wait = max_wait_time or self.timeout
-        start_time = asyncio.get_event_loop().time()
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + max_wait
 
         logger.info(f"Waiting for job {prompt_id} to complete...")
 
+        if self.events is not None and self.events.connected:
+            history = await self._wait_for_event(
+                prompt_id,
+                deadline,
+                max_wait,
+                progress_callback=progress_callback,
+                sampler_nodes=sampler_nodes
+            )
+            if history is not None:
+                return history
+            logger.info(f"Falling back to polling for job {prompt_id}")
+
         while True:
             # Check if we've exceeded max wait time
-            elapsed = asyncio.get_event_loop().time() - start_time
-            if elapsed > max_wait:
+            if loop.time() > deadline:
                 raise ComfyUITimeoutError(f"Job {prompt_id} did not complete within {max_wait}s")
 
             # Get history
             history = await self.get_history(prompt_id)
+            if self._check_history(prompt_id, history):
+                return history
 
-            if history is not None:
-                # Check if execution completed
-                status = history.get("status", {})
+            # Wait before next check
+            await asyncio.sleep(self.poll_interval)
+
+    def get_image_urls(
+        self,
+        prompt_id: str,
+        history: Dict[str, Any],
+        node_ids: Optional[List[str]] = None
+    ) -> List[str]:
+        """
+        Extract every image URL from history data.
 
-                if status.get("completed", False):
-                    logger.info(f"Job {prompt_id} completed successfully")
-                    return history
+        Collects images from all output nodes, in node order. Preview
+        (``type=temp``) images are only returned when the workflow saved
+        no output images.
 
-                # Check for errors
-                if "error" in status or status.get("status_str") == "error":
-                    error_msg = status.get("error", "Unknown error")
-                    logger.error(f"Job {prompt_id} failed: {error_msg}")
-                    raise ComfyUIClientError(f"Execution failed: {error_msg}")
+        Args:
+            prompt_id: The prompt ID
+            history: History data from ComfyUI
+            node_ids: Only collect from these output nodes, in this order
+                (default: all)
 
-            # Wait before next check
-            await asyncio.sleep(self.poll_interval)
+        Returns:
+            Absolute image URLs (empty if none found)
+        """
+        saved: List[str] = []
+        previews: List[str] = []
+
+        outputs = history.get("outputs", {})
+        if node_ids is not None:
+            outputs = {node_id: outputs[node_id] for node_id in node_ids if node_id in outputs}
+
+        for node_id, node_output in outputs.items():
+            for image_info in node_output.get("images") or []:
+                filename = image_info.get("filename")
+                if not filename:
+                    continue
+
+                subfolder = image_info.get("subfolder", "")
+                image_type = image_info.get("type", "output")
+
+                # Construct absolute URL to view the image
+                url = f"{self.base_url}/view?filename={quote(filename)}&type={quote(image_type)}"
+                if subfolder:
+                    url += f"&subfolder={quote(subfolder)}"
+
+                (previews if image_type == "temp" else saved).append(url)
+
+        return saved or previews
 
     async def get_image_url(self, prompt_id: str, history: Dict[str, Any]) -> Optional[str]:
         """
-        Extract image URL from history data.
+        Extract the first image URL from history data.
 
         Args:
             prompt_id: The prompt ID
@@ -430,34 +615,17 @@ class ComfyUIClient:
             Absolute image URL or None if not found
         """
         try:
-            from urllib.parse import quote
-
-            # Navigate through history structure to find saved images
-            outputs = history.get("outputs", {})
-
-            for node_id, node_output in outputs.items():
-                if "images" in node_output:
-                    images = node_output["images"]
-                    if len(images) > 0:
-                        image_info = images[0]
-                        filename = image_info.get("filename")
-                        subfolder = image_info.get("subfolder", "")
-                        image_type = image_info.get("type", "output")
-
-                        # Construct absolute URL to view the image
-                        if filename:
-                            url = f"{self.base_url}/view?filename={quote(filename)}&type={quote(image_type)}"
-                            if subfolder:
-                                url += f"&subfolder={quote(subfolder)}"
-                            return url
-
-            return None
-
+            urls = self.get_image_urls(prompt_id, history)
+            return urls[0] if urls else None
         except Exception as e:
             logger.error(f"Error extracting image URL: {e}")
             return None
 
-    async def generate_image(self, request: GenerateImageRequest) -> ImageResponse:
+    async def generate_image(
+        self,
+        request: GenerateImageRequest,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> ImageResponse:
         """
         Generate an image (full workflow: submit, wait, get result).
 
@@ -465,6 +633,9 @@ class ComfyUIClient:
 
         Args:
             request: Image generation request
+            progress_callback: Async callback receiving sampler (value, max)
+                steps while the image is denoised (WebSocket events only).
+                Exceptions raised by the callback abort generation.
 
         Returns:
             ImageResponse with generation results
@@ -472,23 +643,161 @@ class ComfyUIClient:
         Raises:
             ComfyUIClientError: If generation fails
         """
-        job_id = None
         created_at = datetime.utcnow()
-        started_at = None
-        completed_at = None
-        model = request.model or "default"
 
         try:
-            # Submit prompt
-            job_id = await self.submit_prompt(request)
-            started_at = datetime.utcnow()
+            job_id = await self.submit_prompt(request, workflow=self._build_workflow(request))
+        except Exception as e:
+            return self._failed_response(request, None, e, created_at, None)
+
+        return await self._complete_image(
+            request,
+            job_id,
+            created_at,
+            datetime.utcnow(),
+            progress_callback=progress_callback
+        )
+
+    async def generate_images(
+        self,
+        requests: List[GenerateImageRequest]
+    ) -> AsyncIterator[Tuple[int, ImageResponse]]:
+        """
+        Generate several images concurrently.
+
+        Every prompt is submitted up front, so ComfyUI queues the whole
+        batch at once, and all of them are then awaited together (on the
+        shared event listener when connected). Results are yielded as
+        they finish, not in input order.
+
+        Item ``i`` may wait up to ``(i + 1) * timeout``: it can be queued
+        behind every earlier item of the batch, as when generating one by
+        one. If the caller stops iterating early, prompts that haven't
+        finished are removed from the ComfyUI queue.
+
+        Args:
+            requests: Image generation requests
+
+        Yields:
+            ``(index, ImageResponse)`` for each request, in completion order
+        """
+        created_at = datetime.utcnow()
+        job_ids = await asyncio.gather(
+            *(self.submit_prompt(request, workflow=self._build_workflow(request)) for request in requests),
+            return_exceptions=True
+        )
+        started_at = datetime.utcnow()
+
+        async def complete(index: int) -> Tuple[int, ImageResponse]:
+            job_id = job_ids[index]
+            if isinstance(job_id, BaseException):
+                return index, self._failed_response(requests[index], None, job_id, created_at, None)
+            return index, await self._complete_image(
+                requests[index],
+                job_id,
+                created_at,
+                started_at,
+                max_wait_time=self.timeout * (index + 1)
+            )
+
+        tasks = [asyncio.create_task(complete(index)) for index in range(len(requests))]
+        finished = set()
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, response = await next_done
+                finished.add(index)
+                yield index, response
+        finally:
+            for task in tasks:
+                task.cancel()
+            abandoned = [
+                job_id for index, job_id in enumerate(job_ids)
+                if index not in finished and isinstance(job_id, str)
+            ]
+
+            # A disconnecting client may cancel this task again at every
+            # await (Starlette's cancel scope), so clean up in a task of its
+            # own that runs to completion even if we stop waiting for it
+            cleanup = asyncio.create_task(self._abandon(tasks, abandoned))
+            _cleanup_tasks.add(cleanup)
+            cleanup.add_done_callback(_cleanup_tasks.discard)
+            await asyncio.shield(cleanup)
+
+    async def _abandon(self, tasks: List[asyncio.Task], prompt_ids: List[str]) -> None:
+        """Wait for cancelled waits to unwind, then remove their prompts."""
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if prompt_ids:
+            await self.delete_prompts(prompt_ids)
+
+    async def delete_prompts(self, prompt_ids: List[str]) -> None:
+        """
+        Remove pending prompts from the ComfyUI queue (best effort).
+
+        Prompts that are already running are not interrupted.
+
+        Args:
+            prompt_ids: Prompt IDs to remove
+        """
+        try:
+            response = await self.client.post("/queue", json={"delete": prompt_ids})
+            response.raise_for_status()
+            logger.info(f"Removed {len(prompt_ids)} abandoned prompts from the ComfyUI queue")
+        except Exception as e:
+            logger.warning(f"Failed to remove prompts from the ComfyUI queue: {e}")
+
+    @staticmethod
+    def execution_window(history: Dict[str, Any]) -> Optional[Tuple[datetime, datetime]]:
+        """
+        Execution start and end as recorded by ComfyUI.
 
+        ``status.messages`` carries ``execution_start`` and
+        ``execution_success`` with millisecond timestamps, which exclude
+        time spent queued.
+
+        Returns:
+            (started_at, completed_at), or None if ComfyUI didn't record them
+        """
+        timestamps = {}
+        for message in history.get("status", {}).get("messages") or []:
+            if len(message) == 2 and isinstance(message[1], dict) and "timestamp" in message[1]:
+                timestamps[message[0]] = message[1]["timestamp"]
+
+        if "execution_start" not in timestamps or "execution_success" not in timestamps:
+            return None
+        return (
+            datetime.utcfromtimestamp(timestamps["execution_start"] / 1000),
+            datetime.utcfromtimestamp(timestamps["execution_success"] / 1000),
+        )
+
+    async def _complete_image(
+        self,
+        request: GenerateImageRequest,
+        job_id: str,
+        created_at: datetime,
+        started_at: datetime,
+        progress_callback: Optional[ProgressCallback] = None,
+        max_wait_time: Optional[float] = None
+    ) -> ImageResponse:
+        """Wait for a submitted prompt and build its ImageResponse."""
+        model = request.model or "default"
+
+        try:
             # Wait for completion
-            history = await self.wait_for_completion(job_id)
+            history = await self.wait_for_completion(
+                job_id,
+                max_wait_time=max_wait_time,
+                progress_callback=progress_callback,
+                sampler_nodes=self._get_workflow_template().sampler_nodes
+            )
             completed_at = datetime.utcnow()
 
-            # Get image URL
-            image_url = await self.get_image_url(job_id, history)
+            # Prefer ComfyUI's own timing: the prompt may have been queued
+            window = self.execution_window(history)
+            if window:
+                started_at, completed_at = window
+
+            # Collect image URLs from every output node
+            image_urls = self.get_image_urls(job_id, history)
 
             # Calculate generation time
             generation_time = (completed_at - started_at).total_seconds() if started_at else None
@@ -515,7 +824,8 @@ class ComfyUIClient:
             return ImageResponse(
                 job_id=job_id,
                 status=JobStatus.COMPLETED,
-                image_url=image_url,
+                image_url=image_urls[0] if image_urls else None,
+                image_urls=image_urls,
                 metadata=metadata,
                 created_at=created_at,
                 started_at=started_at,
@@ -523,19 +833,30 @@ class ComfyUIClient:
             )
 
         except Exception as e:
-            logger.error(f"Image generation failed: {e}")
+            return self._failed_response(request, job_id, e, created_at, started_at)
 
-            # Track failure
-            GENERATION_TOTAL.labels(status="error", model=model).inc()
-
-            return ImageResponse(
-                job_id=job_id or "unknown",
-                status=JobStatus.FAILED,
-                error=str(e),
-                created_at=created_at,
-                started_at=started_at,
-                completed_at=datetime.utcnow()
-            )
+    def _failed_response(
+        self,
+        request: GenerateImageRequest,
+        job_id: Optional[str],
+        error: BaseException,
+        created_at: datetime,
+        started_at: Optional[datetime]
+    ) -> ImageResponse:
+        """Record a failed generation and build its ImageResponse."""
+        logger.error(f"Image generation failed: {error}")
+
+        # Track failure
+        GENERATION_TOTAL.labels(status="error", model=request.model or "default").inc()
+
+        return ImageResponse(
+            job_id=job_id or "unknown",
+            status=JobStatus.FAILED,
+            error=str(error),
+            created_at=created_at,
+            started_at=started_at,
+            completed_at=datetime.utcnow()
+        )
 
 
 # Dependency injection for FastAPI
@@ -543,6 +864,10 @@ async def get_comfyui_client() -> ComfyUIClient:
     """
     FastAPI dependency for ComfyUI client.
 
+    Returns a client bound to the connection pool of the least loaded
+    ComfyUI backend (see ``comfyui_backends``), so requests reuse keep-alive
+    connections instead of paying TCP/TLS setup each time.
+
     Usage:
         @router.post("/generate")
         async def generate(
@@ -552,8 +877,17 @@ async def get_comfyui_client() -> ComfyUIClient:
             async with client:
                 return await client.generate_image(request)
     """
-    from ..config import settings
-    return ComfyUIClient(
-        base_url=settings.comfyui_url,
-        timeout=settings.comfyui_timeout
-    )
+    from .comfyui_backends import comfyui_backends
+    return comfyui_backends.get_client()
+
+
+async def get_comfyui_status_client() -> ComfyUIClient:
+    """
+    FastAPI dependency for ComfyUI calls that do not submit a prompt.
+
+    Like ``get_comfyui_client``, but the backend choice is not counted as
+    a routed prompt, so health checks and model listings leave routing
+    state and ``comfy_routing_decisions_total`` untouched.
+    """
+    from .comfyui_backends import comfyui_backends
+    return comfyui_backends.get_client(record=False)
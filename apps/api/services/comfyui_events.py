@@ -0,0 +1,273 @@
+"""
+Multiplexed ComfyUI WebSocket event listener.
+
+ComfyUI pushes execution events over ``/ws?clientId=...`` to the client
+that submitted a prompt. One listener per process subscribes with a shared
+client ID and dispatches ``progress``, ``executing``, ``executed`` and
+``execution_error`` events to per-prompt watches, replacing ``/history``
+polling while the socket is up.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+import websockets
+from prometheus_client import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics
+COMFY_WS_CONNECTED = Gauge(
+    "comfy_ws_connected",
+    "Whether the ComfyUI event WebSocket is connected (1) or not (0)"
+)
+COMFY_WS_EVENTS_TOTAL = Counter(
+    "comfy_ws_events_total",
+    "ComfyUI WebSocket events dispatched",
+    ["type"]
+)
+
+# Terminal outcomes remembered for prompts nobody is watching yet
+# (completion can arrive before submit_prompt returns the prompt_id)
+RECENT_OUTCOMES_MAX = 1000
+
+
+def parse_ws_message(raw: str) -> Optional[Dict[str, Any]]:
+    """
+    Normalize a ComfyUI WebSocket message.
+
+    Args:
+        raw: Text frame received from ComfyUI
+
+    Returns:
+        Event dict with ``type`` (progress, executing, executed, completed,
+        error) and ``prompt_id``, or None for messages we don't track
+    """
+    try:
+        data = json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+    msg_type = data.get("type")
+    payload = data.get("data") or {}
+    prompt_id = payload.get("prompt_id")
+
+    if msg_type == "progress":
+        return {
+            "type": "progress",
+            "prompt_id": prompt_id,
+            "node": payload.get("node"),
+            "value": payload.get("value"),
+            "max": payload.get("max"),
+        }
+
+    if msg_type == "executing":
+        # node=None marks the end of the prompt (sent after history is written)
+        if payload.get("node") is None:
+            return {"type": "completed", "prompt_id": prompt_id}
+        return {"type": "executing", "prompt_id": prompt_id, "node": payload.get("node")}
+
+    if msg_type == "execution_success":
+        return {"type": "completed", "prompt_id": prompt_id}
+
+    if msg_type == "executed":
+        return {
+            "type": "executed",
+            "prompt_id": prompt_id,
+            "node": payload.get("node"),
+            "output": payload.get("output"),
+        }
+
+    if msg_type == "execution_error":
+        return {
+            "type": "error",
+            "prompt_id": prompt_id,
+            "node": payload.get("node_id"),
+            "error": payload.get("exception_message") or "Unknown error",
+        }
+
+    if msg_type == "execution_interrupted":
+        return {"type": "error", "prompt_id": prompt_id, "error": "Execution interrupted"}
+
+    return None
+
+
+class PromptWatch:
+    """
+    Event queue for a single prompt.
+
+    Terminal outcomes are always queued, exactly once:
+    - ``{"type": "completed"}``
+    - ``{"type": "error", "error": "..."}``
+    - ``{"type": "disconnected"}`` when the socket dropped (caller should poll)
+
+    Non-terminal events (progress, executing, executed) are queued only
+    when the watch was registered with ``progress=True``. Events are
+    consumed by the waiting task, so slow consumers never block dispatch.
+    """
+
+    def __init__(self, prompt_id: str, progress: bool = False):
+        self.prompt_id = prompt_id
+        self.progress = progress
+        self.finished = False
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    def push(self, event: Dict[str, Any]) -> None:
+        if self.progress and not self.finished:
+            self.queue.put_nowait(event)
+
+    def resolve(self, outcome: Dict[str, Any]) -> None:
+        if not self.finished:
+            self.finished = True
+            self.queue.put_nowait(outcome)
+
+
+class ComfyUIEventListener:
+    """
+    Single WebSocket connection to ComfyUI shared by every prompt in the process.
+
+    All prompts must be submitted with ``client_id`` so ComfyUI routes their
+    execution events to this socket. Reconnects with exponential backoff;
+    while disconnected, ``connected`` is False and watchers fall back to
+    ``/history`` polling.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        client_id: Optional[str] = None,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0
+    ):
+        """
+        Initialize listener (does not connect).
+
+        Args:
+            base_url: Base URL for ComfyUI service (http/https)
+            client_id: Client ID to subscribe with (random if omitted)
+            reconnect_delay: Initial delay before reconnecting in seconds
+            max_reconnect_delay: Upper bound for reconnect backoff in seconds
+        """
+        self.base_url = base_url.rstrip("/")
+        self.client_id = client_id or str(uuid.uuid4())
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.ws_url = (
+            self.base_url.replace("http://", "ws://", 1).replace("https://", "wss://", 1)
+            + f"/ws?clientId={self.client_id}"
+        )
+
+        self._task: Optional[asyncio.Task] = None
+        self._connected = False
+        self._watches: Dict[str, PromptWatch] = {}
+        self._recent: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    @property
+    def connected(self) -> bool:
+        """Whether events are currently being received."""
+        return self._connected
+
+    async def start(self) -> None:
+        """Start the background listener task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"ComfyUI event listener started (client_id={self.client_id})")
+
+    async def stop(self) -> None:
+        """Stop the listener and release all watchers."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("ComfyUI event listener stopped")
+
+    def watch(self, prompt_id: str, progress: bool = False) -> PromptWatch:
+        """
+        Register interest in a prompt's events.
+
+        If the prompt already finished before the watch was registered,
+        the returned watch is resolved immediately.
+
+        Args:
+            prompt_id: Prompt to watch
+            progress: Also queue non-terminal events (progress, executing, executed)
+
+        Returns:
+            PromptWatch whose queue receives the prompt's events
+        """
+        watch = PromptWatch(prompt_id, progress)
+        outcome = self._recent.pop(prompt_id, None)
+        if outcome is not None:
+            watch.resolve(outcome)
+        else:
+            self._watches[prompt_id] = watch
+        return watch
+
+    def unwatch(self, prompt_id: str) -> None:
+        """Remove a prompt's watch (call when done waiting)."""
+        self._watches.pop(prompt_id, None)
+
+    async def _run(self) -> None:
+        """Connect, dispatch events, reconnect on failure."""
+        delay = self.reconnect_delay
+
+        while True:
+            try:
+                async with websockets.connect(self.ws_url, max_size=None) as ws:
+                    self._connected = True
+                    COMFY_WS_CONNECTED.set(1)
+                    delay = self.reconnect_delay
+                    logger.info(f"Connected to ComfyUI events at {self.ws_url}")
+
+                    async for message in ws:
+                        # Binary frames are latent previews, not needed here
+                        if isinstance(message, str):
+                            self._dispatch(message)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"ComfyUI event socket error: {e}")
+            finally:
+                if self._connected:
+                    logger.warning("ComfyUI event socket disconnected, falling back to polling")
+                self._connected = False
+                COMFY_WS_CONNECTED.set(0)
+                self._release_watches()
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _dispatch(self, raw: str) -> None:
+        """Route a single message to the watch for its prompt."""
+        event = parse_ws_message(raw)
+        if event is None or not event.get("prompt_id"):
+            return
+
+        COMFY_WS_EVENTS_TOTAL.labels(type=event["type"]).inc()
+        prompt_id = event["prompt_id"]
+        watch = self._watches.get(prompt_id)
+
+        if event["type"] in ("completed", "error"):
+            if watch is not None:
+                watch.resolve(event)
+            else:
+                self._recent[prompt_id] = event
+                while len(self._recent) > RECENT_OUTCOMES_MAX:
+                    self._recent.popitem(last=False)
+            return
+
+        if watch is not None:
+            watch.push(event)
+
+    def _release_watches(self) -> None:
+        """Tell every waiter the socket dropped so it can poll instead."""
+        for watch in list(self._watches.values()):
+            watch.resolve({"type": "disconnected"})
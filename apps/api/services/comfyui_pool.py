@@ -0,0 +1,269 @@
+"""
+Process-wide connection pool for ComfyUI HTTP traffic.
+
+A single ``httpx.AsyncClient`` is created at startup (FastAPI lifespan or
+ARQ worker startup) and shared by every ``ComfyUIClient`` in the process,
+so generations reuse keep-alive (and, where available, HTTP/2) connections
+instead of paying TCP/TLS setup on every request and job. The pool also owns
+the process-wide ComfyUI WebSocket event listener used for completion tracking.
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+import httpx
+from prometheus_client import Counter, Gauge
+
+from .comfyui_client import ComfyUIClient
+from .comfyui_events import ComfyUIEventListener
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics
+COMFY_HTTP_REQUESTS = Counter(
+    "comfy_http_requests_total",
+    "ComfyUI HTTP requests by connection reuse",
+    ["connection"]  # new, reused
+)
+COMFY_HTTP_CONNECTIONS_OPENED = Counter(
+    "comfy_http_connections_opened_total",
+    "TCP connections opened to ComfyUI"
+)
+COMFY_HTTP_IN_FLIGHT = Gauge(
+    "comfy_http_in_flight",
+    "ComfyUI HTTP requests currently awaiting a response"
+)
+
+
+def _http2_available() -> bool:
+    """Check whether the optional h2 dependency is installed."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class _TrackingTransport(httpx.AsyncBaseTransport):
+    """
+    Transport wrapper that records connection reuse and in-flight requests.
+
+    Uses the httpcore ``trace`` extension to detect whether a request had
+    to open a new TCP connection or was served from the keep-alive pool.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, pool: "ComfyUIConnectionPool"):
+        self._transport = transport
+        self._pool = pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        opened = False
+        upstream_trace = request.extensions.get("trace")
+
+        async def trace(event_name: str, info: dict) -> None:
+            nonlocal opened
+            if event_name == "connection.connect_tcp.complete":
+                opened = True
+            if upstream_trace is not None:
+                await upstream_trace(event_name, info)
+
+        request.extensions = {**request.extensions, "trace": trace}
+
+        self._pool._request_started()
+        try:
+            response = await self._transport.handle_async_request(request)
+        finally:
+            self._pool._request_finished()
+
+        if opened:
+            COMFY_HTTP_CONNECTIONS_OPENED.inc()
+        COMFY_HTTP_REQUESTS.labels(connection="new" if opened else "reused").inc()
+
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class ComfyUIConnectionPool:
+    """
+    Shared, long-lived HTTP client registry for ComfyUI.
+
+    Lifecycle:
+    - ``connect()`` during application/worker startup
+    - ``get_client()`` per request or job (cheap, no I/O)
+    - ``disconnect()`` on shutdown drains in-flight requests, then closes
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 300.0,
+        max_connections: int = 100,
+        max_keepalive: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = True,
+        drain_timeout: float = 10.0,
+        ws_enabled: bool = True,
+        ws_recheck_interval: float = 30.0
+    ):
+        """
+        Initialize connection pool (does not open any connections).
+
+        Args:
+            base_url: Base URL for ComfyUI service
+            timeout: Request timeout in seconds
+            max_connections: Maximum concurrent connections
+            max_keepalive: Maximum idle keep-alive connections
+            keepalive_expiry: Seconds before an idle connection is closed
+            http2: Enable HTTP/2 if the h2 package is installed
+            drain_timeout: Seconds to wait for in-flight requests on shutdown
+            ws_enabled: Start the shared WebSocket event listener
+            ws_recheck_interval: Seconds between /history safety checks
+                while waiting on events
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2
+        self.drain_timeout = drain_timeout
+        self.ws_enabled = ws_enabled
+        self.ws_recheck_interval = ws_recheck_interval
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._events: Optional[ComfyUIEventListener] = None
+        self._in_flight = 0
+        self._idle: Optional[asyncio.Event] = None
+
+    @property
+    def connected(self) -> bool:
+        """Whether the shared client is open."""
+        return self._client is not None
+
+    @property
+    def events(self) -> Optional[ComfyUIEventListener]:
+        """Shared WebSocket event listener (None if disabled or not started)."""
+        return self._events
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Get the shared httpx client."""
+        if self._client is None:
+            raise RuntimeError("ComfyUI connection pool not connected. Call connect() first.")
+        return self._client
+
+    async def connect(self) -> None:
+        """Open the shared HTTP client and start the event listener."""
+        if self._client is not None:
+            return
+
+        use_http2 = self.http2 and _http2_available()
+        if self.http2 and not use_http2:
+            logger.info("h2 package not installed, ComfyUI pool falling back to HTTP/1.1")
+
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive,
+            keepalive_expiry=self.keepalive_expiry
+        )
+        transport = _TrackingTransport(
+            httpx.AsyncHTTPTransport(limits=limits, http2=use_http2),
+            self
+        )
+
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(self.timeout),
+            follow_redirects=True,
+            transport=transport
+        )
+
+        if self.ws_enabled:
+            self._events = ComfyUIEventListener(self.base_url)
+            await self._events.start()
+
+        logger.info(
+            f"ComfyUI connection pool ready at {self.base_url} "
+            f"(max_connections={self.max_connections}, keepalive={self.max_keepalive}, "
+            f"http2={use_http2})"
+        )
+
+    async def disconnect(self) -> None:
+        """
+        Drain in-flight requests and close the shared client.
+
+        New ``get_client()`` calls stop receiving the shared client
+        immediately; requests already in flight get up to ``drain_timeout``
+        seconds to finish before connections are closed.
+        """
+        client, self._client = self._client, None
+        if client is None:
+            return
+
+        events, self._events = self._events, None
+
+        if self._in_flight:
+            logger.info(f"Draining {self._in_flight} in-flight ComfyUI requests...")
+            try:
+                await asyncio.wait_for(self._idle.wait(), timeout=self.drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"ComfyUI pool drain timed out after {self.drain_timeout}s "
+                    f"with {self._in_flight} requests in flight"
+                )
+
+        if events is not None:
+            await events.stop()
+
+        await client.aclose()
+        logger.info("ComfyUI connection pool closed")
+
+    def get_client(self) -> ComfyUIClient:
+        """
+        Get a ComfyUIClient bound to the shared pool and event listener.
+
+        Falls back to a self-managed client when the pool has not been
+        started (e.g. scripts that never run the lifespan hooks).
+
+        Returns:
+            ComfyUIClient instance
+        """
+        return ComfyUIClient(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            http_client=self._client,
+            events=self._events,
+            event_recheck_interval=self.ws_recheck_interval
+        )
+
+    def _request_started(self) -> None:
+        self._in_flight += 1
+        COMFY_HTTP_IN_FLIGHT.inc()
+        if self._idle is not None:
+            self._idle.clear()
+
+    def _request_finished(self) -> None:
+        self._in_flight -= 1
+        COMFY_HTTP_IN_FLIGHT.dec()
+        if self._in_flight == 0 and self._idle is not None:
+            self._idle.set()
+
+
+# Global instance
+comfyui_pool = ComfyUIConnectionPool(
+    base_url=settings.comfyui_url,
+    timeout=settings.comfyui_timeout,
+    max_connections=settings.comfyui_max_connections,
+    max_keepalive=settings.comfyui_max_keepalive,
+    keepalive_expiry=settings.comfyui_keepalive_expiry,
+    http2=settings.comfyui_http2,
+    drain_timeout=settings.comfyui_drain_timeout,
+    ws_enabled=settings.comfyui_ws_enabled,
+    ws_recheck_interval=settings.comfyui_ws_recheck_interval
+)
@@ -0,0 +1,461 @@
+"""
+Process-wide fan-out of job progress events to WebSocket clients.
+
+Workers publish each job's events on ``{prefix}:ws:jobs:{job_id}``. Instead
+of one Redis pub/sub connection per connected browser, every API process
+holds a single pattern subscription (``{prefix}:ws:jobs:*``) and dispatches
+messages to per-socket queues. Queues are bounded: a client that falls
+``queue_size`` messages behind is dropped so it can never stall dispatch
+to the others.
+
+``JobEventStream`` builds one client's view on top of the hub (initial
+status or replay from an offset, then deduplicated live events) and is
+shared by the WebSocket and SSE endpoints.
+"""
+
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Dict, Optional, Set, Union
+
+from prometheus_client import Counter, Gauge
+
+from .redis_client import RedisClient, redis_client, event_offset
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics
+JOB_EVENT_HUB_CONNECTED = Gauge(
+    "job_event_hub_connected",
+    "Whether the job event pattern subscription is active (1) or not (0)"
+)
+JOB_EVENT_SUBSCRIBERS = Gauge(
+    "job_event_subscribers",
+    "Local WebSocket subscribers to job events"
+)
+JOB_EVENT_SUBSCRIBERS_DROPPED = Counter(
+    "job_event_subscribers_dropped_total",
+    "Subscribers dropped because their event backlog was full"
+)
+
+# Queued when the subscription was re-established: events may have been
+# missed, so consumers should re-read the job
+RESYNC = object()
+
+TERMINAL_STATUSES = ("succeeded", "failed", "canceled", "expired")
+
+
+def done_event(job_data: dict) -> dict:
+    """Build the final ``done`` event for a finished job (URLs unsigned)."""
+    event = {
+        "type": "done",
+        "status": job_data["status"]
+    }
+    if job_data.get("result"):
+        event["result"] = job_data["result"]
+    if job_data.get("error"):
+        event["error"] = job_data["error"]
+    return event
+
+
+class JobSubscription:
+    """
+    Bounded event queue for one WebSocket.
+
+    ``get()`` returns raw event JSON, ``RESYNC``, or None once the
+    subscription was dropped for falling behind.
+    """
+
+    def __init__(self, job_id: str, queue_size: int):
+        self.job_id = job_id
+        self.dropped = False
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def push(self, item: Union[str, object]) -> bool:
+        """Queue an item without waiting; False if the backlog is full."""
+        try:
+            self.queue.put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def drop(self) -> None:
+        """Discard the backlog and wake the consumer with the end marker."""
+        self.dropped = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def get(self) -> Optional[Union[str, object]]:
+        """Wait for the next event."""
+        return await self.queue.get()
+
+
+class JobEventHub:
+    """
+    Single Redis pattern subscription shared by every WebSocket in the process.
+
+    Reconnects with exponential backoff; after every reconnect each
+    subscriber receives ``RESYNC``.
+    """
+
+    def __init__(
+        self,
+        redis: RedisClient,
+        queue_size: int = 256,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0
+    ):
+        """
+        Initialize hub (does not subscribe).
+
+        Args:
+            redis: Connected RedisClient whose prefix the workers publish under
+            queue_size: Maximum undelivered events per subscriber
+            reconnect_delay: Initial delay before resubscribing in seconds
+            max_reconnect_delay: Upper bound for reconnect backoff in seconds
+        """
+        self.redis = redis
+        self.queue_size = queue_size
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        self._task: Optional[asyncio.Task] = None
+        self._connected = False
+        self._subscriptions: Dict[str, Set[JobSubscription]] = {}
+
+    @property
+    def connected(self) -> bool:
+        """Whether the pattern subscription is currently active."""
+        return self._connected
+
+    @property
+    def running(self) -> bool:
+        """Whether the hub has been started."""
+        return self._task is not None
+
+    @property
+    def subscriber_count(self) -> int:
+        """Number of local subscriptions."""
+        return sum(len(subs) for subs in self._subscriptions.values())
+
+    def _channel_prefix(self) -> str:
+        return self.redis._key("ws:jobs:")
+
+    async def start(self) -> None:
+        """Start the background subscription task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Job event hub started (pattern={self._channel_prefix()}*)")
+
+    async def stop(self) -> None:
+        """Stop the subscription and drop all subscribers."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+            for subs in list(self._subscriptions.values()):
+                for subscription in list(subs):
+                    subscription.drop()
+            self._subscriptions.clear()
+            JOB_EVENT_SUBSCRIBERS.set(0)
+            logger.info("Job event hub stopped")
+
+    def subscribe(self, job_id: str) -> JobSubscription:
+        """
+        Register a subscriber for a job's events.
+
+        Args:
+            job_id: Job to follow
+
+        Returns:
+            JobSubscription (release with ``unsubscribe``)
+        """
+        subscription = JobSubscription(job_id, self.queue_size)
+        self._subscriptions.setdefault(job_id, set()).add(subscription)
+        JOB_EVENT_SUBSCRIBERS.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: JobSubscription) -> None:
+        """Remove a subscriber (no-op if it was already dropped)."""
+        subs = self._subscriptions.get(subscription.job_id)
+        if subs is None or subscription not in subs:
+            return
+
+        subs.discard(subscription)
+        if not subs:
+            del self._subscriptions[subscription.job_id]
+        JOB_EVENT_SUBSCRIBERS.dec()
+
+    async def wait_for_change(
+        self,
+        job_id: str,
+        timeout: float,
+        since_status: Optional[str] = None,
+        wake_on: tuple[str, ...] = ("status", "progress", "done")
+    ) -> Optional[dict]:
+        """
+        Read a job, waiting up to ``timeout`` for its status or progress to change.
+
+        Returns at once if the job is finished or its status already differs
+        from ``since_status``. Otherwise blocks on the job's events (no Redis
+        reads while waiting) and re-reads the job after the first event whose
+        type is in ``wake_on``.
+
+        Args:
+            job_id: Job identifier
+            timeout: Maximum wait in seconds
+            since_status: Status the caller last saw
+            wake_on: Event types that end the wait
+
+        Returns:
+            Job data, or None if the job doesn't exist
+        """
+        subscription = self.subscribe(job_id)
+        try:
+            job_data = await self.redis.get_job(job_id)
+            if (
+                not job_data
+                or job_data["status"] in TERMINAL_STATUSES
+                or (since_status is not None and job_data["status"] != since_status)
+            ):
+                return job_data
+
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return job_data
+                try:
+                    item = await asyncio.wait_for(subscription.get(), remaining)
+                except asyncio.TimeoutError:
+                    return job_data
+
+                if item is None or item is RESYNC:
+                    break
+                try:
+                    event = json.loads(item)
+                except json.JSONDecodeError:
+                    continue
+                if event.get("type") in wake_on:
+                    break
+
+            return await self.redis.get_job(job_id)
+        finally:
+            self.unsubscribe(subscription)
+
+    async def _run(self) -> None:
+        """Subscribe, dispatch, resubscribe on failure."""
+        delay = self.reconnect_delay
+        first = True
+
+        while True:
+            pubsub = self.redis._client.pubsub()
+            try:
+                await pubsub.psubscribe(f"{self._channel_prefix()}*")
+                self._connected = True
+                JOB_EVENT_HUB_CONNECTED.set(1)
+                delay = self.reconnect_delay
+
+                if not first:
+                    logger.info("Job event subscription restored")
+                    self._broadcast(RESYNC)
+                first = False
+
+                async for message in pubsub.listen():
+                    if message["type"] == "pmessage":
+                        self._dispatch(message["channel"], message["data"])
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Job event subscription error: {e}")
+            finally:
+                self._connected = False
+                JOB_EVENT_HUB_CONNECTED.set(0)
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _dispatch(self, channel: str, data: str) -> None:
+        """Queue a message for every local subscriber of its job."""
+        job_id = channel[len(self._channel_prefix()):]
+        subs = self._subscriptions.get(job_id)
+        if not subs:
+            return
+
+        for subscription in list(subs):
+            if not subscription.push(data):
+                self._drop(subscription)
+
+    def _broadcast(self, item: object) -> None:
+        for subs in list(self._subscriptions.values()):
+            for subscription in list(subs):
+                if not subscription.push(item):
+                    self._drop(subscription)
+
+    def _drop(self, subscription: JobSubscription) -> None:
+        logger.warning(
+            f"Dropping slow job event subscriber for {subscription.job_id} "
+            f"({self.queue_size} events behind)"
+        )
+        self.unsubscribe(subscription)
+        subscription.drop()
+        JOB_EVENT_SUBSCRIBERS_DROPPED.inc()
+
+
+class JobEventStream:
+    """
+    Events of one job for one client, from a snapshot or an offset to ``done``.
+
+    Without ``since`` the stream starts with the job's current status;
+    with ``since`` it replays the events recorded after that ID. Live
+    events already covered by either are skipped.
+
+    Usage:
+        stream = JobEventStream(hub, job_id, since)
+        job_data = await stream.open()   # None if the job doesn't exist
+        try:
+            async for event in stream.events():
+                ...
+        finally:
+            stream.close()
+    """
+
+    def __init__(self, hub: JobEventHub, job_id: str, since: Optional[str] = None):
+        """
+        Initialize stream (does not subscribe).
+
+        Args:
+            hub: Running job event hub
+            job_id: Job to follow
+            since: Last event ID the client has seen (validated by the caller)
+        """
+        self.hub = hub
+        self.job_id = job_id
+        self.since = since
+        self.last_id = since or "0"
+        self.job_data: Optional[dict] = None
+        # Set when the hub dropped the subscription for falling behind;
+        # the client should resume from ``last_id``
+        self.dropped = False
+
+        self._subscription: Optional[JobSubscription] = None
+        self._backlog: list = []
+
+    async def open(self) -> Optional[dict]:
+        """
+        Subscribe, then read the job and its offset (or the replay backlog).
+
+        Subscribing first means nothing published in between is lost.
+
+        Returns:
+            Job data, or None if the job doesn't exist (stream closed)
+        """
+        redis = self.hub.redis
+        self._subscription = self.hub.subscribe(self.job_id)
+
+        if self.since is None:
+            # Read the offset before the snapshot: anything published after
+            # it is delivered live, anything before it is in the snapshot
+            self.last_id = await redis.last_event_id(self.job_id)
+        else:
+            self._backlog = await redis.read_events(self.job_id, self.since)
+
+        self.job_data = await redis.get_job(self.job_id)
+        if not self.job_data:
+            self.close()
+        return self.job_data
+
+    @property
+    def finished(self) -> bool:
+        """Whether a resuming client has already seen everything, including ``done``."""
+        return (
+            self.since is not None
+            and not self._backlog
+            and self.job_data is not None
+            and self.job_data["status"] in TERMINAL_STATUSES
+        )
+
+    def close(self) -> None:
+        """Release the hub subscription."""
+        if self._subscription is not None:
+            self.hub.unsubscribe(self._subscription)
+            self._subscription = None
+
+    async def events(self) -> AsyncIterator[dict]:
+        """
+        Yield events (URLs unsigned) up to and including ``done``.
+
+        Ends early if the subscription is dropped (``dropped`` is set).
+        """
+        if self.since is None:
+            yield {
+                "type": "status",
+                "status": self.job_data["status"],
+                "progress": float(self.job_data.get("progress", 0.0)),
+                "event_id": self.last_id
+            }
+        else:
+            for event in self._backlog:
+                self.last_id = event["event_id"]
+                yield event
+                if event.get("type") == "done":
+                    return
+            self._backlog = []
+
+        if self.job_data["status"] in TERMINAL_STATUSES:
+            yield done_event(self.job_data)
+            return
+
+        while True:
+            item = await self._subscription.get()
+
+            if item is None:
+                self.dropped = True
+                return
+
+            if item is RESYNC:
+                # Events may have been missed while the subscription was down
+                backlog = await self.hub.redis.read_events(self.job_id, self.last_id)
+                for event in backlog:
+                    self.last_id = event["event_id"]
+                    yield event
+                    if event.get("type") == "done":
+                        return
+                continue
+
+            try:
+                event = json.loads(item)
+            except json.JSONDecodeError as e:
+                logger.error(f"Failed to parse event for job {self.job_id}: {e}")
+                continue
+
+            # Already delivered by the snapshot or a replay
+            event_id = event.get("event_id")
+            if event_id:
+                try:
+                    if event_offset(event_id) <= event_offset(self.last_id):
+                        continue
+                except ValueError:
+                    pass
+                self.last_id = event_id
+
+            yield event
+
+            if event.get("type") == "done":
+                return
+
+
+# Global instance
+job_event_hub = JobEventHub(redis_client, queue_size=settings.websocket_queue_size)
@@ -4,10 +4,11 @@ Job queue service for async image generation.
 Handles job submission, idempotency, and queueing to ARQ workers.
 """
 
+import asyncio
 import uuid
 import hashlib
 import json
-from typing import Optional
+from typing import Optional, Union
 from datetime import datetime, timezone
 from arq import create_pool
 from arq.connections import RedisSettings, ArqRedis
@@ -26,7 +27,7 @@ class JobQueueService:
     Service for managing job queue operations.
 
     Responsibilities:
-    - Job submission with idempotency
+    - Job submission with idempotency (single and pipelined batches)
     - ARQ queue integration
     - Job cancellation
     - Queue health monitoring
@@ -175,8 +176,12 @@ class JobQueueService:
             "params": request.model_dump(),
         })
 
-        # Set idempotency mapping (24h TTL)
-        await redis_client.set_idempotency(token, idempotency_key, job_id, ttl=86400)
+        # Set idempotency mapping (24h TTL); a key left pointing at a
+        # missing job is repointed at this one
+        if existing_job_id:
+            await redis_client.replace_idempotency_many(token, {idempotency_key: job_id})
+        else:
+            await redis_client.set_idempotency(token, idempotency_key, job_id, ttl=86400)
 
         # Enqueue to ARQ for processing
         try:
@@ -206,6 +211,169 @@ class JobQueueService:
             location=f"/api/v1/jobs/{job_id}"
         )
 
+    async def submit_jobs(
+        self,
+        items: list[tuple[GenerateImageRequest, Optional[str]]],
+        token: str = "anonymous"
+    ) -> list[Union[JobCreateResponse, Exception]]:
+        """
+        Submit many jobs with a constant number of Redis round trips.
+
+        Items are processed in chunks of ``job_batch_chunk_size``. Per chunk:
+        one pipeline claims the idempotency keys (SET NX GET), one reads
+        the jobs behind keys that were already taken, one transaction
+        creates and indexes the new jobs, then the new jobs are enqueued
+        to ARQ concurrently and ``jobs_total{status=queued}`` is bumped once.
+
+        Args:
+            items: ``(request, idempotency_key or None)`` pairs
+            token: User/client identifier
+
+        Returns:
+            Per item, in order: the job (new or existing) or the exception
+            that prevented submitting it
+
+        Raises:
+            RuntimeError: If ARQ pool not connected
+        """
+        if not self._pool:
+            raise RuntimeError("Job queue not connected. Call connect() first.")
+
+        results: list[Union[JobCreateResponse, Exception]] = []
+        chunk_size = settings.job_batch_chunk_size
+        for start in range(0, len(items), chunk_size):
+            chunk = items[start:start + chunk_size]
+            try:
+                results.extend(await self._submit_chunk(chunk, token))
+            except Exception as e:
+                logger.error(f"Failed to submit batch of {len(chunk)} jobs: {e}")
+                results.extend([e] * len(chunk))
+
+        return results
+
+    async def _submit_chunk(
+        self,
+        items: list[tuple[GenerateImageRequest, Optional[str]]],
+        token: str
+    ) -> list[Union[JobCreateResponse, Exception]]:
+        """Submit one chunk of a batch (see ``submit_jobs``)."""
+        keys = [
+            idempotency_key or self._compute_idempotency_key(request, token)
+            for request, idempotency_key in items
+        ]
+        new_ids = [self._generate_job_id() for _ in items]
+
+        existing_ids = await redis_client.claim_idempotency_many(
+            token, list(zip(keys, new_ids)), ttl=86400
+        )
+
+        created = {
+            job_id: (request, key)
+            for (request, _), key, job_id, existing in zip(items, keys, new_ids, existing_ids)
+            if existing is None
+        }
+
+        # Keys that were already taken return the job they point to; keys
+        # repeated within the chunk point to a job created below
+        lookups = [job_id for job_id in existing_ids if job_id and job_id not in created]
+        existing_jobs = await redis_client.get_jobs_many(lookups) if lookups else {}
+
+        # Idempotency key exists but job data missing (expired): create one
+        # replacement job per key and point the key at it
+        replaced: dict[str, str] = {}
+        for i, existing in enumerate(existing_ids):
+            if existing and existing not in created and not existing_jobs.get(existing):
+                if keys[i] in replaced:
+                    existing_ids[i] = replaced[keys[i]]
+                    continue
+                logger.warning(f"Idempotency key exists but job data missing: {existing}")
+                replaced[keys[i]] = new_ids[i]
+                created[new_ids[i]] = (items[i][0], keys[i])
+                existing_ids[i] = None
+
+        failed: dict[str, Exception] = {}
+        if created:
+            await redis_client.create_jobs_many({
+                job_id: {
+                    "owner_token": token,
+                    "idempotency_key": key,
+                    "params": request.model_dump(),
+                }
+                for job_id, (request, key) in created.items()
+            })
+            if replaced:
+                await redis_client.replace_idempotency_many(token, replaced)
+
+            failed = await self._enqueue_many(list(created))
+            for job_id, e in failed.items():
+                logger.error(f"Failed to enqueue job {job_id}: {e}")
+                await redis_client.update_job_status(
+                    job_id,
+                    "failed",
+                    error={"message": f"Failed to enqueue job: {str(e)}"}
+                )
+
+            logger.info(f"Enqueued {len(created) - len(failed)}/{len(created)} jobs to ARQ in one batch")
+
+        now = datetime.now(timezone.utc)
+        results = []
+        for job_id, existing in zip(new_ids, existing_ids):
+            if existing is None or existing in created:
+                job_id = existing or job_id
+                if job_id in failed:
+                    results.append(failed[job_id])
+                    continue
+                results.append(JobCreateResponse(
+                    job_id=job_id,
+                    status=JobStatus.QUEUED,
+                    queued_at=now,
+                    location=f"/api/v1/jobs/{job_id}"
+                ))
+            else:
+                job_data = existing_jobs[existing]
+                results.append(JobCreateResponse(
+                    job_id=existing,
+                    status=JobStatus(job_data["status"]),
+                    queued_at=datetime.fromisoformat(job_data["queued_at"]),
+                    location=f"/api/v1/jobs/{existing}"
+                ))
+
+        return results
+
+    async def _enqueue_many(self, job_ids: list[str]) -> dict[str, Exception]:
+        """
+        Enqueue ``generate_task`` for several jobs concurrently.
+
+        Uses the public ``ArqRedis.enqueue_job`` for every job, all in
+        flight at once over the pool's connections, then bumps
+        ``jobs_total{status=queued}`` once for the jobs that made it.
+
+        Returns:
+            Exception per job that could not be enqueued
+        """
+        outcomes = await asyncio.gather(
+            *(
+                self._pool.enqueue_job("generate_task", job_id, _queue_name=settings.arq_queue_name)
+                for job_id in job_ids
+            ),
+            return_exceptions=True
+        )
+        failed = {
+            job_id: outcome
+            for job_id, outcome in zip(job_ids, outcomes)
+            if isinstance(outcome, Exception)
+        }
+
+        if len(failed) < len(job_ids):
+            try:
+                await redis_client.increment_metric(
+                    "jobs_total", {"status": "queued"}, amount=len(job_ids) - len(failed)
+                )
+            except Exception as e:
+                logger.warning(f"Failed to update jobs_total metric: {e}")
+
+        return failed
+
     async def cancel_job(self, job_id: str) -> tuple[bool, JobStatus]:
         """
         Cancel a job.
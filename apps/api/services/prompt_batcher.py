@@ -0,0 +1,423 @@
+"""
+Worker-side micro-batching of ComfyUI prompts.
+
+Jobs that share a checkpoint, image size and sampler settings often differ
+only in prompt or seed, yet each one used to become its own ComfyUI prompt
+with ``batch_size=1``. The batcher collects compatible jobs arriving within
+a short window (ARQ runs up to ``arq_worker_concurrency`` jobs per worker
+at once) and submits them as one prompt:
+
+- Jobs with the same prompt and no fixed seed share one latent batch
+  (``EmptyLatentImage.batch_size`` is the sum of theirs).
+- Other jobs become parallel branches of the same graph. Identical nodes
+  (checkpoint loader, a common negative prompt, the empty latent) are
+  shared; see ``WorkflowTemplate.build_branches``.
+
+The outputs are then split back to the originating jobs.
+"""
+
+import asyncio
+import logging
+import random
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from prometheus_client import Histogram
+
+from .comfyui_client import (
+    ComfyUIClient,
+    ProgressCallback,
+    GENERATION_TOTAL,
+    GENERATION_LATENCY
+)
+from .workflow_templates import SAMPLER_NODE_TYPES
+from ..models.requests import GenerateImageRequest
+from ..models.responses import ImageResponse, ImageMetadata, JobStatus
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics
+WORKER_BATCH_JOBS = Histogram(
+    "worker_batch_jobs",
+    "Jobs coalesced into one ComfyUI prompt",
+    buckets=(1, 2, 3, 4, 6, 8, 12, 16)
+)
+
+
+def batch_key(request: GenerateImageRequest) -> tuple:
+    """
+    Jobs with equal keys can run in one prompt.
+
+    Args:
+        request: Image generation request
+
+    Returns:
+        Checkpoint, size and sampler settings of the request
+    """
+    return (
+        request.model,
+        request.width,
+        request.height,
+        request.steps,
+        request.cfg_scale,
+        request.sampler,
+    )
+
+
+class BatchMember:
+    """A job waiting for its share of a coalesced prompt."""
+
+    def __init__(
+        self,
+        request: GenerateImageRequest,
+        progress_callback: Optional[ProgressCallback],
+        future: asyncio.Future
+    ):
+        self.request = request
+        self.progress_callback = progress_callback
+        self.future = future
+        self.client: Optional[ComfyUIClient] = None  # set once the group runs
+
+
+class Branch:
+    """One branch of a coalesced prompt: a latent batch for one or more jobs."""
+
+    def __init__(self, request: GenerateImageRequest, seed: Optional[int] = None):
+        self.request = request
+        self.seed = seed
+        self.members: List[BatchMember] = []
+
+    @property
+    def batch_size(self) -> int:
+        return sum(member.request.batch_size for member in self.members)
+
+    def values(self, client: ComfyUIClient, filename_prefix: str) -> dict:
+        """Template parameter values for this branch."""
+        values = client.workflow_values(self.request)
+        values["batch_size"] = self.batch_size
+        values["filename_prefix"] = filename_prefix
+        if self.seed is not None:
+            values["seed"] = self.seed
+        return values
+
+
+def plan_branches(members: List[BatchMember], max_latent_batch: int) -> List[Branch]:
+    """
+    Group compatible jobs into branches.
+
+    Jobs without a fixed seed and with the same prompts share a branch
+    (one latent batch, up to ``max_latent_batch`` images); a fixed seed
+    can't be honoured inside a shared batch, so those jobs get their own.
+
+    Args:
+        members: Jobs with equal ``batch_key``
+        max_latent_batch: Maximum images per latent batch
+
+    Returns:
+        Branches, members in arrival order
+    """
+    branches: List[Branch] = []
+    open_batches: Dict[tuple, Branch] = {}
+
+    for member in members:
+        request = member.request
+        if request.seed is not None and request.seed >= 0:
+            branch = Branch(request)
+            branches.append(branch)
+        else:
+            prompts = (request.prompt, request.negative_prompt or "")
+            branch = open_batches.get(prompts)
+            if branch is None or branch.batch_size + request.batch_size > max_latent_batch:
+                branch = Branch(request, seed=random.randrange(2**32))
+                branches.append(branch)
+                open_batches[prompts] = branch
+        branch.members.append(member)
+
+    return branches
+
+
+class PromptBatcher:
+    """
+    Coalesces compatible generation requests into shared ComfyUI prompts.
+
+    Usage:
+        result, client = await prompt_batcher.generate(request, progress_callback=on_step)
+
+    A request waits at most ``window`` seconds for company; a group is
+    submitted as soon as it reaches ``max_jobs``. Each caller gets an
+    ImageResponse with only its own images, like
+    ``ComfyUIClient.generate_image``, and the client the prompt ran on.
+    Backend routing happens once per group (``client_factory(checkpoint)``),
+    so callers must not route their jobs themselves.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[Optional[str]], ComfyUIClient],
+        window: float = 0.05,
+        max_jobs: int = 4,
+        max_latent_batch: int = 10
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            client_factory: Returns the ComfyUI client a group is run with,
+                given the group's checkpoint
+            window: Seconds to wait for compatible requests
+            max_jobs: Maximum requests per prompt
+            max_latent_batch: Maximum images per shared latent batch
+        """
+        self.client_factory = client_factory
+        self.window = window
+        self.max_jobs = max_jobs
+        self.max_latent_batch = max_latent_batch
+
+        self._pending: Dict[tuple, List[BatchMember]] = {}
+        self._timers: Dict[tuple, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def generate(
+        self,
+        request: GenerateImageRequest,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> Tuple[ImageResponse, ComfyUIClient]:
+        """
+        Generate an image, possibly as part of a shared prompt.
+
+        Args:
+            request: Image generation request
+            progress_callback: Async callback receiving sampler (step, total)
+                for the whole prompt. Raising from it (e.g. CancelledError
+                on cancellation) drops this request from the batch; the
+                others continue.
+
+        Returns:
+            ImageResponse with this request's images, and the client
+            (bound to the backend that served the prompt) it ran on
+        """
+        loop = asyncio.get_running_loop()
+        member = BatchMember(request, progress_callback, loop.create_future())
+
+        key = batch_key(request)
+        group = self._pending.setdefault(key, [])
+        group.append(member)
+
+        if len(group) >= self.max_jobs:
+            self._flush(key)
+        elif len(group) == 1:
+            self._timers[key] = loop.call_later(self.window, self._flush, key)
+
+        return await member.future, member.client
+
+    async def stop(self) -> None:
+        """Cancel running batches (their callers see CancelledError)."""
+        for timer in self._timers.values():
+            timer.cancel()
+        for group in self._pending.values():
+            for member in group:
+                member.future.cancel()
+        self._timers.clear()
+        self._pending.clear()
+
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _flush(self, key: tuple) -> None:
+        """Start the prompt for a group."""
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+
+        # Callers cancelled while waiting have already gone
+        members = [member for member in self._pending.pop(key, []) if not member.future.done()]
+        if not members:
+            return
+
+        task = asyncio.create_task(self._run(members))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, members: List[BatchMember]) -> None:
+        """Submit one prompt for the members and hand out the results."""
+        WORKER_BATCH_JOBS.observe(len(members))
+
+        try:
+            # One routing decision for the whole group
+            async with self.client_factory(members[0].request.model) as client:
+                for member in members:
+                    member.client = client
+                await self._run_with(client, members)
+
+        except BaseException as e:
+            for member in members:
+                if not member.future.done():
+                    member.future.set_exception(e)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+
+    async def _run_with(self, client: ComfyUIClient, members: List[BatchMember]) -> None:
+        """Run a group of one as a plain generation, larger groups as a batch."""
+        if len(members) == 1:
+            member = members[0]
+            self._resolve(member, await client.generate_image(member.request, member.progress_callback))
+            return
+
+        await self._run_batch(client, members)
+
+    async def _run_batch(self, client: ComfyUIClient, members: List[BatchMember]) -> None:
+        """Run several members as branches of one prompt."""
+        created_at = datetime.utcnow()
+        branches = plan_branches(members, self.max_latent_batch)
+        prefix = f"api_batch_{random.getrandbits(32):08x}"
+
+        workflow, outputs = client.workflow_template.build_branches(
+            [branch.values(client, prefix) for branch in branches]
+        )
+        sampler_nodes = {
+            node_id for node_id, node in workflow.items()
+            if node["class_type"] in SAMPLER_NODE_TYPES
+        }
+
+        prompt_id = await client.submit_prompt(members[0].request, workflow=workflow)
+        started_at = datetime.utcnow()
+        logger.info(
+            f"Submitted {len(members)} jobs as prompt {prompt_id} "
+            f"({len(branches)} branches, {sum(b.batch_size for b in branches)} images)"
+        )
+
+        try:
+            history = await client.wait_for_completion(
+                prompt_id,
+                # Branches run one after another
+                max_wait_time=client.timeout * len(branches),
+                progress_callback=self._progress_fanout(members, len(branches)),
+                sampler_nodes=sampler_nodes
+            )
+        except asyncio.CancelledError:
+            if all(member.future.done() for member in members):
+                logger.info(f"Every job in prompt {prompt_id} was cancelled")
+                await client.delete_prompts([prompt_id])
+            raise
+        except Exception as e:
+            for member in members:
+                self._resolve(member, self._failed(member.request, prompt_id, e, created_at, started_at))
+            return
+
+        completed_at = datetime.utcnow()
+        window = client.execution_window(history)
+        if window:
+            started_at, completed_at = window
+        generation_time = (completed_at - started_at).total_seconds()
+
+        for branch, output_nodes in zip(branches, outputs):
+            image_urls = client.get_image_urls(prompt_id, history, node_ids=output_nodes)
+            offset = 0
+            for member in branch.members:
+                count = member.request.batch_size
+                member_urls = image_urls[offset:offset + count]
+                offset += count
+
+                if not member_urls:
+                    error = RuntimeError("No images for this job in the batch output")
+                    self._resolve(member, self._failed(member.request, prompt_id, error, created_at, started_at))
+                    continue
+
+                GENERATION_TOTAL.labels(status="success", model=member.request.model or "default").inc()
+                GENERATION_LATENCY.observe(generation_time)
+
+                request = member.request
+                self._resolve(member, ImageResponse(
+                    job_id=prompt_id,
+                    status=JobStatus.COMPLETED,
+                    image_url=member_urls[0],
+                    image_urls=member_urls,
+                    metadata=ImageMetadata(
+                        prompt=request.prompt,
+                        negative_prompt=request.negative_prompt,
+                        width=request.width,
+                        height=request.height,
+                        steps=request.steps,
+                        cfg_scale=request.cfg_scale,
+                        sampler=request.sampler.value,
+                        seed=request.seed if request.seed is not None and request.seed >= 0 else branch.seed,
+                        model=request.model,
+                        generation_time=generation_time
+                    ),
+                    created_at=created_at,
+                    started_at=started_at,
+                    completed_at=completed_at
+                ))
+
+    def _progress_fanout(self, members: List[BatchMember], branches: int) -> ProgressCallback:
+        """
+        Progress callback forwarding the prompt's overall progress to every member.
+
+        Branch samplers run one after another, each counting up to the
+        same step total, so a step number lower than the previous one
+        means the next branch started.
+        """
+        state = {"branch": 0, "last": 0}
+
+        async def on_step(step: int, total_steps: int) -> None:
+            if step < state["last"]:
+                state["branch"] = min(state["branch"] + 1, branches - 1)
+            state["last"] = step
+            overall = state["branch"] * total_steps + step
+
+            for member in members:
+                if member.future.done() or member.progress_callback is None:
+                    continue
+                try:
+                    await member.progress_callback(overall, total_steps * branches)
+                except BaseException as e:
+                    current = asyncio.current_task()
+                    if current is not None and current.cancelling():
+                        raise
+                    # This job is cancelled or failed; the others go on
+                    member.future.set_exception(e)
+
+            if all(member.future.done() for member in members):
+                raise asyncio.CancelledError("Every job in the batch was cancelled")
+
+        return on_step
+
+    @staticmethod
+    def _resolve(member: BatchMember, response: ImageResponse) -> None:
+        if not member.future.done():
+            member.future.set_result(response)
+
+    @staticmethod
+    def _failed(
+        request: GenerateImageRequest,
+        prompt_id: str,
+        error: BaseException,
+        created_at: datetime,
+        started_at: Optional[datetime]
+    ) -> ImageResponse:
+        logger.error(f"Batched generation failed for prompt {prompt_id}: {error}")
+        GENERATION_TOTAL.labels(status="error", model=request.model or "default").inc()
+        return ImageResponse(
+            job_id=prompt_id,
+            status=JobStatus.FAILED,
+            error=str(error),
+            created_at=created_at,
+            started_at=started_at,
+            completed_at=datetime.utcnow()
+        )
+
+
+def _pool_client(checkpoint: Optional[str] = None) -> ComfyUIClient:
+    from .comfyui_backends import comfyui_backends
+    return comfyui_backends.get_client(checkpoint)
+
+
+# Global instance
+prompt_batcher = PromptBatcher(
+    _pool_client,
+    window=settings.worker_batch_window,
+    max_jobs=settings.worker_batch_max_jobs,
+    max_latent_batch=settings.max_batch_size
+)
@@ -3,22 +3,65 @@ Rate limiting service using token bucket algorithm.
 
 Implements Redis-backed rate limiting with:
 - Per-user rate limits based on role
-- Token bucket algorithm for smooth rate limiting
+- Token bucket algorithm (burst capacity + constant refill)
+- A single atomic Lua call per check (EVALSHA)
 - Rate limit headers (X-RateLimit-*)
-- Configurable windows and quotas
 """
 
+import math
 import time
 import logging
 from typing import Optional, Tuple
 from dataclasses import dataclass
 
 from .redis_client import redis_client
-from ..config import settings
+from ..config import settings, ROLE_QUOTAS
 
 logger = logging.getLogger(__name__)
 
 
+# Refill the bucket for the time elapsed since the last call, then try to
+# take `requested` tokens. Runs atomically, so concurrent requests can never
+# take more tokens than the bucket holds. Uses the Redis clock so API
+# replicas with skewed clocks share one consistent bucket.
+#
+# KEYS[1] = bucket hash (tokens, ts)
+# ARGV    = capacity, refill rate (tokens/second), requested
+# Returns = {allowed (0/1), tokens left, retry_after seconds, seconds until full}
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil or ts == nil then
+    tokens = capacity
+    ts = now
+end
+
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= requested then
+    tokens = tokens - requested
+    allowed = 1
+else
+    retry_after = (requested - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+
+return {allowed, math.floor(tokens), tostring(retry_after), tostring((capacity - tokens) / rate)}
+"""
+
+
 @dataclass
 class RateLimitInfo:
     """Rate limit information for a user."""
@@ -29,116 +72,126 @@ class RateLimitInfo:
     retry_after: Optional[int] = None  # Seconds to wait before retry (if denied)
 
 
+def get_role_burst(role: str) -> Optional[int]:
+    """
+    Get the burst capacity configured for a role.
+
+    Args:
+        role: Role name (free, pro, internal)
+
+    Returns:
+        Burst capacity, or None to default to one window's worth of requests
+    """
+    return ROLE_QUOTAS.get(role, {}).get("rate_limit_burst")
+
+
 class RateLimiter:
     """
     Token bucket rate limiter with Redis backend.
 
     Algorithm:
-    - Each user has a bucket with a max capacity (limit)
-    - Tokens refill at a constant rate
-    - Each request consumes 1 token
+    - Each user has a bucket holding up to ``burst`` tokens
+    - Tokens refill at ``limit`` per ``rate_limit_window`` seconds
+    - Each request consumes 1 token (batch submissions one per job)
     - If no tokens available, request is denied
 
+    The refill and take happen in one Lua script (EVALSHA), so a check is
+    a single round trip and cannot over-admit under concurrency.
+
     Redis keys:
-    - cui:ratelimit:{user_id}:{window_start} -> remaining tokens
+    - cui:ratelimit:{user_id} -> hash {tokens, ts}
     """
 
-    def __init__(self):
-        """Initialize rate limiter."""
-        self.redis = redis_client._client
+    def __init__(self, redis_conn=None):
+        """
+        Initialize rate limiter.
+
+        Args:
+            redis_conn: Redis connection (defaults to the shared client)
+        """
+        self.redis = redis_conn or redis_client._client
         self.window = settings.rate_limit_window  # seconds
         self.key_prefix = "cui:ratelimit"
+        self._script = None
+
+    def _bucket_key(self, user_id: str) -> str:
+        return f"{self.key_prefix}:{user_id}"
 
     async def check_rate_limit(
         self,
         user_id: str,
         limit: int,
+        burst: Optional[int] = None,
+        requested: int = 1,
     ) -> RateLimitInfo:
         """
-        Check if user can make a request.
-
-        Uses sliding window with token bucket algorithm.
+        Check if user can make a request, consuming tokens if so.
 
         Args:
             user_id: User identifier
-            limit: Max requests per window (-1 = unlimited)
+            limit: Requests refilled per window (-1 = unlimited)
+            burst: Bucket capacity (defaults to ``limit``; -1 = unlimited)
+            requested: Tokens the request costs (e.g. jobs in a batch);
+                more than the bucket capacity is always denied
 
         Returns:
             RateLimitInfo with allow/deny decision and metadata
         """
+        now = time.time()
+
         # Check if rate limiting is enabled
         if not settings.rate_limit_enabled:
             return RateLimitInfo(
                 allowed=True,
                 limit=limit,
                 remaining=limit,
-                reset=int(time.time() + self.window),
+                reset=int(now + self.window),
             )
 
         # Check for unlimited (-1)
-        if limit == -1:
+        if limit == -1 or burst == -1:
             return RateLimitInfo(
                 allowed=True,
                 limit=999999,  # Display a large number
                 remaining=999999,
-                reset=int(time.time() + self.window),
+                reset=int(now + self.window),
             )
 
-        # Calculate current window
-        now = int(time.time())
-        window_start = (now // self.window) * self.window
-        window_end = window_start + self.window
+        capacity = burst if burst is not None else limit
+        rate = limit / self.window  # tokens per second
 
-        # Redis key for this window
-        key = f"{self.key_prefix}:{user_id}:{window_start}"
-
-        # Try to decrement token count
-        # Use DECR to atomically decrement and get new value
         try:
-            # Get current count (how many tokens used)
-            count_str = await self.redis.get(key)
-
-            if count_str is None:
-                # First request in this window
-                count = 0
-            else:
-                count = int(count_str)
-
-            # Check if limit exceeded
-            if count >= limit:
-                # Rate limit exceeded
-                retry_after = window_end - now
+            if self._script is None:
+                self._script = self.redis.register_script(TOKEN_BUCKET_LUA)
+
+            allowed, remaining, retry_after, until_full = await self._script(
+                keys=[self._bucket_key(user_id)],
+                args=[capacity, rate, requested],
+            )
+            reset = int(math.ceil(now + float(until_full)))
+
+            if not allowed:
                 logger.warning(
                     f"Rate limit exceeded for user {user_id}: "
-                    f"{count}/{limit} in window {window_start}"
+                    f"{requested} token(s) requested ({limit}/{self.window}s, burst {capacity})"
                 )
                 return RateLimitInfo(
                     allowed=False,
                     limit=limit,
                     remaining=0,
-                    reset=window_end,
-                    retry_after=retry_after,
+                    reset=reset,
+                    retry_after=max(1, int(math.ceil(float(retry_after)))),
                 )
 
-            # Increment count
-            await self.redis.incr(key)
-
-            # Set TTL on first use
-            if count == 0:
-                await self.redis.expire(key, self.window + 10)  # +10s buffer
-
-            remaining = limit - count - 1  # -1 for current request
-
             logger.debug(
-                f"Rate limit OK for user {user_id}: "
-                f"{count + 1}/{limit} in window {window_start}"
+                f"Rate limit OK for user {user_id}: {remaining}/{capacity} tokens left"
             )
 
             return RateLimitInfo(
                 allowed=True,
                 limit=limit,
-                remaining=remaining,
-                reset=window_end,
+                remaining=int(remaining),
+                reset=reset,
             )
 
         except Exception as e:
@@ -148,60 +201,59 @@ class RateLimiter:
                 allowed=True,
                 limit=limit,
                 remaining=limit,
-                reset=window_end,
+                reset=int(now + self.window),
             )
 
     async def reset_user_limit(self, user_id: str) -> None:
         """
         Reset rate limit for a user (admin function).
 
-        Deletes all rate limit keys for the user.
+        Deletes the user's bucket, so it starts full again.
 
         Args:
             user_id: User to reset
         """
-        pattern = f"{self.key_prefix}:{user_id}:*"
-        cursor = 0
-        deleted = 0
-
         try:
-            while True:
-                cursor, keys = await self.redis.scan(cursor, match=pattern, count=100)
-                if keys:
-                    await self.redis.delete(*keys)
-                    deleted += len(keys)
-                if cursor == 0:
-                    break
-
-            logger.info(f"Reset rate limit for user {user_id} (deleted {deleted} keys)")
+            await self.redis.delete(self._bucket_key(user_id))
+            logger.info(f"Reset rate limit for user {user_id}")
 
         except Exception as e:
             logger.error(f"Failed to reset rate limit for user {user_id}: {e}")
 
-    async def get_current_usage(self, user_id: str) -> Tuple[int, int]:
+    async def get_current_usage(
+        self,
+        user_id: str,
+        limit: int,
+        burst: Optional[int] = None,
+    ) -> Tuple[int, int]:
         """
-        Get current rate limit usage for a user.
+        Get current rate limit usage for a user (does not consume a token).
 
         Args:
             user_id: User ID
+            limit: Requests refilled per window
+            burst: Bucket capacity (defaults to ``limit``)
 
         Returns:
-            (used, window_end) tuple
+            (tokens used, unix time when the bucket is full again) tuple
         """
-        now = int(time.time())
-        window_start = (now // self.window) * self.window
-        window_end = window_start + self.window
-
-        key = f"{self.key_prefix}:{user_id}:{window_start}"
+        capacity = burst if burst is not None else limit
+        rate = limit / self.window
+        now = time.time()
 
         try:
-            count_str = await self.redis.get(key)
-            count = int(count_str) if count_str else 0
-            return (count, window_end)
+            tokens, ts = await self.redis.hmget(self._bucket_key(user_id), "tokens", "ts")
+            if tokens is None or ts is None:
+                return (0, int(now))
+
+            # Refill estimate uses the local clock (read-only, no Lua needed)
+            tokens = min(capacity, float(tokens) + max(0.0, now - float(ts)) * rate)
+            used = int(capacity - tokens)
+            return (used, int(math.ceil(now + (capacity - tokens) / rate)))
 
         except Exception as e:
             logger.error(f"Failed to get usage for user {user_id}: {e}")
-            return (0, window_end)
+            return (0, int(now))
 
 
 # Singleton instance
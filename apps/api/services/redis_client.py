@@ -2,19 +2,68 @@
 Redis client for job state management and pub/sub.
 
 Handles job metadata, idempotency tracking, cancellation flags,
-and progress updates via Redis pub/sub.
+and progress updates via Redis pub/sub (with a per-job event stream for
+replay).
 """
 
 import redis.asyncio as redis
 from typing import Optional, Any
+import base64
 import json
+import re
+import time
+import uuid
 from datetime import datetime, timezone
 import logging
 
 from ..config import settings
 
+try:
+    import msgpack
+except ImportError:  # optional, only needed for job_record_encoding="msgpack"
+    msgpack = None
+
 logger = logging.getLogger(__name__)
 
+# Job hashes (and their index entries) live this long
+JOB_TTL = 86400
+
+# Job record encodings. Scalar fields are plain strings in both; structured
+# fields (params, result, error) are stored as:
+# - "json" (v1):    <field>_json = JSON text
+# - "msgpack" (v2): <field>_mp = msgpack bytes, and the hash carries v=2
+# Readers accept either per field, so the encoding can be switched on a live
+# system once every API process and worker can read v2.
+JOB_ENCODINGS = ("json", "msgpack")
+JOB_STRUCTURED_FIELDS = ("params", "result", "error")
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed", "canceled", "expired")
+
+# Appends an event to the job's capped stream and publishes it with the
+# stream entry ID as ``event_id``, so live subscribers and replay readers see
+# the same offsets. The event is a JSON object with at least one field.
+APPEND_EVENT_LUA = """
+local id = redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[2], '*', 'data', ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('PUBLISH', ARGV[4], '{"event_id":"' .. id .. '",' .. string.sub(ARGV[1], 2))
+return id
+"""
+
+EVENT_ID_RE = re.compile(r"^(\d+)(?:-(\d+))?$")
+
+
+def event_offset(event_id: str) -> tuple[int, int]:
+    """
+    Parse a job event ID (stream entry ID, ``<ms>-<seq>``) for comparison.
+
+    Raises:
+        ValueError: If the ID is malformed
+    """
+    match = EVENT_ID_RE.match(event_id or "")
+    if not match:
+        raise ValueError(f"Invalid event ID: {event_id!r}")
+    return int(match.group(1)), int(match.group(2) or 0)
+
 
 class RedisClient:
     """
@@ -24,15 +73,33 @@ class RedisClient:
     - Job CRUD (create, read, update, delete)
     - Idempotency checking
     - Cancellation flags
-    - Progress pub/sub
+    - Progress pub/sub and per-job event streams
     - Metrics tracking
     - Crash recovery (in-progress tracking)
+    - Job listing (sorted-set indexes)
     """
 
-    def __init__(self, url: str, prefix: str = "cui"):
+    def __init__(
+        self,
+        url: str,
+        prefix: str = "cui",
+        encoding: str = "json",
+        event_stream_maxlen: int = 1000
+    ):
+        if encoding not in JOB_ENCODINGS:
+            raise ValueError(f"Unknown job record encoding: {encoding}")
+        if encoding == "msgpack" and msgpack is None:
+            logger.warning("msgpack package not installed, job records falling back to JSON encoding")
+            encoding = "json"
+
         self.url = url
         self.prefix = prefix
+        self.encoding = encoding
+        self.event_stream_maxlen = event_stream_maxlen
         self._client: Optional[redis.Redis] = None
+        # Job hashes may hold binary (msgpack) fields, so they are read on a
+        # connection that leaves responses undecoded
+        self._raw: Optional[redis.Redis] = None
 
     async def connect(self):
         """Establish Redis connection."""
@@ -41,10 +108,13 @@ class RedisClient:
             encoding="utf-8",
             decode_responses=True
         )
-        logger.info(f"Connected to Redis at {self.url}")
+        self._raw = await redis.from_url(self.url)
+        logger.info(f"Connected to Redis at {self.url} (job encoding: {self.encoding})")
 
     async def disconnect(self):
         """Close Redis connection."""
+        if self._raw:
+            await self._raw.close()
         if self._client:
             await self._client.close()
             logger.info("Disconnected from Redis")
@@ -65,26 +135,54 @@ class RedisClient:
             job_id: Unique job identifier
             job_data: Job metadata (params, owner, etc.)
         """
+        async with self._client.pipeline(transaction=True) as pipe:
+            self._queue_create_job(pipe, job_id, job_data)
+            await pipe.execute()
+
+        logger.info(f"Created job {job_id}")
+
+    async def create_jobs_many(self, jobs: dict[str, dict]) -> None:
+        """
+        Create several jobs in one transaction.
+
+        Args:
+            jobs: Job metadata keyed by job ID
+        """
+        if not jobs:
+            return
+
+        async with self._client.pipeline(transaction=True) as pipe:
+            for job_id, job_data in jobs.items():
+                self._queue_create_job(pipe, job_id, job_data)
+            await pipe.execute()
+
+        logger.info(f"Created {len(jobs)} jobs")
+
+    def _queue_create_job(self, pipe, job_id: str, job_data: dict) -> None:
+        """Queue the hash, TTL and index entries of a new job on a pipeline."""
         key = self._key(f"jobs:{job_id}")
 
-        # Serialize complex fields to JSON
         serialized_data = {
-            "job_id": job_id,
             "status": "queued",
             "progress": "0.0",
             "queued_at": datetime.now(timezone.utc).isoformat(),
         }
+        if self.encoding == "msgpack":
+            # job_id is implied by the key
+            serialized_data["v"] = "2"
+        else:
+            serialized_data["job_id"] = job_id
 
-        for k, v in job_data.items():
-            if isinstance(v, (dict, list)):
-                serialized_data[f"{k}_json"] = json.dumps(v)
-            else:
-                serialized_data[k] = str(v)
+        # Serialize complex fields
+        serialized_data.update(self._encode_fields(job_data))
 
-        await self._client.hset(key, mapping=serialized_data)
-        await self._client.expire(key, 86400)  # 24h TTL
+        queued_score = datetime.fromisoformat(serialized_data["queued_at"]).timestamp()
+        owner = job_data.get("owner_token")
 
-        logger.info(f"Created job {job_id}")
+        pipe.hset(key, mapping=serialized_data)
+        pipe.expire(key, JOB_TTL)  # 24h TTL
+        self._index_job(pipe, job_id, queued_score, owner)
+        self._index_status(pipe, job_id, "queued")
 
     async def get_job(self, job_id: str) -> Optional[dict]:
         """
@@ -97,21 +195,117 @@ class RedisClient:
             Job data dict or None if not found
         """
         key = self._key(f"jobs:{job_id}")
-        data = await self._client.hgetall(key)
+        data = await self._raw.hgetall(key)
+        return self._parse_job(job_id, data)
+
+    async def get_jobs_many(self, job_ids: list[str]) -> dict[str, Optional[dict]]:
+        """
+        Retrieve several jobs in one pipelined round trip.
+
+        Args:
+            job_ids: Job identifiers (duplicates are fetched once)
+
+        Returns:
+            Job data (None if not found) keyed by job ID, in request order
+        """
+        job_ids = list(dict.fromkeys(job_ids))
+        if not job_ids:
+            return {}
+
+        async with self._raw.pipeline(transaction=False) as pipe:
+            for job_id in job_ids:
+                pipe.hgetall(self._key(f"jobs:{job_id}"))
+            hashes = await pipe.execute()
+
+        return {
+            job_id: self._parse_job(job_id, data)
+            for job_id, data in zip(job_ids, hashes)
+        }
+
+    def _encode_fields(self, fields: dict) -> dict:
+        """Encode fields for HSET; structured values use the record encoding."""
+        encoded = {}
+        for k, v in fields.items():
+            if isinstance(v, (dict, list)):
+                if self.encoding == "msgpack":
+                    encoded[f"{k}_mp"] = msgpack.packb(v, use_bin_type=True)
+                else:
+                    encoded[f"{k}_json"] = json.dumps(v)
+            else:
+                encoded[k] = str(v)
+        return encoded
+
+    def _status_updates(
+        self,
+        status: str,
+        progress: Optional[float] = None,
+        **kwargs
+    ) -> dict:
+        """Build the HSET mapping for a status change (timestamps, JSON fields)."""
+        updates = {"status": status}
+
+        if progress is not None:
+            updates["progress"] = str(progress)
+
+        # Auto-set timestamps based on status
+        if status == "running" and "started_at" not in kwargs:
+            updates["started_at"] = datetime.now(timezone.utc).isoformat()
+
+        if status in ["succeeded", "failed", "canceled", "expired"]:
+            if "finished_at" not in kwargs:
+                updates["finished_at"] = datetime.now(timezone.utc).isoformat()
 
+        # Serialize complex fields
+        updates.update(self._encode_fields(kwargs))
+
+        return updates
+
+    def _parse_job(self, job_id: str, data: dict) -> Optional[dict]:
+        """
+        Parse a raw job hash of either encoding.
+
+        Args:
+            job_id: Job identifier
+            data: HGETALL reply (bytes from the raw connection, or str)
+
+        Returns:
+            Job dict with scalar fields as str and params/result/error
+            decoded, or None if the hash is empty
+
+        Raises:
+            RuntimeError: If the record has msgpack fields but msgpack is not installed
+        """
         if not data:
             return None
 
-        # Parse JSON fields
-        for field in ["params", "result", "error"]:
+        parsed = {}
+        for k, v in data.items():
+            if isinstance(k, bytes):
+                k = k.decode()
+                if not k.endswith("_mp"):
+                    v = v.decode()
+            parsed[k] = v
+        parsed.setdefault("job_id", job_id)
+
+        for field in JOB_STRUCTURED_FIELDS:
+            mp_key = f"{field}_mp"
             json_key = f"{field}_json"
-            if json_key in data:
+            if mp_key in parsed:
+                if msgpack is None:
+                    raise RuntimeError(
+                        f"Job {job_id} is msgpack-encoded but the msgpack package is not installed"
+                    )
                 try:
-                    data[field] = json.loads(data[json_key])
+                    parsed[field] = msgpack.unpackb(parsed.pop(mp_key), raw=False)
+                except ValueError:
+                    logger.warning(f"Failed to parse {mp_key} for job {job_id}")
+            elif json_key in parsed:
+                try:
+                    parsed[field] = json.loads(parsed[json_key])
                 except json.JSONDecodeError:
                     logger.warning(f"Failed to parse {json_key} for job {job_id}")
 
-        return data
+        return parsed
 
     async def update_job_status(
         self,
@@ -130,29 +324,235 @@ class RedisClient:
             **kwargs: Additional fields to update
         """
         key = self._key(f"jobs:{job_id}")
-        updates = {"status": status}
+        updates = self._status_updates(status, progress, **kwargs)
 
-        if progress is not None:
-            updates["progress"] = str(progress)
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=updates)
+            self._index_status(pipe, job_id, status)
+            await pipe.execute()
 
-        # Auto-set timestamps based on status
-        if status == "running" and "started_at" not in kwargs:
-            updates["started_at"] = datetime.now(timezone.utc).isoformat()
+        logger.debug(f"Updated job {job_id}: status={status}, progress={progress}")
 
-        if status in ["succeeded", "failed", "canceled", "expired"]:
-            if "finished_at" not in kwargs:
-                updates["finished_at"] = datetime.now(timezone.utc).isoformat()
+    # -------------------------------------------------------------------------
+    # Pipelined Job Transitions
+    #
+    # Each method below is a single round trip (MULTI/EXEC), so the job hash,
+    # the event (stream entry + pub/sub) and the counters change together.
+    # -------------------------------------------------------------------------
 
-        # Serialize complex fields
-        for k, v in kwargs.items():
-            if isinstance(v, (dict, list)):
-                updates[f"{k}_json"] = json.dumps(v)
+    async def start_job(self, job_id: str, event: dict) -> tuple[Optional[dict], bool]:
+        """
+        Mark a job in-progress and running, publish the event, and read it back.
+
+        Args:
+            job_id: Job identifier
+            event: Event to publish to the job's channel
+
+        Returns:
+            (job data or None if not found, whether the cancel flag is set)
+        """
+        key = self._key(f"jobs:{job_id}")
+
+        async with self._raw.pipeline(transaction=True) as pipe:
+            pipe.sadd(self._key("jobs:inprogress"), job_id)
+            pipe.hset(key, mapping=self._status_updates("running"))
+            self._append_event(pipe, job_id, event)
+            pipe.hgetall(key)
+            pipe.exists(self._key(f"jobs:{job_id}:cancel"))
+            self._index_status(pipe, job_id, "running")
+            results = await pipe.execute()
+
+        job_data = self._parse_job(job_id, results[3])
+        if job_data is None:
+            # HSET above created a stub hash for an unknown job; drop it
+            await self._client.delete(key)
+            await self._client.zrem(self._key("jobs:status:running"), job_id)
+            return None, False
+
+        return job_data, results[4] > 0
+
+    async def report_progress(
+        self,
+        job_id: str,
+        progress: float,
+        event: dict
+    ) -> bool:
+        """
+        Store progress, publish the event and check for cancellation.
+
+        Args:
+            job_id: Job identifier
+            progress: Progress 0.0-1.0
+            event: Event to publish to the job's channel
+
+        Returns:
+            True if the job's cancel flag is set
+        """
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.exists(self._key(f"jobs:{job_id}:cancel"))
+            pipe.hset(self._key(f"jobs:{job_id}"), "progress", str(progress))
+            self._append_event(pipe, job_id, event)
+            results = await pipe.execute()
+
+        logger.debug(f"Reported progress for job {job_id}: {progress}")
+        return results[0] > 0
+
+    async def finish_job(
+        self,
+        job_id: str,
+        status: str,
+        event: dict,
+        progress: Optional[float] = None,
+        clear_cancel: bool = False,
+        extra_metrics: Optional[list[tuple[str, Optional[dict]]]] = None,
+        **kwargs
+    ) -> None:
+        """
+        Record a terminal status, publish the done event, bump
+        ``jobs_total{status}`` and remove the job from the in-progress set.
+
+        Args:
+            job_id: Job identifier
+            status: Terminal status (succeeded, failed, canceled)
+            event: Event to publish to the job's channel
+            progress: Final progress (optional)
+            clear_cancel: Also delete the job's cancel flag
+            extra_metrics: Additional ``(metric, labels)`` counters to increment
+            **kwargs: Additional fields to update (result, error, ...)
+        """
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.hset(
+                self._key(f"jobs:{job_id}"),
+                mapping=self._status_updates(status, progress, **kwargs)
+            )
+            self._append_event(pipe, job_id, event)
+            pipe.incr(self._metric_key("jobs_total", {"status": status}))
+            for metric, labels in extra_metrics or []:
+                pipe.incr(self._metric_key(metric, labels))
+            pipe.srem(self._key("jobs:inprogress"), job_id)
+            if clear_cancel:
+                pipe.delete(self._key(f"jobs:{job_id}:cancel"))
+            self._index_status(pipe, job_id, status)
+            await pipe.execute()
+
+        logger.debug(f"Finished job {job_id}: status={status}")
+
+    # -------------------------------------------------------------------------
+    # Job Listing
+    #
+    # jobs:index and jobs:owner:{owner} are sorted sets of job IDs scored by
+    # queued_at (epoch seconds). jobs:status:{status} holds each job under its
+    # current status only, scored by the time of the transition; it is used
+    # as a filter (weight 0), so listing order always comes from queued_at.
+    # Entries older than JOB_TTL belong to expired hashes and are trimmed
+    # whenever a job is created.
+    # -------------------------------------------------------------------------
+
+    def _index_job(self, pipe, job_id: str, queued_score: float, owner: Optional[str]) -> None:
+        """Queue adding a new job to the global and owner indexes."""
+        cutoff = time.time() - JOB_TTL
+
+        indexes = [self._key("jobs:index")]
+        if owner:
+            indexes.append(self._key(f"jobs:owner:{owner}"))
+
+        for index in indexes:
+            pipe.zadd(index, {job_id: queued_score})
+            pipe.zremrangebyscore(index, "-inf", cutoff)
+        if owner:
+            # Owner indexes of inactive owners expire with their last job
+            pipe.expire(indexes[1], JOB_TTL)
+
+        for status in JOB_STATUSES:
+            pipe.zremrangebyscore(self._key(f"jobs:status:{status}"), "-inf", cutoff)
+
+    def _index_status(self, pipe, job_id: str, status: str) -> None:
+        """Queue moving a job to ``status`` in the status indexes."""
+        for other in JOB_STATUSES:
+            if other != status:
+                pipe.zrem(self._key(f"jobs:status:{other}"), job_id)
+        pipe.zadd(self._key(f"jobs:status:{status}"), {job_id: time.time()})
+
+    @staticmethod
+    def _encode_cursor(score: float, job_id: str) -> str:
+        return base64.urlsafe_b64encode(json.dumps([score, job_id]).encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple[float, str]:
+        try:
+            score, job_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return float(score), str(job_id)
+        except Exception:
+            raise ValueError(f"Invalid cursor: {cursor}")
+
+    async def list_jobs(
+        self,
+        owner: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> tuple[list[dict], int, Optional[str]]:
+        """
+        List jobs newest first, optionally for one owner and/or status.
+
+        Two round trips regardless of the number of jobs: one transaction
+        reads the page of IDs (and the total), one pipeline hydrates them.
+
+        Args:
+            owner: Only jobs submitted by this owner token (None = all jobs)
+            status: Only jobs currently in this status
+            limit: Page size
+            cursor: ``next_cursor`` from the previous page
+
+        Returns:
+            (parsed job dicts, total matching jobs, cursor for the next page or None)
+
+        Raises:
+            ValueError: If the cursor or status is invalid
+        """
+        if status is not None and status not in JOB_STATUSES:
+            raise ValueError(f"Invalid status: {status}")
+
+        index = self._key(f"jobs:owner:{owner}") if owner else self._key("jobs:index")
+        after = self._decode_cursor(cursor) if cursor else None
+
+        async with self._client.pipeline(transaction=True) as pipe:
+            source = index
+            if status:
+                source = self._key(f"jobs:list:{uuid.uuid4().hex}")
+                pipe.zinterstore(source, {index: 1, self._key(f"jobs:status:{status}"): 0})
             else:
-                updates[k] = str(v)
+                pipe.zcard(source)
 
-        await self._client.hset(key, mapping=updates)
+            if after:
+                score = repr(after[0])
+                # Jobs sharing the cursor's score, then everything strictly older
+                pipe.zrangebyscore(source, score, score)
+                pipe.zrevrangebyscore(source, f"({score}", "-inf", start=0, num=limit + 1, withscores=True)
+            else:
+                pipe.zrevrangebyscore(source, "+inf", "-inf", start=0, num=limit + 1, withscores=True)
 
-        logger.debug(f"Updated job {job_id}: status={status}, progress={progress}")
+            if status:
+                pipe.delete(source)
+            results = await pipe.execute()
+
+        total = results[0]
+        page = results[-2] if status else results[-1]
+        if after:
+            # Same-score members come in descending ID order when reversed
+            ties = sorted((m for m in results[1] if m < after[1]), reverse=True)
+            page = [(m, after[0]) for m in ties] + page
+
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = self._encode_cursor(page[-1][1], page[-1][0])
+
+        hydrated = await self.get_jobs_many([job_id for job_id, _ in page])
+        # Entries whose hash expired since they were indexed are skipped
+        jobs = [job_data for job_data in hydrated.values() if job_data is not None]
+
+        return jobs, total, next_cursor
 
     # -------------------------------------------------------------------------
     # Idempotency
@@ -200,6 +600,116 @@ class RedisClient:
         result = await self._client.set(key, job_id, nx=True, ex=ttl)
         return result is not None
 
+    async def claim_idempotency_many(
+        self,
+        token: str,
+        claims: list[tuple[str, str]],
+        ttl: int = 86400
+    ) -> list[Optional[str]]:
+        """
+        Claim several idempotency keys in one round trip.
+
+        Each key is set to its new job ID only if it doesn't exist yet
+        (SET NX GET, Redis >= 7.0), so concurrent submissions of the same
+        key cannot both create a job.
+
+        Args:
+            token: User/client identifier
+            claims: ``(idempotency_key, new_job_id)`` pairs, in order
+            ttl: Time-to-live in seconds (default 24h)
+
+        Returns:
+            Per claim: None if claimed, otherwise the job ID already mapped
+            to the key (including one claimed earlier in the same call)
+        """
+        async with self._client.pipeline(transaction=False) as pipe:
+            for idempotency_key, job_id in claims:
+                pipe.set(
+                    self._key(f"idemp:{token}:{idempotency_key}"),
+                    job_id,
+                    nx=True,
+                    get=True,
+                    ex=ttl
+                )
+            return await pipe.execute()
+
+    async def replace_idempotency_many(self, token: str, mappings: dict[str, str]) -> None:
+        """
+        Point idempotency keys at replacement jobs, keeping their TTL.
+
+        Used when a key outlived the job it mapped to, so retries with the
+        key return the replacement instead of the missing job.
+
+        Args:
+            token: User/client identifier
+            mappings: ``idempotency_key -> new_job_id``
+        """
+        async with self._client.pipeline(transaction=False) as pipe:
+            for idempotency_key, job_id in mappings.items():
+                pipe.set(self._key(f"idemp:{token}:{idempotency_key}"), job_id, keepttl=True)
+            await pipe.execute()
+
+    # -------------------------------------------------------------------------
+    # A/B Tests
+    #
+    # abtests:{test_id} is a hash with the test definition (request and
+    # variant -> job ID mapping) plus one "variant:{name}" field per
+    # variant whose job has finished, written as each one completes.
+    # -------------------------------------------------------------------------
+
+    async def create_abtest(self, test_id: str, definition: dict) -> None:
+        """
+        Store a new A/B test.
+
+        Args:
+            test_id: A/B test identifier
+            definition: Request, variant job IDs and creation time
+        """
+        key = self._key(f"abtests:{test_id}")
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, "definition", json.dumps(definition))
+            pipe.expire(key, JOB_TTL)
+            await pipe.execute()
+
+    async def record_abtest_variants(self, test_id: str, results: dict[str, dict]) -> None:
+        """
+        Store the final results of finished variants.
+
+        Args:
+            test_id: A/B test identifier
+            results: Variant result keyed by variant name
+        """
+        if not results:
+            return
+        key = self._key(f"abtests:{test_id}")
+        await self._client.hset(
+            key,
+            mapping={f"variant:{name}": json.dumps(result) for name, result in results.items()}
+        )
+
+    async def get_abtest(self, test_id: str) -> Optional[dict]:
+        """
+        Retrieve an A/B test.
+
+        Args:
+            test_id: A/B test identifier
+
+        Returns:
+            The definition with a ``results`` dict of the recorded variant
+            results, or None if not found
+        """
+        data = await self._client.hgetall(self._key(f"abtests:{test_id}"))
+        if not data or "definition" not in data:
+            return None
+
+        abtest = json.loads(data["definition"])
+        abtest["results"] = {
+            field.split(":", 1)[1]: json.loads(value)
+            for field, value in data.items()
+            if field.startswith("variant:")
+        }
+        return abtest
+
     # -------------------------------------------------------------------------
     # Cancellation
     # -------------------------------------------------------------------------
@@ -237,8 +747,26 @@ class RedisClient:
 
     # -------------------------------------------------------------------------
     # Progress Pub/Sub
+    #
+    # Every event is appended to jobs:{job_id}:events, a stream capped at
+    # ~event_stream_maxlen entries that expires with the job, and published on
+    # ws:jobs:{job_id} carrying its stream entry ID as ``event_id``. Clients
+    # that connect late or reconnect replay the stream from the last ID they
+    # saw, then continue on pub/sub.
     # -------------------------------------------------------------------------
 
+    def _append_event(self, pipe, job_id: str, event: dict) -> None:
+        """Queue an event append + publish on a pipeline."""
+        pipe.eval(
+            APPEND_EVENT_LUA,
+            1,
+            self._key(f"jobs:{job_id}:events"),
+            json.dumps(event),
+            self.event_stream_maxlen,
+            JOB_TTL,
+            self._key(f"ws:jobs:{job_id}"),
+        )
+
     async def publish_progress(self, job_id: str, data: dict) -> None:
         """
         Publish progress update to job's channel.
@@ -247,12 +775,70 @@ class RedisClient:
             job_id: Job identifier
             data: Progress data (type, progress, message, etc.)
         """
-        channel = self._key(f"ws:jobs:{job_id}")
-        message = json.dumps(data)
-        await self._client.publish(channel, message)
+        await self.publish_events(job_id, [data])
 
         logger.debug(f"Published progress for job {job_id}: {data.get('type')}")
 
+    async def publish_events(self, job_id: str, events: list[dict]) -> None:
+        """
+        Publish several events to a job's channel in one round trip.
+
+        Args:
+            job_id: Job identifier
+            events: Events to publish, in order
+        """
+        if not events:
+            return
+
+        async with self._client.pipeline(transaction=False) as pipe:
+            for event in events:
+                self._append_event(pipe, job_id, event)
+            await pipe.execute()
+
+    async def read_events(self, job_id: str, since: str = "0") -> list[dict]:
+        """
+        Read a job's recorded events after an offset.
+
+        Args:
+            job_id: Job identifier
+            since: Last event ID already seen (exclusive); "0" for all
+
+        Returns:
+            Events in order, each with its ``event_id``
+
+        Raises:
+            ValueError: If ``since`` is not an event ID
+        """
+        ms, seq = event_offset(since)
+        entries = await self._client.xrange(
+            self._key(f"jobs:{job_id}:events"),
+            min=f"({ms}-{seq}",
+            max="+"
+        )
+
+        events = []
+        for entry_id, fields in entries:
+            try:
+                event = json.loads(fields["data"])
+            except (KeyError, json.JSONDecodeError):
+                logger.warning(f"Skipping malformed event {entry_id} for job {job_id}")
+                continue
+            event["event_id"] = entry_id
+            events.append(event)
+        return events
+
+    async def last_event_id(self, job_id: str) -> str:
+        """
+        ID of a job's most recent event ("0" if none was recorded).
+
+        Args:
+            job_id: Job identifier
+        """
+        entries = await self._client.xrevrange(
+            self._key(f"jobs:{job_id}:events"), count=1
+        )
+        return entries[0][0] if entries else "0"
+
     async def subscribe_progress(self, job_id: str):
         """
         Subscribe to progress updates for a job.
@@ -273,31 +859,27 @@ class RedisClient:
     # Metrics
     # -------------------------------------------------------------------------
 
-    async def increment_metric(self, metric: str, labels: Optional[dict] = None) -> None:
+    def _metric_key(self, metric: str, labels: Optional[dict] = None) -> str:
+        """Generate key for a counter metric with optional labels."""
+        if labels:
+            label_str = ",".join(f"{k}={v}" for k, v in labels.items())
+            return self._key(f"metrics:{metric}{{{label_str}}}")
+        return self._key(f"metrics:{metric}")
+
+    async def increment_metric(self, metric: str, labels: Optional[dict] = None, amount: int = 1) -> None:
         """
         Increment a counter metric.
 
         Args:
             metric: Metric name (e.g., "jobs_total")
             labels: Optional labels dict (e.g., {"status": "succeeded"})
+            amount: Value to add (e.g. the number of jobs in a batch)
         """
-        if labels:
-            label_str = ",".join(f"{k}={v}" for k, v in labels.items())
-            key = self._key(f"metrics:{metric}{{{label_str}}}")
-        else:
-            key = self._key(f"metrics:{metric}")
-
-        await self._client.incr(key)
+        await self._client.incrby(self._metric_key(metric, labels), amount)
 
     async def get_metric(self, metric: str, labels: Optional[dict] = None) -> int:
         """Get current value of a counter metric."""
-        if labels:
-            label_str = ",".join(f"{k}={v}" for k, v in labels.items())
-            key = self._key(f"metrics:{metric}{{{label_str}}}")
-        else:
-            key = self._key(f"metrics:{metric}")
-
-        value = await self._client.get(key)
+        value = await self._client.get(self._metric_key(metric, labels))
         return int(value) if value else 0
 
     # -------------------------------------------------------------------------
@@ -348,4 +930,9 @@ class RedisClient:
 
 
 # Global instance
-redis_client = RedisClient(url=settings.redis_url, prefix=settings.redis_prefix)
+redis_client = RedisClient(
+    url=settings.redis_url,
+    prefix=settings.redis_prefix,
+    encoding=settings.job_record_encoding,
+    event_stream_maxlen=settings.job_event_stream_maxlen
+)
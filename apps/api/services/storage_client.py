@@ -7,9 +7,12 @@ for secure, time-limited access.
 
 from minio import Minio
 from minio.error import S3Error
+import certifi
 import io
+import os
+import urllib3
 from typing import BinaryIO, Optional
-from datetime import timedelta
+from datetime import datetime, timedelta
 import logging
 
 from ..config import settings
@@ -31,7 +34,8 @@ class StorageClient:
         access_key: str,
         secret_key: str,
         bucket: str,
-        secure: bool = False
+        secure: bool = False,
+        max_pool_connections: int = 10
     ):
         """
         Initialize storage client.
@@ -42,12 +46,27 @@ class StorageClient:
             secret_key: Secret access key
             bucket: Bucket name for artifacts
             secure: Use HTTPS (True for S3, False for local MinIO)
+            max_pool_connections: HTTP connections kept per host; should be
+                at least the number of threads calling this client
         """
+        # Same settings as MinIO's default pool, with a configurable size
+        http_client = urllib3.PoolManager(
+            timeout=urllib3.Timeout(connect=300, read=300),
+            maxsize=max_pool_connections,
+            cert_reqs="CERT_REQUIRED",
+            ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+            retries=urllib3.Retry(
+                total=5,
+                backoff_factor=0.2,
+                status_forcelist=[500, 502, 503, 504]
+            )
+        )
         self.client = Minio(
             endpoint,
             access_key=access_key,
             secret_key=secret_key,
-            secure=secure
+            secure=secure,
+            http_client=http_client
         )
         self.bucket = bucket
         self._ensure_bucket()
@@ -100,6 +119,46 @@ class StorageClient:
             logger.error(f"Failed to upload {object_name}: {e}")
             raise
 
+    def upload_stream(
+        self,
+        object_name: str,
+        data: BinaryIO,
+        content_type: str = "application/octet-stream",
+        part_size: int = 5 * 1024 * 1024
+    ) -> str:
+        """
+        Upload a stream of unknown length as a multipart upload.
+
+        Reads ``part_size`` bytes at a time, so memory stays bounded
+        regardless of object size. Blocks until the upload completes.
+
+        Args:
+            object_name: Object key/path
+            data: File-like object with a ``read(size)`` method
+            content_type: MIME type
+            part_size: Multipart chunk size in bytes (minimum 5 MiB)
+
+        Returns:
+            S3 URI
+
+        Raises:
+            S3Error: If upload fails
+        """
+        try:
+            self.client.put_object(
+                self.bucket,
+                object_name,
+                data,
+                length=-1,
+                content_type=content_type,
+                part_size=part_size
+            )
+            logger.info(f"Uploaded {object_name} (streamed)")
+            return f"s3://{self.bucket}/{object_name}"
+        except S3Error as e:
+            logger.error(f"Failed to upload {object_name}: {e}")
+            raise
+
     def upload_bytes(
         self,
         object_name: str,
@@ -150,7 +209,8 @@ class StorageClient:
     def get_presigned_url(
         self,
         object_name: str,
-        expires: timedelta = timedelta(hours=1)
+        expires: timedelta = timedelta(hours=1),
+        request_date: Optional[datetime] = None
     ) -> str:
         """
         Generate presigned URL for temporary access.
@@ -158,6 +218,8 @@ class StorageClient:
         Args:
             object_name: Object key/path
             expires: URL validity duration
+            request_date: Signing time (defaults to now); the URL is valid
+                from ``request_date`` until ``request_date + expires``
 
         Returns:
             Presigned URL (HTTP/HTTPS)
@@ -169,7 +231,8 @@ class StorageClient:
             url = self.client.presigned_get_object(
                 self.bucket,
                 object_name,
-                expires=expires
+                expires=expires,
+                request_date=request_date
             )
             logger.debug(f"Generated presigned URL for {object_name} (expires in {expires})")
             return url
@@ -272,5 +335,6 @@ storage_client = StorageClient(
     access_key=settings.minio_access_key,
     secret_key=settings.minio_secret_key,
     bucket=settings.minio_bucket,
-    secure=settings.minio_secure
+    secure=settings.minio_secure,
+    max_pool_connections=settings.storage_max_pool_connections
 )
@@ -0,0 +1,321 @@
+"""
+Workflow template registry for ComfyUI prompts.
+
+Templates under ``workflows/`` are loaded and validated once, and a
+parameter-binding map (e.g. ``prompt -> node 6 inputs.text``) is compiled
+from the node graph. Building a workflow per request then copies only the
+nodes that receive parameters; every other node is shared with the cached
+template and must be treated as read-only.
+"""
+
+import glob
+import json
+import logging
+import os
+from typing import Optional, Dict, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+WORKFLOWS_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), "../../../workflows")
+)
+
+# Node types whose progress events represent denoising steps
+SAMPLER_NODE_TYPES = {"KSampler", "KSamplerAdvanced", "SamplerCustom", "SamplerCustomAdvanced"}
+
+# Node types that write images to the prompt's history outputs
+OUTPUT_NODE_TYPES = {"SaveImage", "PreviewImage"}
+
+# Built-in text-to-image graph used when no template file is available
+DEFAULT_WORKFLOW = {
+    "3": {"inputs": {"seed": 42, "steps": 20, "cfg": 7.0, "sampler_name": "euler_a", "scheduler": "normal", "denoise": 1.0, "model": ["4", 0], "positive": ["6", 0], "negative": ["7", 0], "latent_image": ["5", 0]}, "class_type": "KSampler"},
+    "4": {"inputs": {"ckpt_name": "v1-5-pruned-emaonly.ckpt"}, "class_type": "CheckpointLoaderSimple"},
+    "5": {"inputs": {"width": 512, "height": 512, "batch_size": 1}, "class_type": "EmptyLatentImage"},
+    "6": {"inputs": {"text": "beautiful scenery", "clip": ["4", 1]}, "class_type": "CLIPTextEncode"},
+    "7": {"inputs": {"text": "", "clip": ["4", 1]}, "class_type": "CLIPTextEncode"},
+    "8": {"inputs": {"samples": ["3", 0], "vae": ["4", 2]}, "class_type": "VAEDecode"},
+    "9": {"inputs": {"filename_prefix": "ComfyUI", "images": ["8", 0]}, "class_type": "SaveImage"}
+}
+
+
+class WorkflowValidationError(ValueError):
+    """Raised when a workflow template has an invalid node graph."""
+    pass
+
+
+def _is_link(value: Any) -> bool:
+    """Whether an input value is a ``[node_id, output_index]`` link."""
+    return (
+        isinstance(value, list)
+        and len(value) == 2
+        and isinstance(value[0], str)
+        and isinstance(value[1], int)
+    )
+
+
+class WorkflowTemplate:
+    """
+    Validated workflow graph with a precompiled parameter-binding map.
+
+    Bindings map request parameters to ``(node_id, input_name)``:
+    ``seed``, ``steps``, ``cfg``, ``sampler_name``, ``ckpt_name``,
+    ``width``, ``height``, ``batch_size``, ``prompt``, ``negative_prompt``
+    and ``filename_prefix``. Parameters whose target node is missing from
+    the graph are simply not bound.
+    """
+
+    def __init__(self, name: str, graph: Dict[str, Any]):
+        """
+        Validate the graph and compile its bindings.
+
+        Args:
+            name: Template name (used in logs)
+            graph: ComfyUI API-format workflow
+
+        Raises:
+            WorkflowValidationError: If the graph is malformed
+        """
+        self.name = name
+        self.graph = graph
+        self._validate()
+
+        self.bindings: Dict[str, Tuple[str, str]] = self._compile_bindings()
+        self.sampler_nodes = frozenset(
+            node_id for node_id, node in graph.items()
+            if node["class_type"] in SAMPLER_NODE_TYPES
+        )
+        self.output_nodes = [
+            node_id for node_id, node in graph.items()
+            if node["class_type"] in OUTPUT_NODE_TYPES
+        ]
+
+        # Group by node so each mutated node is copied once per build
+        self._node_bindings: Dict[str, list[Tuple[str, str]]] = {}
+        for param, (node_id, input_name) in self.bindings.items():
+            self._node_bindings.setdefault(node_id, []).append((param, input_name))
+
+    def _validate(self) -> None:
+        """Check node structure and that every link points at an existing node."""
+        if not isinstance(self.graph, dict) or not self.graph:
+            raise WorkflowValidationError(f"{self.name}: workflow must be a non-empty object")
+
+        for node_id, node in self.graph.items():
+            if not isinstance(node, dict) or not isinstance(node.get("class_type"), str):
+                raise WorkflowValidationError(f"{self.name}: node {node_id} has no class_type")
+            if not isinstance(node.get("inputs"), dict):
+                raise WorkflowValidationError(f"{self.name}: node {node_id} has no inputs")
+
+            for input_name, value in node["inputs"].items():
+                if _is_link(value) and value[0] not in self.graph:
+                    raise WorkflowValidationError(
+                        f"{self.name}: node {node_id} input '{input_name}' "
+                        f"links to missing node {value[0]}"
+                    )
+
+    def _first_of(self, class_types: set[str]) -> Optional[str]:
+        for node_id, node in self.graph.items():
+            if node["class_type"] in class_types:
+                return node_id
+        return None
+
+    def _linked(self, node_id: str, input_name: str, class_types: set[str]) -> Optional[str]:
+        """Follow an input link (through pass-through nodes) to a node of the given type."""
+        seen = set()
+        value = self.graph[node_id]["inputs"].get(input_name)
+
+        while _is_link(value) and value[0] not in seen:
+            target = value[0]
+            seen.add(target)
+            if self.graph[target]["class_type"] in class_types:
+                return target
+            # e.g. LoRA loaders pass "model" through
+            value = self.graph[target]["inputs"].get(input_name)
+
+        return None
+
+    def _compile_bindings(self) -> Dict[str, Tuple[str, str]]:
+        """Derive parameter targets from the graph instead of fixed node IDs."""
+        bindings: Dict[str, Tuple[str, str]] = {}
+
+        def bind(param: str, node_id: Optional[str], input_name: str) -> None:
+            if node_id is not None and input_name in self.graph[node_id]["inputs"]:
+                bindings[param] = (node_id, input_name)
+
+        sampler = self._first_of({"KSampler"})
+        if sampler is not None:
+            for param in ("seed", "steps", "cfg", "sampler_name"):
+                bind(param, sampler, param)
+
+            bind("prompt", self._linked(sampler, "positive", {"CLIPTextEncode"}), "text")
+            bind("negative_prompt", self._linked(sampler, "negative", {"CLIPTextEncode"}), "text")
+
+            latent = self._linked(sampler, "latent_image", {"EmptyLatentImage"})
+            checkpoint = self._linked(sampler, "model", {"CheckpointLoaderSimple"})
+        else:
+            latent = None
+            checkpoint = None
+
+        latent = latent or self._first_of({"EmptyLatentImage"})
+        for param in ("width", "height", "batch_size"):
+            bind(param, latent, param)
+
+        bind("ckpt_name", checkpoint or self._first_of({"CheckpointLoaderSimple"}), "ckpt_name")
+        bind("filename_prefix", self._first_of({"SaveImage"}), "filename_prefix")
+
+        return bindings
+
+    def build(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build a workflow with parameters injected.
+
+        Only nodes that receive a parameter are copied; all other nodes
+        are shared with the template and must not be mutated.
+
+        Args:
+            values: Parameter values keyed by binding name
+
+        Returns:
+            ComfyUI workflow dictionary
+        """
+        workflow = dict(self.graph)
+
+        for node_id, fields in self._node_bindings.items():
+            updates = {
+                input_name: values[param]
+                for param, input_name in fields
+                if param in values
+            }
+            if updates:
+                node = self.graph[node_id]
+                workflow[node_id] = {**node, "inputs": {**node["inputs"], **updates}}
+
+        return workflow
+
+    def build_branches(
+        self,
+        branch_values: list[Dict[str, Any]]
+    ) -> Tuple[Dict[str, Any], list[list[str]]]:
+        """
+        Build one workflow that runs several parameter sets side by side.
+
+        Nodes that come out identical in every branch, and depend only on
+        such nodes, are shared (typically the checkpoint loader, and the
+        negative prompt encoder when the negative prompt is the same).
+        Every other node is duplicated per branch; branch 0 keeps the
+        template's node IDs, branch ``i`` prefixes them with ``b{i}_``.
+
+        Args:
+            branch_values: Parameter values per branch, as for ``build()``
+
+        Returns:
+            The workflow, and per branch the IDs of its output nodes
+        """
+        builds = [self.build(values) for values in branch_values]
+
+        varying = {
+            node_id for node_id in self.graph
+            if any(build[node_id] != builds[0][node_id] for build in builds[1:])
+        }
+        # Anything downstream of a duplicated node is duplicated too
+        changed = True
+        while changed:
+            changed = False
+            for node_id, node in self.graph.items():
+                if node_id not in varying and any(
+                    _is_link(value) and value[0] in varying
+                    for value in node["inputs"].values()
+                ):
+                    varying.add(node_id)
+                    changed = True
+
+        def branch_id(index: int, node_id: str) -> str:
+            return f"b{index}_{node_id}" if index and node_id in varying else node_id
+
+        workflow = dict(builds[0])
+        for index, build in enumerate(builds[1:], 1):
+            for node_id in varying:
+                node = build[node_id]
+                inputs = {
+                    name: [branch_id(index, value[0]), value[1]] if _is_link(value) else value
+                    for name, value in node["inputs"].items()
+                }
+                workflow[branch_id(index, node_id)] = {**node, "inputs": inputs}
+
+        outputs = [
+            [branch_id(index, node_id) for node_id in self.output_nodes]
+            for index in range(len(builds))
+        ]
+        return workflow, outputs
+
+
+class WorkflowRegistry:
+    """
+    Process-wide cache of validated workflow templates.
+
+    Call ``load_all()`` at startup; ``get()`` lazily loads anything
+    not preloaded (e.g. a custom ``workflow_path``).
+    """
+
+    def __init__(self, directory: str = WORKFLOWS_DIR):
+        self.directory = directory
+        self._templates: Dict[str, WorkflowTemplate] = {}
+        self._default: Optional[WorkflowTemplate] = None
+
+    def load_all(self) -> int:
+        """
+        Load and validate every ``*.json`` template in the directory.
+
+        Invalid templates are logged and skipped.
+
+        Returns:
+            Number of templates loaded
+        """
+        loaded = 0
+        for path in sorted(glob.glob(os.path.join(self.directory, "*.json"))):
+            try:
+                self._load(path)
+                loaded += 1
+            except (OSError, json.JSONDecodeError, WorkflowValidationError) as e:
+                logger.error(f"Skipping invalid workflow template {path}: {e}")
+
+        logger.info(f"Loaded {loaded} workflow templates from {self.directory}")
+        return loaded
+
+    def _load(self, path: str) -> WorkflowTemplate:
+        path = os.path.abspath(path)
+        with open(path, "r") as f:
+            graph = json.load(f)
+
+        template = WorkflowTemplate(os.path.basename(path), graph)
+        self._templates[path] = template
+        logger.debug(f"Compiled workflow template {template.name}: {template.bindings}")
+        return template
+
+    def get(self, path: str) -> WorkflowTemplate:
+        """
+        Get the template for a workflow file.
+
+        Args:
+            path: Path to the workflow JSON file
+
+        Returns:
+            WorkflowTemplate
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+            WorkflowValidationError: If the graph is invalid
+        """
+        template = self._templates.get(os.path.abspath(path))
+        if template is None:
+            template = self._load(path)
+        return template
+
+    def default(self) -> WorkflowTemplate:
+        """Get the built-in fallback template."""
+        if self._default is None:
+            self._default = WorkflowTemplate("built-in", DEFAULT_WORKFLOW)
+        return self._default
+
+
+# Global instance
+workflow_registry = WorkflowRegistry()
@@ -9,15 +9,18 @@ import json
 import logging
 import time
 from typing import Any
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone
 from functools import partial
 
 from arq import cron
 from arq.connections import RedisSettings
 
 from apps.api.services.redis_client import redis_client
-from apps.api.services.storage_client import storage_client
-from apps.api.services.comfyui_client import ComfyUIClient
+from apps.api.services.async_storage import async_storage_client
+from apps.api.services.artifact_transfer import transfer_artifacts
+from apps.api.services.comfyui_backends import comfyui_backends
+from apps.api.services.prompt_batcher import prompt_batcher
+from apps.api.services.workflow_templates import workflow_registry
 from apps.api.models.requests import GenerateImageRequest
 from apps.api.config import settings
 
@@ -48,21 +51,16 @@ async def generate_task(ctx, job_id: str):
     """
     logger.info(f"[{job_id}] Starting job processing")
     start_time = time.time()
+    finished = False
 
     try:
-        # Mark as in-progress for crash recovery
-        await redis_client.mark_job_in_progress(job_id)
-
-        # Update status to running
-        await redis_client.update_job_status(job_id, "running")
-        await redis_client.publish_progress(job_id, {
+        # Mark in-progress (crash recovery) + running, publish, and load the
+        # job and its cancel flag in one round trip
+        job_data, cancelled = await redis_client.start_job(job_id, {
             "type": "status",
             "status": "running",
             "progress": 0.0
         })
-
-        # Get job parameters
-        job_data = await redis_client.get_job(job_id)
         if not job_data:
             raise ValueError(f"Job {job_id} not found in Redis")
 
@@ -76,7 +74,7 @@ async def generate_task(ctx, job_id: str):
         request = GenerateImageRequest(**params_data)
 
         # Check for early cancellation
-        if await redis_client.check_cancel_flag(job_id):
+        if cancelled:
             raise asyncio.CancelledError("Job cancelled before processing started")
 
         # Define progress callback
@@ -88,108 +86,119 @@ async def generate_task(ctx, job_id: str):
                 progress: 0.0 to 1.0
                 message: Optional status message
             """
-            # Check cancellation between progress updates
-            if await redis_client.check_cancel_flag(job_id):
-                logger.info(f"[{job_id}] Cancellation detected during progress update")
-                raise asyncio.CancelledError("Job cancelled by user")
-
-            # Update Redis
-            await redis_client.update_job_status(job_id, "running", progress=progress)
-
-            # Publish to WebSocket subscribers
-            await redis_client.publish_progress(job_id, {
+            # Store progress, publish to WebSocket subscribers and check
+            # cancellation in a single round trip
+            cancelled = await redis_client.report_progress(job_id, progress, {
                 "type": "progress",
                 "progress": progress,
                 "message": message
             })
 
+            if cancelled:
+                logger.info(f"[{job_id}] Cancellation detected during progress update")
+                raise asyncio.CancelledError("Job cancelled by user")
+
             logger.debug(f"[{job_id}] Progress: {progress:.1%} - {message}")
 
+        # Sampler steps are mapped onto the 0.1-0.85 band and coalesced so
+        # Redis HSET/PUBLISH traffic stays bounded regardless of step count
+        last_step_report = 0.0
+
+        async def on_step(step: int, total_steps: int):
+            """
+            Called by ComfyUIClient for each KSampler step.
+
+            Args:
+                step: Current step (1-based)
+                total_steps: Total steps for this sampler
+            """
+            nonlocal last_step_report
+            now = time.monotonic()
+            if step < total_steps and now - last_step_report < settings.progress_min_interval:
+                return
+            last_step_report = now
+
+            progress = 0.1 + 0.75 * min(step / total_steps, 1.0)
+            await on_progress(progress, f"Denoising step {step}/{total_steps}")
+
         # Initialize ComfyUI client
         await on_progress(0.05, "Connecting to ComfyUI")
 
-        async with ComfyUIClient(
-            base_url=settings.comfyui_url,
-            timeout=settings.comfyui_timeout
-        ) as client:
-            # Check ComfyUI health
-            if not await client.health_check():
-                raise RuntimeError("ComfyUI is not available")
+        # Check ComfyUI health (cached by the health monitor)
+        if not comfyui_backends.healthy:
+            raise RuntimeError("ComfyUI is not available")
 
-            await on_progress(0.1, "Submitting workflow to ComfyUI")
+        await on_progress(0.1, "Submitting workflow to ComfyUI")
+        logger.info(f"[{job_id}] Calling ComfyUI for image generation")
 
-            # Generate image(s)
-            logger.info(f"[{job_id}] Calling ComfyUI for image generation")
-            result = await client.generate_image(request)
+        if settings.worker_batching_enabled:
+            # Share a prompt with compatible jobs; the batcher routes the
+            # prompt once, so this job must not be routed on its own
+            result, client = await prompt_batcher.generate(request, progress_callback=on_step)
+        else:
+            # Prefer a backend that already has the checkpoint loaded
+            async with comfyui_backends.get_client(request.model) as client:
+                result = await client.generate_image(request, progress_callback=on_step)
 
-            await on_progress(0.85, "Image generation complete, uploading artifacts")
+        await on_progress(0.85, "Image generation complete, uploading artifacts")
 
         # Upload artifacts to storage
         logger.info(f"[{job_id}] Uploading artifacts to storage")
 
         artifacts = []
+        failed_artifacts = []
+
+        # Stream every image from ComfyUI into MinIO/S3, in parallel
+        transfers = [
+            (image_url, f"jobs/{job_id}/image_{index}.png")
+            for index, image_url in enumerate(result.image_urls)
+        ]
+        logger.info(f"[{job_id}] Transferring {len(transfers)} images")
+
+        # Download through the pool of the backend that ran the prompt
+        sizes = await transfer_artifacts(
+            client.client,
+            transfers,
+            async_storage_client,
+            content_type="image/png"
+        )
 
-        # Download image from ComfyUI
-        if result.image_url:
-            object_name = f"jobs/{job_id}/image_0.png"
-
-            # Upload image bytes to MinIO/S3
-            try:
-                # Download image from ComfyUI using absolute URL
-                logger.info(f"[{job_id}] Downloading image from: {result.image_url}")
-
-                import httpx
-                async with httpx.AsyncClient(timeout=60.0) as http_client:
-                    response = await http_client.get(result.image_url)
-                    response.raise_for_status()
-                    image_bytes = response.content
-
-                if not image_bytes:
-                    raise RuntimeError(f"Downloaded 0 bytes from {result.image_url}")
-
-                logger.info(f"[{job_id}] Downloaded {len(image_bytes)} bytes")
-
-                # Upload to storage
-                storage_client.upload_bytes(
-                    object_name,
-                    image_bytes,
-                    content_type="image/png"
-                )
-
-                logger.info(f"[{job_id}] Uploaded {len(image_bytes)} bytes to MinIO: {object_name}")
-
-                # Generate presigned URL (1 hour TTL from settings)
-                url = storage_client.get_presigned_url(
-                    object_name,
-                    expires=timedelta(seconds=settings.artifact_url_ttl)
-                )
-
-                artifacts.append({
-                    "url": url,
-                    "seed": result.seed if hasattr(result, 'seed') else request.seed,
-                    "width": request.width,
-                    "height": request.height,
-                    "meta": {}
-                })
-
-                # Publish artifact event
-                await redis_client.publish_progress(job_id, {
-                    "type": "artifact",
-                    "url": url
-                })
-
-                logger.info(f"[{job_id}] Artifact ready: {object_name}")
+        for index, ((image_url, object_name), size) in enumerate(zip(transfers, sizes)):
+            if isinstance(size, Exception):
+                logger.error(f"[{job_id}] Failed to download/upload image {index}: {size}")
+                failed_artifacts.append(index)
+                continue
+
+            logger.info(f"[{job_id}] Uploaded {size} bytes to MinIO: {object_name}")
+
+            # URLs are signed lazily by the API when the job is read
+            artifacts.append({
+                "object_key": object_name,
+                "seed": result.seed if hasattr(result, 'seed') else request.seed,
+                "width": request.width,
+                "height": request.height,
+                "meta": {"index": index}
+            })
 
-            except Exception as e:
-                logger.error(f"[{job_id}] Failed to download/upload image: {e}")
-                raise  # Re-raise since we only have one image
+            logger.info(f"[{job_id}] Artifact ready: {object_name}")
 
         if not artifacts:
             raise RuntimeError("No artifacts were successfully uploaded")
+        if failed_artifacts:
+            logger.warning(
+                f"[{job_id}] {len(failed_artifacts)}/{len(transfers)} images could not be stored: "
+                f"indexes {failed_artifacts}"
+            )
+
+        # Publish artifact events
+        await redis_client.publish_events(job_id, [
+            {"type": "artifact", "object_key": artifact["object_key"]}
+            for artifact in artifacts
+        ])
 
         # Store metadata alongside artifacts
         metadata_object = f"jobs/{job_id}/metadata.json"
-        storage_client.upload_json(metadata_object, {
+        await async_storage_client.upload_json(metadata_object, {
             "job_id": job_id,
             "params": params_data,
             "generated_at": datetime.now(timezone.utc).isoformat(),
@@ -202,25 +211,25 @@ async def generate_task(ctx, job_id: str):
         # Store result in Redis
         result_data = {
             "artifacts": artifacts,
-            "generation_time": generation_time
+            "generation_time": generation_time,
+            # Lets clients tell a partial result from a smaller batch
+            "partial": bool(failed_artifacts),
+            "failed_artifacts": failed_artifacts
         }
 
-        await redis_client.update_job_status(
+        # Store result, publish completion, count it and unmark in-progress
+        await redis_client.finish_job(
             job_id,
             "succeeded",
+            {
+                "type": "done",
+                "status": "succeeded",
+                "result": result_data
+            },
             progress=1.0,
             result=result_data
         )
-
-        # Publish completion event
-        await redis_client.publish_progress(job_id, {
-            "type": "done",
-            "status": "succeeded",
-            "result": result_data
-        })
-
-        # Increment success metric
-        await redis_client.increment_metric("jobs_total", {"status": "succeeded"})
+        finished = True
 
         logger.info(f"[{job_id}] Job completed successfully in {generation_time:.1f}s")
 
@@ -228,21 +237,17 @@ async def generate_task(ctx, job_id: str):
         # Job was cancelled
         logger.info(f"[{job_id}] Job was cancelled")
 
-        await redis_client.update_job_status(
+        await redis_client.finish_job(
             job_id,
             "canceled",
+            {
+                "type": "done",
+                "status": "canceled"
+            },
+            clear_cancel=True,
             error={"message": "Job was cancelled by user"}
         )
-
-        await redis_client.publish_progress(job_id, {
-            "type": "done",
-            "status": "canceled"
-        })
-
-        await redis_client.increment_metric("jobs_total", {"status": "canceled"})
-
-        # Clear cancel flag
-        await redis_client.clear_cancel_flag(job_id)
+        finished = True
 
     except Exception as e:
         # Job failed
@@ -253,23 +258,22 @@ async def generate_task(ctx, job_id: str):
             "type": type(e).__name__
         }
 
-        await redis_client.update_job_status(
+        await redis_client.finish_job(
             job_id,
             "failed",
+            {
+                "type": "done",
+                "status": "failed",
+                "error": error_data
+            },
             error=error_data
         )
-
-        await redis_client.publish_progress(job_id, {
-            "type": "done",
-            "status": "failed",
-            "error": error_data
-        })
-
-        await redis_client.increment_metric("jobs_total", {"status": "failed"})
+        finished = True
 
     finally:
-        # Always unmark from in-progress (for crash recovery)
-        await redis_client.unmark_job_in_progress(job_id)
+        # finish_job unmarks in-progress; make sure it happens on any other exit
+        if not finished:
+            await redis_client.unmark_job_in_progress(job_id)
 
         elapsed = time.time() - start_time
         logger.info(f"[{job_id}] Worker task finished in {elapsed:.1f}s")
@@ -348,10 +352,18 @@ async def recover_crashed_jobs(ctx):
                             f"{settings.job_timeout}s timeout), marking as failed"
                         )
 
-                        # Mark as failed due to timeout
-                        await redis_client.update_job_status(
+                        # Mark as failed, publish, unmark and count in one round trip
+                        await redis_client.finish_job(
                             job_id,
                             "failed",
+                            {
+                                "type": "done",
+                                "status": "failed",
+                                "error": {
+                                    "message": "Job timed out or worker crashed"
+                                }
+                            },
+                            extra_metrics=[("jobs_recovered", {"outcome": "failed"})],
                             error={
                                 "message": "Job timed out or worker crashed",
                                 "type": "WorkerCrash",
@@ -359,22 +371,6 @@ async def recover_crashed_jobs(ctx):
                             }
                         )
 
-                        # Publish failure event
-                        await redis_client.publish_progress(job_id, {
-                            "type": "done",
-                            "status": "failed",
-                            "error": {
-                                "message": "Job timed out or worker crashed"
-                            }
-                        })
-
-                        # Remove from in-progress
-                        await redis_client.unmark_job_in_progress(job_id)
-
-                        # Increment metric
-                        await redis_client.increment_metric("jobs_total", {"status": "failed"})
-                        await redis_client.increment_metric("jobs_recovered", {"outcome": "failed"})
-
                         failed += 1
 
                     else:
@@ -392,9 +388,17 @@ async def recover_crashed_jobs(ctx):
                         f"marking as failed"
                     )
 
-                    await redis_client.update_job_status(
+                    await redis_client.finish_job(
                         job_id,
                         "failed",
+                        {
+                            "type": "done",
+                            "status": "failed",
+                            "error": {
+                                "message": "Job in inconsistent state"
+                            }
+                        },
+                        extra_metrics=[("jobs_recovered", {"outcome": "failed"})],
                         error={
                             "message": "Job in inconsistent state (no started_at)",
                             "type": "InconsistentState",
@@ -402,18 +406,6 @@ async def recover_crashed_jobs(ctx):
                         }
                     )
 
-                    await redis_client.publish_progress(job_id, {
-                        "type": "done",
-                        "status": "failed",
-                        "error": {
-                            "message": "Job in inconsistent state"
-                        }
-                    })
-
-                    await redis_client.unmark_job_in_progress(job_id)
-                    await redis_client.increment_metric("jobs_total", {"status": "failed"})
-                    await redis_client.increment_metric("jobs_recovered", {"outcome": "failed"})
-
                     failed += 1
 
             except Exception as e:
@@ -433,7 +425,8 @@ async def startup(ctx):
     """
     Worker startup hook.
 
-    Connects to Redis and performs crash recovery.
+    Connects to Redis, opens the shared ComfyUI connection pool and
+    storage thread pool, loads workflow templates and performs crash recovery.
 
     Crash Recovery:
     - Finds jobs stuck in "inprogress" state (from crashed workers)
@@ -444,6 +437,10 @@ async def startup(ctx):
     await redis_client.connect()
     logger.info("Worker started and connected to Redis")
 
+    await comfyui_backends.connect()
+    await async_storage_client.connect()
+    workflow_registry.load_all()
+
     # Crash recovery: handle jobs from crashed workers
     await recover_crashed_jobs(ctx)
 
@@ -452,8 +449,13 @@ async def shutdown(ctx):
     """
     Worker shutdown hook.
 
-    Disconnects from Redis gracefully.
+    Cancels coalesced prompts still running, drains the ComfyUI
+    connection pool, stops the storage thread pool and disconnects from
+    Redis gracefully.
     """
+    await prompt_batcher.stop()
+    await comfyui_backends.disconnect()
+    await async_storage_client.disconnect()
     await redis_client.disconnect()
     logger.info("Worker shutting down")
 
@@ -64,11 +64,25 @@ try:
     response = requests.post(
         f"{API_URL}/api/v1/abtest",
         json=test_data,
-        timeout=600  # 10 minutes max
+        timeout=30
     )
 
-    if response.status_code == 201:
+    # The test runs in the background; poll it until every variant finished
+    if response.status_code == 202:
         result = response.json()
+        print(f"Test {result['test_id']} started, waiting for results...")
+
+        deadline = time.time() + 600  # 10 minutes max
+        while result["status"] != "completed":
+            if time.time() > deadline:
+                raise requests.exceptions.Timeout()
+            time.sleep(5)
+            poll = requests.get(f"{API_URL}/api/v1/abtest/{result['test_id']}", timeout=30)
+            poll.raise_for_status()
+            result = poll.json()
+            done = result["completed_variants"] + result["failed_variants"]
+            print(f"   {done}/{result['total_variants']} variants finished")
+        print()
 
         print("=" * 70)
         print("✅ A/B TEST COMPLETE!")
@@ -128,7 +142,7 @@ try:
         print(response.text)
 
 except requests.exceptions.Timeout:
-    print("⏱️  Request timed out - images might be generating slowly")
+    print("⏱️  Timed out - images might be generating slowly")
     print("   Try again with simpler prompts or check the API logs")
 except Exception as e:
     print(f"❌ Error: {e}")
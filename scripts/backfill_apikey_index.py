@@ -0,0 +1,36 @@
+"""
+Migration: backfill the API key key_id -> key_hash index.
+
+Keys created before the index existed cannot be listed or revoked by ID
+until this has run once. It scans ``cui:apikey:*`` and writes
+``cui:apikey_id:{key_id}`` for each key with the key's remaining TTL.
+Idempotent; safe to run while the API is serving traffic.
+
+Uses REDIS_URL from the environment/.env (default redis://localhost:6379/0).
+
+Usage:
+    python scripts/backfill_apikey_index.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from apps.api.config import settings
+from apps.api.services.redis_client import redis_client
+from apps.api.services.auth_service import AuthService
+
+
+async def main() -> None:
+    await redis_client.connect()
+    try:
+        written = await AuthService().backfill_key_id_index()
+        print(f"Indexed {written} API keys ({settings.redis_url})")
+    finally:
+        await redis_client.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
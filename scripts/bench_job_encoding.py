@@ -0,0 +1,139 @@
+"""
+Benchmark: job record encodings (json v1 vs msgpack v2).
+
+For a representative succeeded job (generate params, 4 artifacts) reports:
+- encoded payload size of the job hash
+- parse time per GET /api/v1/jobs/{id} (RedisClient._parse_job on the raw
+  HGETALL reply)
+- with Redis reachable: MEMORY USAGE per job hash and its OBJECT ENCODING,
+  averaged over N jobs written under a throwaway prefix (deleted afterwards)
+
+Requires the msgpack package. Redis is optional (REDIS_URL, default
+redis://localhost:6379/0).
+
+Usage:
+    python scripts/bench_job_encoding.py [jobs]
+"""
+
+import asyncio
+import sys
+import timeit
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from apps.api.config import settings
+from apps.api.models.requests import GenerateImageRequest
+from apps.api.services.redis_client import JOB_ENCODINGS, RedisClient
+
+PARAMS = GenerateImageRequest(
+    prompt="A serene mountain lake at sunrise, mist over the water, pine forest, "
+           "dramatic light, highly detailed, 8k, photorealistic",
+    negative_prompt="blurry, low quality, distorted, watermark",
+    width=1024,
+    height=1024,
+    seed=123456789,
+).model_dump()
+
+RESULT = {
+    "artifacts": [
+        {
+            "object_key": f"jobs/j_0123456789ab/image_{i}.png",
+            "seed": 123456789 + i,
+            "width": 1024,
+            "height": 1024,
+            "meta": {"index": i},
+        }
+        for i in range(4)
+    ],
+    "generation_time": 14.73,
+}
+
+
+def raw_reply(client: RedisClient, job_id: str) -> dict:
+    """What HGETALL returns on the raw connection for a finished job."""
+    fields = {
+        "status": "queued",
+        "progress": "0.0",
+        "queued_at": "2026-01-01T12:00:00.000000+00:00",
+        "owner_token": str(uuid.uuid4()),
+        "idempotency_key": "0123456789abcdef",
+    }
+    if client.encoding == "msgpack":
+        fields["v"] = "2"
+    else:
+        fields["job_id"] = job_id
+    fields.update(client._encode_fields({"params": PARAMS}))
+    fields.update(client._status_updates("succeeded", 1.0, result=RESULT))
+    fields["started_at"] = fields["queued_at"]
+
+    return {
+        k.encode(): v if isinstance(v, bytes) else v.encode()
+        for k, v in fields.items()
+    }
+
+
+def bench_offline() -> None:
+    print(f"{'encoding':<10} {'payload':>9} {'parse/get':>11}")
+    for encoding in JOB_ENCODINGS:
+        client = RedisClient(url=settings.redis_url, encoding=encoding)
+        reply = raw_reply(client, "j_0123456789ab")
+        payload = sum(len(k) + len(v) for k, v in reply.items())
+
+        runs = 20000
+        seconds = timeit.timeit(lambda: client._parse_job("j_0123456789ab", dict(reply)), number=runs)
+        print(f"{encoding:<10} {payload:>7} B {seconds / runs * 1e6:>8.2f} us")
+
+
+async def bench_redis(jobs: int) -> None:
+    for encoding in JOB_ENCODINGS:
+        prefix = f"bench-{uuid.uuid4().hex[:8]}"
+        client = RedisClient(url=settings.redis_url, prefix=prefix, encoding=encoding)
+        await client.connect()
+        if not await client.health_check():
+            print("Redis not reachable, skipping memory benchmark")
+            await client.disconnect()
+            return
+
+        try:
+            keys = []
+            for i in range(jobs):
+                job_id = f"j_{i:012x}"
+                await client.create_job(job_id, {
+                    "owner_token": str(uuid.uuid4()),
+                    "idempotency_key": uuid.uuid4().hex[:16],
+                    "params": PARAMS,
+                })
+                await client.update_job_status(job_id, "succeeded", progress=1.0, result=RESULT)
+                keys.append(client._key(f"jobs:{job_id}"))
+
+            usage = [await client._client.memory_usage(key, samples=0) for key in keys]
+            object_encoding = await client._client.object("encoding", keys[0])
+
+            start = asyncio.get_running_loop().time()
+            for i in range(jobs):
+                await client.get_job(f"j_{i:012x}")
+            elapsed = asyncio.get_running_loop().time() - start
+
+            print(
+                f"{encoding:<10} {sum(usage) / jobs:8.0f} B/job in Redis ({object_encoding})  "
+                f"{elapsed / jobs * 1000:6.3f} ms/get_job"
+            )
+        finally:
+            keys = [key async for key in client._client.scan_iter(match=f"{prefix}:*")]
+            if keys:
+                await client._client.delete(*keys)
+            await client.disconnect()
+
+
+def main() -> None:
+    jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    bench_offline()
+    print(f"\n{jobs} jobs per encoding ({settings.redis_url})")
+    asyncio.run(bench_redis(jobs))
+
+
+if __name__ == "__main__":
+    main()
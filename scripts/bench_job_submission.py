@@ -0,0 +1,114 @@
+"""
+Benchmark: job submission throughput, one-by-one vs batched.
+
+Submits N jobs (default 1000) through JobQueueService at batch sizes 1,
+10, 100 and 1000 (submit_jobs, as used by POST /api/v1/jobs:batch) and,
+for comparison, one submit_job call per job (POST /api/v1/jobs). Reports
+jobs/second and Redis round trips per job. HTTP overhead is not included.
+
+Requires a running Redis (REDIS_URL, default redis://localhost:6379/0).
+Jobs go to a throwaway key prefix and ARQ queue, so no worker picks them
+up; everything is deleted afterwards.
+
+Usage:
+    python scripts/bench_job_submission.py [jobs]
+"""
+
+import asyncio
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import redis.asyncio.client as redis_async
+from arq.constants import job_key_prefix
+
+from apps.api.config import settings
+from apps.api.models.requests import GenerateImageRequest
+from apps.api.services.job_queue import job_queue
+from apps.api.services.redis_client import redis_client
+
+BATCH_SIZES = (1, 10, 100, 1000)
+ROUND_TRIPS = 0
+
+
+def count_round_trips() -> None:
+    """Count every command sent outside a pipeline, and each pipeline once."""
+    execute_command = redis_async.Redis.execute_command
+    execute_pipeline = redis_async.Pipeline.execute
+
+    async def counted_command(self, *args, **kwargs):
+        global ROUND_TRIPS
+        ROUND_TRIPS += 1
+        return await execute_command(self, *args, **kwargs)
+
+    async def counted_pipeline(self, *args, **kwargs):
+        global ROUND_TRIPS
+        ROUND_TRIPS += 1
+        return await execute_pipeline(self, *args, **kwargs)
+
+    redis_async.Redis.execute_command = counted_command
+    redis_async.Pipeline.execute = counted_pipeline
+
+
+def make_requests(jobs: int) -> list[GenerateImageRequest]:
+    run = uuid.uuid4().hex[:8]
+    return [GenerateImageRequest(prompt=f"bench {run} #{i}", seed=i) for i in range(jobs)]
+
+
+async def run(label: str, jobs: int, submit) -> None:
+    global ROUND_TRIPS
+    ROUND_TRIPS = 0
+    start = time.perf_counter()
+    await submit(make_requests(jobs))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<16} {jobs / elapsed:>10.0f} jobs/s {ROUND_TRIPS / jobs:>10.2f} round trips/job")
+
+
+async def main() -> None:
+    jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    prefix = f"bench-{uuid.uuid4().hex[:8]}"
+    redis_client.prefix = prefix
+    settings.arq_queue_name = f"{prefix}:queue"
+    settings.job_batch_chunk_size = max(BATCH_SIZES)
+
+    await redis_client.connect()
+    if not await redis_client.health_check():
+        print("Redis not reachable")
+        await redis_client.disconnect()
+        return
+    await job_queue.connect()
+    count_round_trips()
+
+    try:
+        print(f"{jobs} jobs ({settings.redis_url})")
+
+        async def one_by_one(requests):
+            for request in requests:
+                await job_queue.submit_job(request, token="bench")
+
+        await run("submit_job", jobs, one_by_one)
+
+        for batch_size in BATCH_SIZES:
+            async def batched(requests, batch_size=batch_size):
+                for start in range(0, len(requests), batch_size):
+                    items = [(request, None) for request in requests[start:start + batch_size]]
+                    await job_queue.submit_jobs(items, token="bench")
+
+            await run(f"batch of {batch_size}", jobs, batched)
+
+    finally:
+        arq_ids = await redis_client._client.zrange(settings.arq_queue_name, 0, -1)
+        keys = [key async for key in redis_client._client.scan_iter(match=f"{prefix}:*")]
+        keys += [job_key_prefix + arq_id for arq_id in arq_ids]
+        for start in range(0, len(keys), 1000):
+            await redis_client._client.delete(*keys[start:start + 1000])
+        await job_queue.disconnect()
+        await redis_client.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
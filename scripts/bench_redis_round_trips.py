@@ -0,0 +1,131 @@
+"""
+Benchmark: Redis round trips per job in the worker.
+
+Replays the Redis traffic of one generate_task run (start, N progress
+ticks, artifact events, completion) with the previous one-command-per-await
+calls and with the pipelined RedisClient transitions, counting round trips
+and wall time.
+
+Requires a running Redis (REDIS_URL, default redis://localhost:6379/0).
+Keys are written under a throwaway prefix and deleted afterwards.
+
+Usage:
+    python scripts/bench_redis_round_trips.py [jobs] [progress_ticks]
+"""
+
+import asyncio
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import redis.asyncio.client as redis_async
+
+from apps.api.config import settings
+from apps.api.services.redis_client import RedisClient
+
+ROUND_TRIPS = 0
+
+
+def count_round_trips() -> None:
+    """Count every command sent outside a pipeline, and each pipeline once."""
+    execute_command = redis_async.Redis.execute_command
+    execute_pipeline = redis_async.Pipeline.execute
+
+    async def counted_command(self, *args, **kwargs):
+        global ROUND_TRIPS
+        ROUND_TRIPS += 1
+        return await execute_command(self, *args, **kwargs)
+
+    async def counted_pipeline(self, *args, **kwargs):
+        global ROUND_TRIPS
+        ROUND_TRIPS += 1
+        return await execute_pipeline(self, *args, **kwargs)
+
+    redis_async.Redis.execute_command = counted_command
+    redis_async.Pipeline.execute = counted_pipeline
+
+
+RESULT = {"artifacts": [{"object_key": "jobs/x/image_0.png"}], "generation_time": 4.2}
+
+
+async def legacy_job(client: RedisClient, job_id: str, ticks: int) -> None:
+    """Redis calls made by generate_task before pipelining."""
+    await client.mark_job_in_progress(job_id)
+    await client.update_job_status(job_id, "running")
+    await client.publish_progress(job_id, {"type": "status", "status": "running", "progress": 0.0})
+    await client.get_job(job_id)
+    await client.check_cancel_flag(job_id)
+
+    for i in range(ticks):
+        progress = i / ticks
+        await client.check_cancel_flag(job_id)
+        await client.update_job_status(job_id, "running", progress=progress)
+        await client.publish_progress(job_id, {"type": "progress", "progress": progress, "message": ""})
+
+    await client.publish_progress(job_id, {"type": "artifact", "object_key": "jobs/x/image_0.png"})
+    await client.update_job_status(job_id, "succeeded", progress=1.0, result=RESULT)
+    await client.publish_progress(job_id, {"type": "done", "status": "succeeded", "result": RESULT})
+    await client.increment_metric("jobs_total", {"status": "succeeded"})
+    await client.unmark_job_in_progress(job_id)
+
+
+async def pipelined_job(client: RedisClient, job_id: str, ticks: int) -> None:
+    """Redis calls made by generate_task with pipelined transitions."""
+    await client.start_job(job_id, {"type": "status", "status": "running", "progress": 0.0})
+
+    for i in range(ticks):
+        progress = i / ticks
+        await client.report_progress(job_id, progress, {"type": "progress", "progress": progress, "message": ""})
+
+    await client.publish_events(job_id, [{"type": "artifact", "object_key": "jobs/x/image_0.png"}])
+    await client.finish_job(
+        job_id, "succeeded",
+        {"type": "done", "status": "succeeded", "result": RESULT},
+        progress=1.0, result=RESULT
+    )
+
+
+async def run(name, job_fn, client: RedisClient, jobs: int, ticks: int) -> None:
+    global ROUND_TRIPS
+
+    job_ids = [f"j_{uuid.uuid4().hex[:12]}" for _ in range(jobs)]
+    for job_id in job_ids:
+        await client.create_job(job_id, {"params": {"prompt": "bench"}})
+
+    ROUND_TRIPS = 0
+    start = time.perf_counter()
+    for job_id in job_ids:
+        await job_fn(client, job_id, ticks)
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{name:<10} {ROUND_TRIPS / jobs:6.1f} round trips/job  "
+        f"{elapsed / jobs * 1000:7.2f} ms/job"
+    )
+
+
+async def main() -> None:
+    jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    prefix = f"bench-{uuid.uuid4().hex[:8]}"
+    client = RedisClient(url=settings.redis_url, prefix=prefix)
+    await client.connect()
+    count_round_trips()
+
+    print(f"{jobs} jobs, {ticks} progress ticks each ({settings.redis_url})")
+    try:
+        await run("legacy", legacy_job, client, jobs, ticks)
+        await run("pipelined", pipelined_job, client, jobs, ticks)
+    finally:
+        keys = [key async for key in client._client.scan_iter(match=f"{prefix}:*")]
+        if keys:
+            await client._client.delete(*keys)
+        await client.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+"""
+Load test: Redis connections used by WebSocket progress subscribers.
+
+Opens WebSockets to a running API in steps (default 0, 100, 250, 500, 1000)
+against one synthetic job and prints Redis ``connected_clients`` after each
+step. With the shared job event hub the count stays flat; with one pub/sub
+connection per socket it grew by one per socket. Finally publishes a
+``done`` event and checks that every socket received it.
+
+Requires the API (API_URL, default http://localhost:8000) and the Redis it
+uses (REDIS_URL). The synthetic job is created directly in Redis and
+deleted afterwards.
+
+Usage:
+    python scripts/load_test_ws_connections.py [max_sockets]
+"""
+
+import asyncio
+import json
+import os
+import sys
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import websockets
+
+from apps.api.config import settings
+from apps.api.services.redis_client import RedisClient
+
+API_URL = os.environ.get("API_URL", "http://localhost:8000")
+
+
+async def connected_clients(client: RedisClient) -> int:
+    info = await client._client.info("clients")
+    return int(info["connected_clients"])
+
+
+async def open_socket(url: str):
+    ws = await websockets.connect(url, max_queue=None)
+    await ws.recv()  # initial status
+    return ws
+
+
+async def main() -> None:
+    max_sockets = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    steps = [n for n in (0, 100, 250, 500, 1000, 2000) if n < max_sockets] + [max_sockets]
+
+    client = RedisClient(url=settings.redis_url, prefix=settings.redis_prefix)
+    await client.connect()
+
+    job_id = f"j_load{uuid.uuid4().hex[:8]}"
+    await client.create_job(job_id, {"owner_token": "load-test", "params": {"prompt": "load test"}})
+    await client.update_job_status(job_id, "running")
+
+    ws_url = API_URL.replace("http://", "ws://", 1).replace("https://", "wss://", 1) + f"/ws/jobs/{job_id}"
+    sockets = []
+
+    print(f"{'sockets':>8} {'redis clients':>14}")
+    try:
+        for target in steps:
+            while len(sockets) < target:
+                batch = min(100, target - len(sockets))
+                sockets += await asyncio.gather(*(open_socket(ws_url) for _ in range(batch)))
+            await asyncio.sleep(0.5)
+            print(f"{len(sockets):>8} {await connected_clients(client):>14}")
+
+        await client.publish_progress(job_id, {"type": "done", "status": "succeeded"})
+        received = await asyncio.gather(*(ws.recv() for ws in sockets))
+        delivered = sum(json.loads(message).get("type") == "done" for message in received)
+        print(f"done event delivered to {delivered}/{len(sockets)} sockets")
+
+    finally:
+        await asyncio.gather(*(ws.close() for ws in sockets), return_exceptions=True)
+        await client._client.delete(client._key(f"jobs:{job_id}"))
+        await client.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
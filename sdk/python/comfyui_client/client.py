@@ -2,10 +2,12 @@
 ComfyUI API Client - Main implementation.
 """
 
+import json
 import requests
 import time
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Iterator
 from .exceptions import (
+    ComfyUIClientError,
     APIError,
     JobNotFoundError,
     JobFailedError,
@@ -15,6 +17,11 @@ from .exceptions import (
     RateLimitError,
 )
 
+try:
+    import websocket  # websocket-client, optional: pip install comfyui-client[stream]
+except ImportError:
+    websocket = None
+
 
 class GenerationResult:
     """Represents a completed image generation job."""
@@ -98,19 +105,121 @@ class Job:
         self._last_status = self.client.get_job(self.job_id)
         return self._last_status
 
+    def events(
+        self,
+        since: Optional[str] = None,
+        timeout: int = 600,
+        max_reconnects: int = 5,
+        reconnect_delay: float = 1.0
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream job events over the WebSocket until the ``done`` event.
+
+        Dropped connections are resumed from the last ``event_id`` received,
+        so the server replays exactly the missed events.
+
+        Args:
+            since: Resume after this event_id (default: start with current status)
+            timeout: Maximum time to stream in seconds (default: 600)
+            max_reconnects: Consecutive failed connections before giving up (default: 5)
+            reconnect_delay: Initial delay between reconnects in seconds, doubled
+                on each failure (default: 1.0)
+
+        Yields:
+            Event dicts (status, progress, log, artifact, done)
+
+        Raises:
+            ComfyUIClientError: If websocket-client is not installed
+            ConnectionError: If the WebSocket cannot be (re)established
+            TimeoutError: If the job doesn't finish within timeout
+        """
+        if websocket is None:
+            raise ComfyUIClientError(
+                "Streaming requires websocket-client: pip install comfyui-client[stream]"
+            )
+
+        deadline = time.time() + timeout
+        last_id = since
+        failures = 0
+
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise TimeoutError(
+                    f"Job {self.job_id} did not complete within {timeout}s",
+                    job_id=self.job_id,
+                    elapsed_time=timeout
+                )
+
+            url = self.client._ws_url(f"/ws/jobs/{self.job_id}")
+            if last_id:
+                url += f"?since={last_id}"
+
+            try:
+                ws = websocket.create_connection(
+                    url,
+                    timeout=remaining,
+                    header=self.client._ws_headers()
+                )
+            except (websocket.WebSocketException, OSError) as e:
+                failures += 1
+                if failures > max_reconnects:
+                    raise ConnectionError(f"Failed to stream events for job {self.job_id}: {e}")
+                time.sleep(min(reconnect_delay * 2 ** (failures - 1), remaining))
+                continue
+
+            try:
+                while True:
+                    message = ws.recv()
+                    if not message:
+                        # Closed by the server (e.g. dropped as too slow)
+                        failures += 1
+                        break
+
+                    event = json.loads(message)
+                    failures = 0
+                    if event.get("event_id"):
+                        last_id = event["event_id"]
+
+                    yield event
+
+                    if event.get("type") == "done":
+                        return
+
+            except websocket.WebSocketTimeoutException:
+                continue  # deadline check above raises TimeoutError
+
+            except (websocket.WebSocketException, OSError):
+                failures += 1
+
+            finally:
+                ws.close()
+
+            if failures > max_reconnects:
+                raise ConnectionError(f"Lost event stream for job {self.job_id}")
+
     def wait_for_completion(
         self,
         timeout: int = 600,
         poll_interval: int = 2,
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        stream: Optional[bool] = None,
+        long_poll: int = 30
     ) -> GenerationResult:
         """
         Wait for job to complete.
 
+        Follows the job's WebSocket events when websocket-client is installed
+        and polls the status endpoint otherwise (or if streaming fails).
+
         Args:
             timeout: Maximum time to wait in seconds (default: 600)
-            poll_interval: Time between status checks in seconds (default: 2)
+            poll_interval: Minimum time between status checks in seconds (default: 2);
+                each check long-polls the server for up to ``long_poll`` seconds
             progress_callback: Optional callback function called with status data
+            stream: Use the WebSocket (default: when websocket-client is installed)
+            long_poll: Server-side wait per status check in seconds, 0 to disable
+                (default: 30)
 
         Returns:
             GenerationResult when job completes successfully
@@ -122,6 +231,15 @@ class Job:
         """
         start_time = time.time()
 
+        if stream is None:
+            stream = websocket is not None
+
+        if stream:
+            try:
+                return self._wait_streaming(timeout, progress_callback)
+            except ConnectionError:
+                pass  # WebSocket unavailable, poll for the remaining time
+
         while True:
             elapsed = time.time() - start_time
 
@@ -132,26 +250,64 @@ class Job:
                     elapsed_time=elapsed
                 )
 
-            status_data = self.status()
+            previous = self._last_status
+            request_start = time.time()
+            # The first check returns at once; later ones wait for a change
+            wait = int(min(long_poll, timeout - elapsed)) if previous else 0
+            self._last_status = self.client.get_job(
+                self.job_id,
+                wait=wait,
+                since_status=previous["status"] if previous else None
+            )
+            status_data = self._last_status
 
             if progress_callback:
                 progress_callback(status_data)
 
-            job_status = status_data["status"]
+            if status_data["status"] in ("succeeded", "failed"):
+                return self._result(status_data)
 
-            if job_status == "succeeded":
-                return GenerationResult(status_data)
+            # Job still running. A long poll already waited for a change;
+            # servers without long polling answer at once, so keep the interval
+            pause = poll_interval - (time.time() - request_start)
+            if pause > 0:
+                time.sleep(pause)
 
-            elif job_status == "failed":
-                error_msg = status_data.get("error", "Unknown error")
-                raise JobFailedError(
-                    f"Job {self.job_id} failed: {error_msg}",
-                    job_id=self.job_id,
-                    error_details=error_msg
-                )
+    def _wait_streaming(
+        self,
+        timeout: int,
+        progress_callback: Optional[callable]
+    ) -> GenerationResult:
+        """Follow events until ``done``, then fetch the final job record."""
+        current = {"job_id": self.job_id}
+
+        for event in self.events(timeout=timeout):
+            for field in ("status", "progress"):
+                if field in event:
+                    current[field] = event[field]
+            if event.get("type") == "done":
+                break
+            if progress_callback:
+                progress_callback(dict(current))
+
+        status_data = self.status()
+        if progress_callback:
+            progress_callback(status_data)
+        return self._result(status_data)
+
+    def _result(self, status_data: Dict[str, Any]) -> GenerationResult:
+        """Turn a finished job's status into a result or raise JobFailedError."""
+        job_status = status_data["status"]
+
+        if job_status == "succeeded":
+            return GenerationResult(status_data)
 
-            # Job still running, wait and retry
-            time.sleep(poll_interval)
+        error_msg = status_data.get("error") or f"Job ended with status {job_status}"
+        raise JobFailedError(
+            f"Job {self.job_id} failed: {error_msg}",
+            job_id=self.job_id,
+            error_details=error_msg
+        )
 
     def cancel(self) -> Dict[str, Any]:
         """
@@ -212,6 +368,17 @@ class ComfyUIClient:
         if api_key:
             self.session.headers["X-API-Key"] = api_key
 
+    def _ws_url(self, path: str) -> str:
+        """WebSocket URL for an API path."""
+        for http, ws in (("https://", "wss://"), ("http://", "ws://")):
+            if self.base_url.startswith(http):
+                return ws + self.base_url[len(http):] + path
+        return self.base_url + path
+
+    def _ws_headers(self) -> List[str]:
+        """Handshake headers for WebSocket connections."""
+        return [f"X-API-Key: {self.api_key}"] if self.api_key else []
+
     def _request(
         self,
         method: str,
@@ -343,12 +510,20 @@ class ComfyUIClient:
         response = self._request("POST", "/api/v1/jobs", json=payload)
         return Job(self, response["job_id"])
 
-    def get_job(self, job_id: str) -> Dict[str, Any]:
+    def get_job(
+        self,
+        job_id: str,
+        wait: int = 0,
+        since_status: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Get job status and results.
 
         Args:
             job_id: Job identifier
+            wait: Long-poll for up to this many seconds until the job's status
+                or progress changes (default: 0, return immediately)
+            since_status: With ``wait``, return at once if the status differs
 
         Returns:
             Job data including status and results
@@ -357,20 +532,58 @@ class ComfyUIClient:
             JobNotFoundError: If job doesn't exist
             APIError: If request fails
         """
-        return self._request("GET", f"/api/v1/jobs/{job_id}")
+        if not wait:
+            return self._request("GET", f"/api/v1/jobs/{job_id}")
+
+        params = {"wait": wait}
+        if since_status:
+            params["since_status"] = since_status
+        return self._request(
+            "GET",
+            f"/api/v1/jobs/{job_id}",
+            params=params,
+            timeout=self.timeout + wait
+        )
 
-    def list_jobs(self, limit: int = 10) -> List[Dict[str, Any]]:
+    def get_jobs(self, job_ids: List[str]) -> Dict[str, Any]:
         """
-        List recent jobs (if supported by API).
+        Get several jobs in one request.
 
         Args:
-            limit: Maximum number of jobs to return
+            job_ids: Job identifiers (up to 500)
 
         Returns:
-            List of job data dicts
+            ``{"jobs": [...], "errors": [...]}``; missing jobs are listed in
+            errors with code JOB_NOT_FOUND
+
+        Raises:
+            APIError: If request fails
         """
-        # Note: This endpoint may not be implemented yet
-        return self._request("GET", f"/api/v1/jobs?limit={limit}")
+        return self._request("POST", "/api/v1/jobs:batchGet", json={"job_ids": job_ids})
+
+    def list_jobs(
+        self,
+        limit: int = 10,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        List recent jobs, newest first.
+
+        Args:
+            limit: Maximum number of jobs to return (max 100)
+            status: Only jobs currently in this status
+            cursor: ``next_cursor`` from a previous page
+
+        Returns:
+            Page dict with ``jobs``, ``total``, ``limit`` and ``next_cursor``
+        """
+        params: Dict[str, Any] = {"limit": limit}
+        if status:
+            params["status"] = status
+        if cursor:
+            params["cursor"] = cursor
+        return self._request("GET", "/api/v1/jobs", params=params)
 
     # Monitoring endpoints
 
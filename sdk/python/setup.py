@@ -30,6 +30,9 @@ setup(
         "requests>=2.25.0",
     ],
     extras_require={
+        "stream": [
+            "websocket-client>=1.0.0",
+        ],
         "dev": [
             "pytest>=7.0.0",
             "black>=22.0.0",
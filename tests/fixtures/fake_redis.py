@@ -0,0 +1,118 @@
+"""
+In-memory stand-in for the subset of redis.asyncio used by AuthService.
+
+Counts round trips: every awaited command is one, and a pipeline is one
+regardless of how many commands it queues.
+"""
+
+import fnmatch
+
+
+class FakePipeline:
+    """Queues commands and runs them on ``execute()``."""
+
+    def __init__(self, redis: "FakeRedis"):
+        self._redis = redis
+        self._queued = []
+
+    def __getattr__(self, name):
+        command = getattr(self._redis, f"_{name}")
+
+        def queue(*args, **kwargs):
+            self._queued.append((command, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        self._redis.round_trips += 1
+        queued, self._queued = self._queued, []
+        return [command(*args, **kwargs) for command, args, kwargs in queued]
+
+
+class FakeRedis:
+    """Hashes, strings and sets with TTLs recorded but never expired."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.published = []
+        self.script_calls = []
+        self.round_trips = 0
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        command = getattr(self, f"_{name}")
+
+        async def run(*args, **kwargs):
+            self.round_trips += 1
+            return command(*args, **kwargs)
+
+        return run
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def register_script(self, script):
+        async def run(keys=(), args=()):
+            self.round_trips += 1
+            self.script_calls.append((list(keys), list(args)))
+            return len(keys)
+        return run
+
+    # Commands -------------------------------------------------------------
+
+    def _get(self, key):
+        return self.data.get(key)
+
+    def _set(self, key, value, px=None):
+        self.data[key] = value
+        if px:
+            self.ttls[key] = px / 1000
+        return True
+
+    def _mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def _hset(self, key, field=None, value=None, mapping=None):
+        fields = dict(mapping or {})
+        if field is not None:
+            fields[field] = value
+        self.data.setdefault(key, {}).update(fields)
+        return len(fields)
+
+    def _hget(self, key, field):
+        return self.data.get(key, {}).get(field)
+
+    def _hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def _sadd(self, key, *members):
+        self.data.setdefault(key, set()).update(members)
+        return len(members)
+
+    def _srem(self, key, *members):
+        self.data.get(key, set()).difference_update(members)
+        return len(members)
+
+    def _smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    def _expire(self, key, seconds):
+        self.ttls[key] = seconds
+        return True
+
+    def _pttl(self, key):
+        if key not in self.data:
+            return -2
+        if key not in self.ttls:
+            return -1
+        return int(self.ttls[key] * 1000)
+
+    def _scan(self, cursor, match="*", count=None):
+        return 0, [key for key in self.data if fnmatch.fnmatchcase(key, match)]
+
+    def _publish(self, channel, message):
+        self.published.append((channel, message))
+        return 1
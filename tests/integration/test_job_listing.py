@@ -0,0 +1,68 @@
+"""
+Integration tests for indexed job listing.
+
+Prerequisites:
+- Redis running at REDIS_URL (docker-compose.dev.yml)
+"""
+
+import uuid
+
+import pytest
+
+from apps.api.config import settings
+from apps.api.services.redis_client import RedisClient
+
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+async def client():
+    """RedisClient under a throwaway prefix."""
+    client = RedisClient(url=settings.redis_url, prefix=f"test-{uuid.uuid4().hex[:8]}")
+    await client.connect()
+    if not await client.health_check():
+        pytest.skip("Redis not available")
+
+    yield client
+
+    async for key in client._client.scan_iter(match=f"{client.prefix}:*"):
+        await client._client.delete(key)
+    await client.disconnect()
+
+
+class TestJobListing:
+    """Cursor pagination over the sorted-set indexes."""
+
+    async def test_pages_cover_owner_jobs_newest_first(self, client):
+        created = []
+        for i in range(250):
+            job_id = f"j_{i:04d}"
+            await client.create_job(job_id, {"owner_token": "alice" if i % 2 else "bob"})
+            created.append(job_id)
+
+        seen = []
+        cursor = None
+        while True:
+            jobs, total, cursor = await client.list_jobs(owner="alice", limit=100, cursor=cursor)
+            seen.extend(job["job_id"] for job in jobs)
+            if cursor is None:
+                break
+
+        alice = [job_id for i, job_id in enumerate(created) if i % 2]
+        assert total == len(alice)
+        assert seen == list(reversed(alice))
+
+    async def test_status_filter_follows_transitions(self, client):
+        for i in range(10):
+            await client.create_job(f"j_{i}", {"owner_token": "alice"})
+        await client.update_job_status("j_3", "running")
+        await client.finish_job("j_3", "succeeded", {"type": "done"}, progress=1.0)
+        await client.update_job_status("j_7", "failed")
+
+        succeeded, total, _ = await client.list_jobs(owner="alice", status="succeeded")
+        queued, queued_total, _ = await client.list_jobs(status="queued")
+
+        assert [job["job_id"] for job in succeeded] == ["j_3"] and total == 1
+        assert queued_total == 8
+        assert {job["job_id"] for job in queued} == {f"j_{i}" for i in range(10)} - {"j_3", "j_7"}
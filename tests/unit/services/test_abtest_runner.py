@@ -0,0 +1,140 @@
+"""
+Unit tests for asynchronous A/B test orchestration.
+"""
+
+import asyncio
+
+import pytest
+
+from apps.api.models.jobs import JobCreateResponse
+from apps.api.models.requests import ABTestRequest
+from apps.api.services import abtest_runner as runner_module
+from apps.api.services.abtest_runner import ABTestRunner
+from apps.api.services.job_events import JobEventHub
+from apps.api.services.redis_client import RedisClient
+
+
+def make_request() -> ABTestRequest:
+    return ABTestRequest(
+        base_prompt="A lake",
+        variants=[
+            {"name": "fast", "request": {"prompt": "A lake", "steps": 15}},
+            {"name": "quality", "request": {"prompt": "A lake", "steps": 40}},
+        ]
+    )
+
+
+def finished_job(job_id: str, status: str = "succeeded") -> dict:
+    return {
+        "job_id": job_id,
+        "status": status,
+        "started_at": "2026-01-01T00:00:00+00:00",
+        "finished_at": "2026-01-01T00:00:08+00:00",
+        "result": {"artifacts": [{"url": f"http://minio/{job_id}.png"}]},
+    }
+
+
+@pytest.fixture
+def runner(monkeypatch):
+    """ABTestRunner over in-memory tests and jobs."""
+    client = RedisClient(url="redis://unused", prefix="t")
+    tests, jobs, submitted = {}, {}, []
+
+    async def submit_jobs(items, token="anonymous"):
+        submitted.append(items)
+        results = []
+        for i, _ in enumerate(items):
+            job_id = f"j_{i}"
+            jobs[job_id] = {"job_id": job_id, "status": "queued"}
+            results.append(JobCreateResponse(
+                job_id=job_id, status="queued", queued_at="2026-01-01T00:00:00Z", location=""
+            ))
+        return results
+
+    async def create_abtest(test_id, definition):
+        tests[test_id] = {**definition, "results": {}}
+
+    async def record_abtest_variants(test_id, results):
+        tests[test_id]["results"].update(results)
+
+    async def get_abtest(test_id):
+        test = tests.get(test_id)
+        return {**test, "results": dict(test["results"])} if test else None
+
+    async def get_job(job_id):
+        return jobs.get(job_id)
+
+    async def get_jobs_many(job_ids):
+        return {job_id: jobs.get(job_id) for job_id in job_ids}
+
+    monkeypatch.setattr(runner_module.job_queue, "submit_jobs", submit_jobs)
+    for name, fake in [
+        ("create_abtest", create_abtest),
+        ("record_abtest_variants", record_abtest_variants),
+        ("get_abtest", get_abtest),
+        ("get_job", get_job),
+        ("get_jobs_many", get_jobs_many),
+    ]:
+        monkeypatch.setattr(client, name, fake)
+
+    runner = ABTestRunner(client, JobEventHub(client), follow_timeout=5)
+    return runner, tests, jobs, submitted
+
+
+async def test_start_returns_at_once_and_records_variants_on_done_events(runner):
+    runner, tests, jobs, submitted = runner
+
+    started = await runner.start_test(make_request())
+
+    assert len(submitted) == 1 and len(submitted[0]) == 2  # one batch
+    assert started.status == "running"
+    assert [v.status for v in started.variants] == ["queued", "queued"]
+
+    await asyncio.sleep(0)
+    jobs["j_0"] = finished_job("j_0")
+    runner.hub._dispatch("t:ws:jobs:j_0", '{"type": "done", "status": "succeeded"}')
+    await asyncio.sleep(0.01)
+
+    assert list(tests[started.test_id]["results"]) == ["fast"]  # incremental
+
+    jobs["j_1"] = finished_job("j_1", status="failed") | {"error": {"message": "OOM"}}
+    runner.hub._dispatch("t:ws:jobs:j_1", '{"type": "done", "status": "failed"}')
+    await asyncio.wait_for(asyncio.gather(*runner._tasks), timeout=1)
+
+    abtest = await runner.get_test(started.test_id)
+
+    assert abtest.status == "completed"
+    assert (abtest.completed_variants, abtest.failed_variants) == (1, 1)
+    fast, quality = abtest.variants
+    assert fast.status == "completed" and fast.generation_time == 8.0
+    assert fast.image_url == "http://minio/j_0.png" and fast.metadata.steps == 15
+    assert quality.status == "failed" and quality.error == "OOM"
+    assert runner.hub.subscriber_count == 0
+
+
+async def test_get_reconciles_variants_nobody_followed(runner):
+    runner, tests, jobs, _ = runner
+
+    started = await runner.start_test(make_request())
+    await runner.stop()  # e.g. the process that started the test went away
+
+    jobs["j_0"] = finished_job("j_0")
+    jobs["j_1"] = {"job_id": "j_1", "status": "running"}
+
+    abtest = await runner.get_test(started.test_id)
+
+    assert abtest.status == "running"
+    assert [v.status for v in abtest.variants] == ["completed", "processing"]
+    assert list(tests[started.test_id]["results"]) == ["fast"]
+    assert await runner.get_test("abtest_missing") is None
+
+
+def test_variant_names_must_be_unique():
+    with pytest.raises(ValueError):
+        ABTestRequest(
+            base_prompt="A lake",
+            variants=[
+                {"name": "a", "request": {"prompt": "A lake"}},
+                {"name": "a", "request": {"prompt": "A lake"}},
+            ]
+        )
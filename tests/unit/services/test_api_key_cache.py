@@ -0,0 +1,132 @@
+"""
+Unit tests for the in-process API key validation cache.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from apps.api.models.auth import AuthenticatedUser, UserRole
+from apps.api.services import api_key_cache as cache_module
+from apps.api.services.api_key_cache import APIKeyCache, INVALIDATION_CHANNEL
+from apps.api.services.auth_service import AuthService, APIKEY_KEY_PREFIX
+from tests.fixtures.fake_redis import FakeRedis
+
+USER = AuthenticatedUser(
+    user_id="u_1",
+    email="a@example.com",
+    role=UserRole.FREE,
+    quota_daily=10,
+    quota_concurrent=1,
+    rate_limit_per_minute=5,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = {"t": 1000.0}
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now["t"])
+    return now
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    fresh = APIKeyCache(ttl=60, max_entries=100, flush_interval=30)
+    monkeypatch.setattr("apps.api.services.auth_service.api_key_cache", fresh)
+    return fresh
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = APIKeyCache(ttl=60)
+    cache.put("h1", USER)
+
+    clock["t"] += 59
+    assert cache.get("h1") == USER
+    clock["t"] += 1
+    assert cache.get("h1") is None
+
+
+def test_entry_never_outlives_key_expiry(clock):
+    cache = APIKeyCache(ttl=60)
+    cache.put("h1", USER, key_expires_at=datetime.utcnow() + timedelta(seconds=10))
+
+    clock["t"] += 11
+    assert cache.get("h1") is None
+
+
+def test_lru_eviction():
+    cache = APIKeyCache(ttl=60, max_entries=2)
+    cache.put("h1", USER)
+    cache.put("h2", USER)
+    cache.get("h1")
+    cache.put("h3", USER)
+
+    assert cache.get("h2") is None
+    assert cache.get("h1") == USER
+    assert cache.get("h3") == USER
+
+
+def test_invalidation_message_evicts():
+    cache = APIKeyCache(ttl=60)
+    cache.put("h1", USER)
+    cache.put("h2", USER)
+
+    cache._handle_message(b"h1")
+
+    assert cache.get("h1") is None
+    assert cache.get("h2") == USER
+
+
+async def test_flush_coalesces_touches_into_one_call():
+    redis = FakeRedis()
+    cache = APIKeyCache(ttl=60)
+    cache._redis = redis
+
+    for _ in range(50):
+        cache.touch("cui:apikey:h1")
+    cache.touch("cui:apikey:h2")
+
+    assert await cache.flush() == 2
+    assert len(redis.script_calls) == 1
+    assert redis.script_calls[0][0] == ["cui:apikey:h1", "cui:apikey:h2"]
+    assert await cache.flush() == 0
+
+
+async def _seed(service: AuthService) -> str:
+    user = await service.create_user("a@example.com")
+    created = await service.create_api_key(user.user_id)
+    return created.api_key
+
+
+async def test_validate_hits_redis_once_and_defers_last_used(cache):
+    service = AuthService()
+    service.redis = redis = FakeRedis()
+    api_key = await _seed(service)
+    key_key = f"{APIKEY_KEY_PREFIX}{service.hash_api_key(api_key)}"
+
+    redis.round_trips = 0
+    first = await service.validate_api_key(api_key)
+    second = await service.validate_api_key(api_key)
+
+    assert first == second
+    assert first.email == "a@example.com"
+    # Key + user lookups for the first call only, no last_used_at write
+    assert redis.round_trips == 2
+    assert redis.data[key_key]["last_used_at"] == ""
+
+    cache._redis = redis
+    assert await cache.flush() == 1
+    assert redis.script_calls[0][0] == [key_key]
+
+
+async def test_revoke_broadcasts_invalidation(cache):
+    service = AuthService()
+    service.redis = cache._redis = redis = FakeRedis()
+    api_key = await _seed(service)
+    user = await service.validate_api_key(api_key)
+    [key_info] = await service.list_user_keys(user.user_id)
+
+    assert await service.revoke_api_key(key_info.key_id, user.user_id)
+
+    assert (INVALIDATION_CHANNEL, service.hash_api_key(api_key)) in redis.published
+    assert await service.validate_api_key(api_key) is None
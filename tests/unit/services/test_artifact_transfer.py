@@ -0,0 +1,163 @@
+"""
+Unit tests for streaming artifact transfer (ComfyUI /view -> storage).
+"""
+
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from apps.api.services.artifact_transfer import transfer_artifact, transfer_artifacts
+from apps.api.services.async_storage import AsyncStorageClient
+from apps.api.services.comfyui_client import ComfyUIClient
+
+CHUNK = 64 * 1024
+
+
+class FakeStorage:
+    """Records multipart reads the way MinIO's put_object(length=-1) does."""
+
+    def __init__(self):
+        self.parts = []
+        self.thread = None
+
+    def upload_stream(self, object_name, data, content_type, part_size):
+        self.thread = threading.current_thread()
+        while True:
+            part = data.read(part_size)
+            if not part:
+                break
+            self.parts.append(part)
+        return f"s3://test/{object_name}"
+
+
+@pytest.fixture
+async def connect():
+    """Wrap fake sync storage in a connected AsyncStorageClient."""
+    clients = []
+
+    async def _connect(storage):
+        client = AsyncStorageClient(storage=storage, max_workers=4)
+        await client.connect()
+        clients.append(client)
+        return client
+
+    yield _connect
+    for client in clients:
+        await client.disconnect()
+
+
+def make_http(total: int, status: int = 200):
+    async def body():
+        sent = 0
+        while sent < total:
+            n = min(CHUNK, total - sent)
+            sent += n
+            yield b"x" * n
+
+    def handler(request):
+        return httpx.Response(status, content=body())
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://comfy")
+
+
+async def test_streams_in_bounded_parts_off_the_loop(connect):
+    storage = FakeStorage()
+    part_size = 256 * 1024
+    total = 1_000_000
+
+    async with make_http(total) as http:
+        size = await transfer_artifact(
+            http, "/view?filename=a.png", await connect(storage), "jobs/1/image_0.png", part_size=part_size
+        )
+
+    assert size == total
+    assert sum(len(p) for p in storage.parts) == total
+    assert max(len(p) for p in storage.parts) == part_size
+    assert storage.thread is not threading.main_thread()
+
+
+async def test_empty_artifact_raises(connect):
+    storage = await connect(FakeStorage())
+    async with make_http(0) as http:
+        with pytest.raises(RuntimeError, match="0 bytes"):
+            await transfer_artifact(http, "/view", storage, "jobs/1/image_0.png")
+
+
+async def test_download_error_propagates(connect):
+    storage = await connect(FakeStorage())
+    async with make_http(10, status=404) as http:
+        with pytest.raises(httpx.HTTPStatusError):
+            await transfer_artifact(http, "/view", storage, "jobs/1/image_0.png")
+
+
+class SlowStorage(FakeStorage):
+    """Storage whose uploads take a fixed time in the worker thread."""
+
+    def upload_stream(self, object_name, data, content_type, part_size):
+        time.sleep(0.05)
+        return super().upload_stream(object_name, data, content_type, part_size)
+
+
+def make_comfyui(latency: float = 0.2):
+    """Stand-in ComfyUI /view endpoint with fixed render-to-bytes latency."""
+    async def handler(request):
+        await asyncio.sleep(latency)
+        name = request.url.params["filename"]
+        if name == "missing.png":
+            return httpx.Response(404)
+        return httpx.Response(200, content=name.encode() * 1000)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://comfy")
+
+
+async def run_batch(storage, size: int) -> float:
+    transfers = [(f"/view?filename=img_{i}.png", f"jobs/1/image_{i}.png") for i in range(size)]
+    start = time.monotonic()
+    async with make_comfyui() as http:
+        results = await transfer_artifacts(http, transfers, storage, concurrency=4)
+    assert all(isinstance(r, int) and r > 0 for r in results)
+    return time.monotonic() - start
+
+
+async def test_batch_throughput_scales_with_fan_out(connect):
+    storage = await connect(SlowStorage())
+    single = await run_batch(storage, 1)
+    batch = await run_batch(storage, 4)
+
+    # Four images transferred in parallel take about as long as one
+    assert batch < single * 2
+
+
+async def test_failed_transfer_does_not_abort_batch(connect):
+    transfers = [
+        ("/view?filename=ok.png", "jobs/1/image_0.png"),
+        ("/view?filename=missing.png", "jobs/1/image_1.png"),
+    ]
+    async with make_comfyui(latency=0) as http:
+        results = await transfer_artifacts(http, transfers, await connect(FakeStorage()))
+
+    assert results[0] == len(b"ok.png") * 1000
+    assert isinstance(results[1], httpx.HTTPStatusError)
+
+
+def test_image_urls_cover_every_output_node():
+    client = ComfyUIClient(base_url="http://comfy")
+    history = {"outputs": {
+        "9": {"images": [
+            {"filename": "a_00001_.png", "subfolder": "", "type": "output"},
+            {"filename": "a_00002_.png", "subfolder": "", "type": "output"},
+        ]},
+        "12": {"images": [{"filename": "b 1.png", "subfolder": "up", "type": "output"}]},
+        "20": {"images": [{"filename": "preview.png", "subfolder": "", "type": "temp"}]},
+    }}
+
+    urls = client.get_image_urls("p1", history)
+
+    assert urls == [
+        "http://comfy/view?filename=a_00001_.png&type=output",
+        "http://comfy/view?filename=a_00002_.png&type=output",
+        "http://comfy/view?filename=b%201.png&type=output&subfolder=up",
+    ]
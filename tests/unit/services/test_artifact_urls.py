@@ -0,0 +1,107 @@
+"""
+Unit tests for lazy artifact URL signing.
+"""
+
+from datetime import timedelta
+
+import pytest
+
+from apps.api.services import artifact_urls
+from apps.api.services.artifact_urls import ArtifactURLService
+
+
+class FakeSigner:
+    """AsyncStorageClient stand-in producing deterministic URLs."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def get_presigned_url(self, object_name, expires=timedelta(hours=1), request_date=None):
+        self.calls.append((object_name, expires, request_date))
+        return f"https://s3/{object_name}?date={int(request_date.timestamp())}&expires={int(expires.total_seconds())}"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = {"t": 1_000_000.0}
+    monkeypatch.setattr(artifact_urls.time, "time", lambda: now["t"])
+    return now
+
+
+async def test_signs_once_per_bucket(clock):
+    signer = FakeSigner()
+    service = ArtifactURLService(signer, ttl=3600, resign_interval=900)
+
+    first = await service.get_url("jobs/1/image_0.png")
+    clock["t"] += 60
+    second = await service.get_url("jobs/1/image_0.png")
+
+    assert first == second
+    assert len(signer.calls) == 1
+    # Signed at the bucket start, so the URL is still valid for >= ttl - interval
+    _, expires, request_date = signer.calls[0]
+    assert request_date.timestamp() == 1_000_000 - 1_000_000 % 900
+    assert request_date.timestamp() + expires.total_seconds() - clock["t"] >= 3600 - 900
+
+
+async def test_resigns_when_bucket_rolls_over(clock):
+    signer = FakeSigner()
+    service = ArtifactURLService(signer, ttl=3600, resign_interval=900)
+
+    first = await service.get_url("jobs/1/image_0.png")
+    clock["t"] += 900
+    second = await service.get_url("jobs/1/image_0.png")
+
+    assert first != second
+    assert len(signer.calls) == 2
+
+
+async def test_lru_eviction(clock):
+    signer = FakeSigner()
+    service = ArtifactURLService(signer, ttl=3600, resign_interval=900, max_entries=2)
+
+    await service.get_url("a")
+    await service.get_url("b")
+    await service.get_url("a")  # a is now most recent
+    await service.get_url("c")  # evicts b
+    await service.get_url("a")
+    await service.get_url("b")
+
+    assert [call[0] for call in signer.calls] == ["a", "b", "c", "b"]
+
+
+async def test_sign_result_fills_urls_and_keeps_legacy_artifacts(clock):
+    service = ArtifactURLService(FakeSigner(), ttl=3600, resign_interval=900)
+    result = {
+        "artifacts": [
+            {"object_key": "jobs/1/image_0.png", "seed": 1},
+            {"url": "https://legacy/image.png", "seed": 2},
+        ],
+        "generation_time": 3.0,
+    }
+
+    signed = await service.sign_result(result)
+
+    assert signed["artifacts"][0]["url"].startswith("https://s3/jobs/1/image_0.png")
+    assert signed["artifacts"][1] == {"url": "https://legacy/image.png", "seed": 2}
+    assert "url" not in result["artifacts"][0]  # stored result not mutated
+    assert signed["generation_time"] == 3.0
+
+
+async def test_signing_failure_leaves_url_unset(clock):
+    class DisconnectedStorage:
+        async def get_presigned_url(self, object_name, expires=timedelta(hours=1), request_date=None):
+            raise RuntimeError("AsyncStorageClient not connected")
+
+    service = ArtifactURLService(DisconnectedStorage(), ttl=3600, resign_interval=900)
+
+    signed = await service.sign_result({"artifacts": [{"object_key": "jobs/1/image_0.png", "seed": 1}]})
+    event = await service.sign_event({"type": "artifact", "object_key": "jobs/1/image_0.png"})
+
+    assert signed["artifacts"] == [{"object_key": "jobs/1/image_0.png", "seed": 1}]
+    assert "url" not in event
+
+
+def test_resign_interval_must_be_below_ttl():
+    with pytest.raises(ValueError):
+        ArtifactURLService(FakeSigner(), ttl=600, resign_interval=600)
@@ -0,0 +1,90 @@
+"""
+Unit tests for the non-blocking storage facade.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+
+from apps.api.services.async_storage import AsyncStorageClient
+
+
+class BlockingStorage:
+    """Sync storage stand-in whose calls block like the MinIO SDK."""
+
+    def __init__(self, delay: float = 0.1):
+        self.delay = delay
+        self.threads = set()
+        self.objects = {}
+
+    def upload_bytes(self, object_name, data, content_type="application/octet-stream"):
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        self.objects[object_name] = data
+        return f"s3://test/{object_name}"
+
+    def object_exists(self, object_name):
+        if object_name == "boom":
+            raise OSError("connection reset")
+        return object_name in self.objects
+
+
+async def test_calls_run_off_the_event_loop():
+    storage = BlockingStorage(delay=0.2)
+    client = AsyncStorageClient(storage=storage, max_workers=2)
+    await client.connect()
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    uri = await client.upload_bytes("a.png", b"x")
+    task.cancel()
+    await client.disconnect()
+
+    assert uri == "s3://test/a.png"
+    assert ticks >= 10  # loop kept running while the upload blocked
+    assert all(name.startswith("storage") for name in storage.threads)
+
+
+async def test_concurrency_is_bounded_by_max_workers():
+    client = AsyncStorageClient(storage=BlockingStorage(delay=0.1), max_workers=2)
+    await client.connect()
+
+    start = time.monotonic()
+    await asyncio.gather(*(client.upload_bytes(f"{i}.png", b"x") for i in range(4)))
+    elapsed = time.monotonic() - start
+    await client.disconnect()
+
+    assert 0.2 <= elapsed < 0.35  # two rounds of two
+
+
+async def test_errors_propagate_and_are_recorded():
+    client = AsyncStorageClient(storage=BlockingStorage(), max_workers=1)
+    await client.connect()
+
+    def errors():
+        return REGISTRY.get_sample_value(
+            "storage_operation_duration_seconds_count", {"operation": "stat", "status": "error"}
+        ) or 0
+
+    before = errors()
+    with pytest.raises(OSError):
+        await client.object_exists("boom")
+    await client.disconnect()
+
+    assert errors() == before + 1
+
+
+async def test_requires_connect():
+    client = AsyncStorageClient(storage=BlockingStorage())
+    with pytest.raises(RuntimeError, match="not connected"):
+        await client.upload_bytes("a.png", b"x")
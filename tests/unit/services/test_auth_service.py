@@ -0,0 +1,76 @@
+"""
+Unit tests for AuthService API key indexing.
+"""
+
+import pytest
+
+from apps.api.services.api_key_cache import APIKeyCache
+from apps.api.services.auth_service import AuthService, APIKEY_ID_PREFIX, APIKEY_KEY_PREFIX
+from tests.fixtures.fake_redis import FakeRedis
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr("apps.api.services.auth_service.api_key_cache", APIKeyCache())
+    auth_service = AuthService()
+    auth_service.redis = FakeRedis()
+    return auth_service
+
+
+async def test_create_writes_index_in_one_transaction(service):
+    user = await service.create_user("a@example.com")
+    service.redis.round_trips = 0
+
+    created = await service.create_api_key(user.user_id, name="ci", expires_in_days=30)
+
+    key_hash = service.hash_api_key(created.api_key)
+    index_key = f"{APIKEY_ID_PREFIX}{created.key_id}"
+    # get_user + one MULTI for key, index, TTLs and user key set
+    assert service.redis.round_trips == 2
+    assert service.redis.data[index_key] == key_hash
+    assert service.redis.ttls[index_key] == service.redis.ttls[f"{APIKEY_KEY_PREFIX}{key_hash}"]
+
+
+async def test_list_user_keys_round_trips_are_constant(service):
+    user = await service.create_user("a@example.com")
+    for i in range(25):
+        await service.create_api_key(user.user_id, name=f"key-{i}")
+    service.redis.round_trips = 0
+
+    keys = await service.list_user_keys(user.user_id)
+
+    assert len(keys) == 25
+    assert {key.name for key in keys} == {f"key-{i}" for i in range(25)}
+    # SMEMBERS + MGET + one HGETALL pipeline
+    assert service.redis.round_trips == 3
+
+
+async def test_revoke_uses_index_and_checks_owner(service):
+    owner = await service.create_user("a@example.com")
+    other = await service.create_user("b@example.com")
+    created = await service.create_api_key(owner.user_id)
+
+    with pytest.raises(ValueError):
+        await service.revoke_api_key(created.key_id, other.user_id)
+
+    assert await service.revoke_api_key(created.key_id, owner.user_id)
+    assert await service.list_user_keys(owner.user_id) == []
+
+    key_info = await service._get_key_by_id(created.key_id)
+    assert key_info.is_active is False
+    assert await service.revoke_api_key("missing", owner.user_id) is False
+
+
+async def test_backfill_indexes_legacy_keys(service):
+    user = await service.create_user("a@example.com")
+    created = await service.create_api_key(user.user_id, expires_in_days=1)
+    index_key = f"{APIKEY_ID_PREFIX}{created.key_id}"
+
+    # Simulate a key stored before the index existed
+    del service.redis.data[index_key]
+    del service.redis.ttls[index_key]
+    assert await service.list_user_keys(user.user_id) == []
+
+    assert await service.backfill_key_id_index() == 1
+    assert service.redis.ttls[index_key] == 86400
+    assert [key.key_id for key in await service.list_user_keys(user.user_id)] == [created.key_id]
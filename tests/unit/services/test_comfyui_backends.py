@@ -0,0 +1,128 @@
+"""
+Unit tests for checkpoint-affinity scheduling across ComfyUI backends.
+
+Backends are fakes standing in for ``ComfyUIConnectionPool``: their client
+answers ``health_check()`` and ``get_queue()`` from plain attributes.
+"""
+
+import asyncio
+
+import pytest
+
+from apps.api.services.comfyui_backends import ComfyUIBackendPool, queued_checkpoint
+
+
+def queue_entry(number: int, ckpt_name: str) -> list:
+    prompt = {"4": {"class_type": "CheckpointLoaderSimple", "inputs": {"ckpt_name": ckpt_name}}}
+    return [number, f"prompt_{number}", prompt, {}, ["9"]]
+
+
+class FakeBackend:
+    """A ComfyUI backend with a scripted health and queue."""
+
+    def __init__(self, name: str, running=(), pending=(), healthy=True):
+        self.base_url = f"http://{name}:8188"
+        self.healthy = healthy
+        self.probes = 0
+        self.queue = {"queue_running": list(running), "queue_pending": list(pending)}
+
+    async def connect(self):
+        pass
+
+    async def disconnect(self):
+        pass
+
+    def get_client(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def health_check(self, attempts=5, timeout=5.0):
+        self.probes += 1
+        return self.healthy
+
+    async def get_queue(self):
+        return self.queue
+
+
+def test_queued_checkpoint_is_the_last_prompt_to_run():
+    queue = {
+        "queue_running": [queue_entry(1, "a.safetensors")],
+        "queue_pending": [queue_entry(3, "c.safetensors"), queue_entry(2, "b.safetensors")],
+    }
+
+    assert queued_checkpoint(queue) == "c.safetensors"
+    assert queued_checkpoint({"queue_running": [], "queue_pending": []}) is None
+
+
+@pytest.mark.asyncio
+async def test_routes_to_warm_backend_within_queue_gap():
+    gpu1 = FakeBackend("gpu1", running=[queue_entry(1, "sdxl.safetensors")])
+    gpu2 = FakeBackend("gpu2")
+    pool = ComfyUIBackendPool([gpu1, gpu2], max_queue_gap=1)
+    await pool.refresh()
+
+    assert pool.get_client("sdxl.safetensors") is gpu1  # warm, one deeper
+    assert pool.get_client("sdxl.safetensors") is gpu2  # two deeper: too far
+    assert pool.get_client("sd15.safetensors") is gpu2  # least loaded
+    assert pool.get_client("sdxl.safetensors") is gpu1  # gpu2 now has sd15 loaded
+
+    assert [b.load for b in pool.backends] == [3, 2]
+
+
+@pytest.mark.asyncio
+async def test_unrecorded_selection_leaves_routing_state_alone():
+    gpu1 = FakeBackend("gpu1", running=[queue_entry(1, "sdxl.safetensors")])
+    gpu2 = FakeBackend("gpu2")
+    pool = ComfyUIBackendPool([gpu1, gpu2])
+    await pool.refresh()
+
+    for _ in range(3):  # e.g. /health, /readyz, /models
+        assert pool.get_client("sd15.safetensors", record=False) is gpu2
+
+    assert [b.load for b in pool.backends] == [1, 0]
+    assert [b.checkpoint for b in pool.backends] == ["sdxl.safetensors", None]
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_backends_are_skipped_until_they_recover():
+    gpu1 = FakeBackend("gpu1", healthy=False)
+    gpu2 = FakeBackend("gpu2", pending=[queue_entry(1, "a"), queue_entry(2, "a")])
+    pool = ComfyUIBackendPool([gpu1, gpu2], failure_threshold=1)
+    await pool.refresh()
+
+    assert pool.get_client() is gpu2
+
+    gpu2.healthy = False
+    await pool.refresh()
+    assert pool.get_client() is gpu1  # none healthy: least loaded of all
+
+    gpu1.healthy = True
+    await pool.refresh()
+    assert pool.get_client("a") is gpu1  # gpu2 is warm but unhealthy
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_after_consecutive_failed_probes():
+    gpu1 = FakeBackend("gpu1")
+    pool = ComfyUIBackendPool([gpu1], refresh_interval=0.01, failure_threshold=3)
+    await pool.connect()
+    assert pool.healthy and gpu1.probes == 1  # probed once before serving
+
+    gpu1.healthy = False
+    await pool.refresh()
+    await pool.refresh()
+    assert pool.healthy  # two blips don't open the breaker
+
+    await pool.refresh()
+    assert not pool.healthy
+
+    gpu1.healthy = True
+    while not pool.healthy:  # the monitor closes it again
+        await asyncio.sleep(0.01)
+
+    await pool.disconnect()
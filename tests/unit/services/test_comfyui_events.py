@@ -0,0 +1,281 @@
+"""
+Unit tests for WebSocket-driven completion tracking.
+
+ComfyUI is stood in by an httpx MockTransport for /history and by
+feeding raw WebSocket frames straight into the listener's dispatcher.
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from apps.api.services.comfyui_client import ComfyUIClient, ComfyUIClientError
+from apps.api.services.comfyui_events import ComfyUIEventListener, parse_ws_message
+
+
+pytestmark = pytest.mark.asyncio
+
+HISTORY = {"status": {"completed": True, "status_str": "success"}, "outputs": {}}
+
+
+def frame(msg_type: str, **data) -> str:
+    return json.dumps({"type": msg_type, "data": data})
+
+
+def make_client(listener, history_calls: list) -> ComfyUIClient:
+    """ComfyUIClient whose /history returns HISTORY once prompt p1 is done."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        history_calls.append(request.url.path)
+        return httpx.Response(200, json={"p1": HISTORY})
+
+    http = httpx.AsyncClient(base_url="http://comfy", transport=httpx.MockTransport(handler))
+    return ComfyUIClient(
+        base_url="http://comfy",
+        poll_interval=0.01,
+        http_client=http,
+        events=listener
+    )
+
+
+class TestParseMessage:
+    """Normalization of raw ComfyUI frames."""
+
+    def test_progress(self):
+        event = parse_ws_message(frame("progress", prompt_id="p1", node="3", value=4, max=20))
+        assert event == {"type": "progress", "prompt_id": "p1", "node": "3", "value": 4, "max": 20}
+
+    def test_executing_none_is_completion(self):
+        assert parse_ws_message(frame("executing", prompt_id="p1", node=None))["type"] == "completed"
+        assert parse_ws_message(frame("executing", prompt_id="p1", node="8"))["type"] == "executing"
+
+    def test_execution_error(self):
+        event = parse_ws_message(frame("execution_error", prompt_id="p1", node_id="3", exception_message="OOM"))
+        assert event["type"] == "error"
+        assert event["error"] == "OOM"
+
+    def test_untracked_and_invalid(self):
+        assert parse_ws_message(frame("status", status={})) is None
+        assert parse_ws_message("not json") is None
+
+
+class TestEventListener:
+    """Dispatch of events to per-prompt watches."""
+
+    async def test_completion_resolves_watch(self):
+        listener = ComfyUIEventListener("http://comfy")
+        watch = listener.watch("p1")
+
+        listener._dispatch(frame("executing", prompt_id="p2", node=None))
+        assert watch.queue.empty()
+
+        listener._dispatch(frame("executing", prompt_id="p1", node=None))
+        assert watch.queue.get_nowait()["type"] == "completed"
+
+    async def test_completion_before_watch_is_remembered(self):
+        listener = ComfyUIEventListener("http://comfy")
+        listener._dispatch(frame("execution_error", prompt_id="p1", exception_message="boom"))
+
+        watch = listener.watch("p1")
+        assert watch.queue.get_nowait()["error"] == "boom"
+
+    async def test_progress_only_queued_when_requested(self):
+        listener = ComfyUIEventListener("http://comfy")
+        quiet = listener.watch("p1")
+        verbose = listener.watch("p2", progress=True)
+
+        listener._dispatch(frame("progress", prompt_id="p1", node="3", value=1, max=2))
+        listener._dispatch(frame("progress", prompt_id="p2", node="3", value=1, max=2))
+
+        assert quiet.queue.empty()
+        assert verbose.queue.get_nowait()["value"] == 1
+
+    async def test_disconnect_releases_watches(self):
+        listener = ComfyUIEventListener("http://comfy")
+        watch = listener.watch("p1")
+
+        listener._release_watches()
+        assert watch.queue.get_nowait()["type"] == "disconnected"
+
+
+class TestWaitForCompletion:
+    """ComfyUIClient.wait_for_completion with and without events."""
+
+    async def test_event_driven_wait_fetches_history_once(self):
+        listener = ComfyUIEventListener("http://comfy")
+        listener._connected = True
+        calls = []
+        client = make_client(listener, calls)
+
+        waiter = asyncio.create_task(client.wait_for_completion("p1", max_wait_time=5))
+        await asyncio.sleep(0.1)
+        assert calls == []  # no polling while waiting on events
+
+        listener._dispatch(frame("executing", prompt_id="p1", node=None))
+        assert await waiter == HISTORY
+        assert calls == ["/history/p1"]
+        assert client.client_id == listener.client_id
+
+    async def test_sampler_progress_forwarded_to_callback(self):
+        listener = ComfyUIEventListener("http://comfy")
+        listener._connected = True
+        client = make_client(listener, [])
+        steps = []
+
+        async def on_step(value, max_value):
+            steps.append((value, max_value))
+
+        waiter = asyncio.create_task(client.wait_for_completion(
+            "p1", max_wait_time=5, progress_callback=on_step, sampler_nodes={"3"}
+        ))
+        await asyncio.sleep(0)
+        listener._dispatch(frame("progress", prompt_id="p1", node="3", value=1, max=2))
+        listener._dispatch(frame("progress", prompt_id="p1", node="8", value=5, max=9))
+        listener._dispatch(frame("progress", prompt_id="p1", node="3", value=2, max=2))
+        listener._dispatch(frame("executing", prompt_id="p1", node=None))
+
+        assert await waiter == HISTORY
+        assert steps == [(1, 2), (2, 2)]
+
+    async def test_callback_exception_aborts_wait(self):
+        listener = ComfyUIEventListener("http://comfy")
+        listener._connected = True
+        client = make_client(listener, [])
+
+        async def on_step(value, max_value):
+            raise asyncio.CancelledError("Job cancelled by user")
+
+        waiter = asyncio.create_task(client.wait_for_completion(
+            "p1", max_wait_time=5, progress_callback=on_step
+        ))
+        await asyncio.sleep(0)
+        listener._dispatch(frame("progress", prompt_id="p1", node="3", value=1, max=2))
+
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert "p1" not in listener._watches
+
+    async def test_execution_error_raises(self):
+        listener = ComfyUIEventListener("http://comfy")
+        listener._connected = True
+        client = make_client(listener, [])
+
+        waiter = asyncio.create_task(client.wait_for_completion("p1", max_wait_time=5))
+        await asyncio.sleep(0)
+        listener._dispatch(frame("execution_error", prompt_id="p1", exception_message="OOM"))
+
+        with pytest.raises(ComfyUIClientError, match="OOM"):
+            await waiter
+
+    async def test_falls_back_to_polling_when_socket_drops(self):
+        listener = ComfyUIEventListener("http://comfy")
+        listener._connected = True
+        calls = []
+        client = make_client(listener, calls)
+
+        waiter = asyncio.create_task(client.wait_for_completion("p1", max_wait_time=5))
+        await asyncio.sleep(0)
+        listener._connected = False
+        listener._release_watches()
+
+        assert await waiter == HISTORY
+        assert calls == ["/history/p1"]
+
+
+class TestGenerateImages:
+    """ComfyUIClient.generate_images fan-out over the shared listener."""
+
+    @staticmethod
+    def make_batch_client(listener, calls: list) -> ComfyUIClient:
+        """ComfyUIClient whose prompts get IDs p0, p1, ... in submission order."""
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append((request.method, request.url.path))
+            if request.url.path == "/prompt":
+                return httpx.Response(200, json={"prompt_id": f"p{len(calls) - 1}"})
+            if request.url.path == "/queue":
+                calls[-1] = ("POST", "/queue", json.loads(request.content)["delete"])
+                return httpx.Response(200, json={})
+            prompt_id = request.url.path.rsplit("/", 1)[1]
+            return httpx.Response(200, json={prompt_id: HISTORY})
+
+        http = httpx.AsyncClient(base_url="http://comfy", transport=httpx.MockTransport(handler))
+        return ComfyUIClient(base_url="http://comfy", http_client=http, events=listener)
+
+    async def test_submits_everything_up_front_and_yields_as_finished(self):
+        from apps.api.models.requests import GenerateImageRequest
+
+        listener = ComfyUIEventListener("http://comfy")
+        listener._connected = True
+        calls = []
+        client = self.make_batch_client(listener, calls)
+        requests = [GenerateImageRequest(prompt=f"image {i}") for i in range(3)]
+
+        results = client.generate_images(requests)
+        first = asyncio.create_task(results.__anext__())
+        await asyncio.sleep(0.05)
+        assert calls == [("POST", "/prompt")] * 3  # all queued, none waited on yet
+
+        listener._dispatch(frame("executing", prompt_id="p2", node=None))
+        listener._dispatch(frame("execution_error", prompt_id="p0", exception_message="OOM"))
+        listener._dispatch(frame("executing", prompt_id="p1", node=None))
+
+        index, response = await first
+        rest = [item async for item in results]
+
+        assert (index, response.job_id, response.status) == (2, "p2", "completed")
+        assert sorted(index for index, _ in rest) == [0, 1]
+        assert dict(rest)[0].error == "Execution failed: OOM"
+        assert ("POST", "/queue") not in [call[:2] for call in calls]
+
+    async def test_closing_early_removes_unfinished_prompts(self):
+        from apps.api.models.requests import GenerateImageRequest
+
+        listener = ComfyUIEventListener("http://comfy")
+        listener._connected = True
+        calls = []
+        client = self.make_batch_client(listener, calls)
+        requests = [GenerateImageRequest(prompt=f"image {i}") for i in range(3)]
+
+        results = client.generate_images(requests)
+        waiter = asyncio.create_task(results.__anext__())
+        await asyncio.sleep(0.05)
+        listener._dispatch(frame("executing", prompt_id="p1", node=None))
+        assert (await waiter)[0] == 1
+
+        await results.aclose()
+
+        assert calls[-1] == ("POST", "/queue", ["p0", "p2"])
+        assert listener._watches == {}
+
+    async def test_cancelled_consumer_still_removes_unfinished_prompts(self):
+        from apps.api.models.requests import GenerateImageRequest
+
+        listener = ComfyUIEventListener("http://comfy")
+        listener._connected = True
+        calls = []
+        client = self.make_batch_client(listener, calls)
+        requests = [GenerateImageRequest(prompt=f"image {i}") for i in range(3)]
+
+        async def consume():
+            async for _ in client.generate_images(requests):
+                pass
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.sleep(0.05)
+        listener._dispatch(frame("executing", prompt_id="p1", node=None))
+        await asyncio.sleep(0.01)
+
+        # A cancel scope cancels again at every await while unwinding
+        consumer.cancel()
+        await asyncio.sleep(0)
+        consumer.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await consumer
+
+        for _ in range(100):
+            if calls[-1][:2] == ("POST", "/queue"):
+                break
+            await asyncio.sleep(0.01)
+        assert calls[-1] == ("POST", "/queue", ["p0", "p2"])
+        assert listener._watches == {}
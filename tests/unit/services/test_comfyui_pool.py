@@ -0,0 +1,110 @@
+"""
+Unit tests for the shared ComfyUI connection pool.
+
+Runs against a minimal keep-alive HTTP server on localhost, so no
+ComfyUI backend is required.
+"""
+
+import asyncio
+
+import pytest
+
+from apps.api.services.comfyui_pool import (
+    ComfyUIConnectionPool,
+    COMFY_HTTP_CONNECTIONS_OPENED,
+    COMFY_HTTP_REQUESTS,
+)
+
+
+pytestmark = pytest.mark.asyncio
+
+RESPONSE = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: application/json\r\n"
+    b"Content-Length: 2\r\n"
+    b"Connection: keep-alive\r\n\r\n{}"
+)
+
+
+@pytest.fixture
+async def server():
+    """Keep-alive HTTP server that answers every request with `{}`."""
+    connections = []
+
+    async def handle(reader, writer):
+        connections.append(writer)
+        while True:
+            try:
+                await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, ConnectionResetError):
+                break
+            await asyncio.sleep(0.05)
+            writer.write(RESPONSE)
+            await writer.drain()
+        writer.close()
+
+    srv = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = srv.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}", connections
+    srv.close()
+
+
+def _counter(metric, **labels) -> float:
+    if labels:
+        metric = metric.labels(**labels)
+    return metric._value.get()
+
+
+class TestConnectionPool:
+    """Connection reuse and lifecycle of the shared pool."""
+
+    async def test_sequential_requests_reuse_connection(self, server):
+        base_url, connections = server
+        pool = ComfyUIConnectionPool(base_url, http2=False, ws_enabled=False)
+        await pool.connect()
+
+        opened_before = _counter(COMFY_HTTP_CONNECTIONS_OPENED)
+        reused_before = _counter(COMFY_HTTP_REQUESTS, connection="reused")
+
+        for _ in range(5):
+            async with pool.get_client() as client:
+                response = await client.client.get("/queue")
+                assert response.status_code == 200
+
+        await pool.disconnect()
+
+        assert len(connections) == 1
+        assert _counter(COMFY_HTTP_CONNECTIONS_OPENED) - opened_before == 1
+        assert _counter(COMFY_HTTP_REQUESTS, connection="reused") - reused_before == 4
+
+    async def test_client_context_does_not_close_shared_client(self, server):
+        base_url, _ = server
+        pool = ComfyUIConnectionPool(base_url, http2=False, ws_enabled=False)
+        await pool.connect()
+
+        async with pool.get_client():
+            pass
+
+        assert not pool.http.is_closed
+        await pool.disconnect()
+        assert not pool.connected
+
+    async def test_disconnect_drains_in_flight_requests(self, server):
+        base_url, _ = server
+        pool = ComfyUIConnectionPool(base_url, http2=False, ws_enabled=False, drain_timeout=2.0)
+        await pool.connect()
+
+        request = asyncio.create_task(pool.http.get("/queue"))
+        await asyncio.sleep(0.01)
+        await pool.disconnect()
+
+        response = await request
+        assert response.status_code == 200
+
+    async def test_get_client_without_pool_owns_its_client(self):
+        pool = ComfyUIConnectionPool("http://127.0.0.1:1")
+        client = pool.get_client()
+
+        async with client:
+            assert client.client is not None
+        assert client._client is None
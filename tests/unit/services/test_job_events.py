@@ -0,0 +1,253 @@
+"""
+Unit tests for the shared job event hub.
+"""
+
+import asyncio
+
+import pytest
+
+from apps.api.services.job_events import JobEventHub, RESYNC
+from apps.api.services.redis_client import RedisClient
+
+
+class FakePubSub:
+    """Pattern subscription fed from an asyncio.Queue."""
+
+    def __init__(self, messages: asyncio.Queue):
+        self.messages = messages
+        self.patterns = []
+
+    async def psubscribe(self, pattern):
+        self.patterns.append(pattern)
+
+    async def listen(self):
+        while True:
+            yield await self.messages.get()
+
+    async def aclose(self):
+        pass
+
+
+class FakeRedis:
+    def __init__(self):
+        self.messages = asyncio.Queue()
+        self.pubsubs = []
+
+    def pubsub(self):
+        pubsub = FakePubSub(self.messages)
+        self.pubsubs.append(pubsub)
+        return pubsub
+
+
+@pytest.fixture
+def hub():
+    client = RedisClient(url="redis://unused", prefix="t")
+    client._client = FakeRedis()
+    return JobEventHub(client, queue_size=3)
+
+
+def pmessage(job_id: str, data: str) -> dict:
+    return {"type": "pmessage", "pattern": "t:ws:jobs:*", "channel": f"t:ws:jobs:{job_id}", "data": data}
+
+
+async def test_one_subscription_serves_every_socket(hub):
+    subscriptions = [hub.subscribe("j1") for _ in range(100)] + [hub.subscribe("j2")]
+    await hub.start()
+
+    hub.redis._client.messages.put_nowait(pmessage("j1", '{"type": "progress"}'))
+    results = await asyncio.wait_for(
+        asyncio.gather(*(sub.get() for sub in subscriptions[:100])), timeout=1
+    )
+    await hub.stop()
+
+    assert len(hub.redis._client.pubsubs) == 1
+    assert hub.redis._client.pubsubs[0].patterns == ["t:ws:jobs:*"]
+    assert results == ['{"type": "progress"}'] * 100
+    assert subscriptions[-1].queue.qsize() == 1  # only the stop marker
+
+
+async def test_slow_consumer_is_dropped_without_affecting_others(hub):
+    slow = hub.subscribe("j1")
+    fast = hub.subscribe("j1")
+
+    for i in range(5):
+        hub._dispatch("t:ws:jobs:j1", str(i))
+        await fast.get()
+
+    assert slow.dropped
+    assert await slow.get() is None
+    assert hub.subscriber_count == 1
+    assert not fast.dropped
+
+
+async def test_resync_after_resubscribe(hub):
+    subscription = hub.subscribe("j1")
+    hub._broadcast(RESYNC)
+
+    assert await subscription.get() is RESYNC
+
+
+async def test_unsubscribe_releases_job(hub):
+    subscription = hub.subscribe("j1")
+    hub.unsubscribe(subscription)
+    hub.unsubscribe(subscription)
+
+    hub._dispatch("t:ws:jobs:j1", "x")
+
+    assert hub.subscriber_count == 0
+    assert subscription.queue.empty()
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+        self.closed = None
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, data):
+        self.sent.append(data)
+
+    async def close(self, code=1000, reason=None):
+        if self.closed is None:
+            self.closed = code
+
+
+async def test_websocket_replays_since_offset_then_dedupes_live(monkeypatch):
+    from apps.api.routers import websocket as ws_router
+    from apps.api.services import redis_client as redis_module
+
+    client = redis_module.redis_client
+    hub = JobEventHub(client)
+    hub._task = object()  # mark running without a Redis subscription
+    monkeypatch.setattr(ws_router, "job_event_hub", hub)
+
+    async def get_job(job_id):
+        return {"job_id": job_id, "status": "running", "progress": "0.5"}
+
+    async def read_events(job_id, since="0"):
+        assert since == "5-0"
+        # Published between subscribing and the replay read
+        hub._dispatch(client._key("ws:jobs:j1"), '{"event_id": "6-0", "type": "progress", "progress": 0.6}')
+        hub._dispatch(client._key("ws:jobs:j1"), '{"event_id": "7-0", "type": "done", "status": "succeeded"}')
+        return [{"event_id": "6-0", "type": "progress", "progress": 0.6}]
+
+    monkeypatch.setattr(client, "get_job", get_job)
+    monkeypatch.setattr(client, "read_events", read_events)
+
+    socket = FakeWebSocket()
+    await asyncio.wait_for(ws_router.job_progress_websocket(socket, "j1", since="5-0"), timeout=1)
+
+    assert [(m["event_id"], m["type"]) for m in socket.sent] == [("6-0", "progress"), ("7-0", "done")]
+    assert hub.subscriber_count == 0
+
+
+async def test_websocket_rejects_bad_since(monkeypatch):
+    from apps.api.routers import websocket as ws_router
+
+    hub = JobEventHub(RedisClient(url="redis://unused"))
+    hub._task = object()
+    monkeypatch.setattr(ws_router, "job_event_hub", hub)
+
+    socket = FakeWebSocket()
+    await ws_router.job_progress_websocket(socket, "j1", since="latest")
+
+    assert socket.closed == 1008 and not socket.sent
+
+
+async def test_sse_multi_job_stream_tags_events_with_offsets(monkeypatch):
+    from apps.api.routers import events as sse_router
+    from apps.api.services import redis_client as redis_module
+
+    client = redis_module.redis_client
+    hub = JobEventHub(client)
+    hub._task = object()
+    monkeypatch.setattr(sse_router, "job_event_hub", hub)
+
+    async def get_job(job_id):
+        return {"job_id": job_id, "status": "running", "progress": "0.0"} if job_id != "gone" else None
+
+    async def last_event_id(job_id):
+        return {"j1": "5-0"}.get(job_id, "0")
+
+    monkeypatch.setattr(client, "get_job", get_job)
+    monkeypatch.setattr(client, "last_event_id", last_event_id)
+
+    response = await sse_router.stream_jobs_events(ids="j1,j2,gone,j1", last_event_id=None)
+    messages = response.body_iterator
+
+    assert await messages.__anext__() == f"retry: {sse_router.SSE_RETRY_MS}\n\n"
+    assert "event: not_found" in await messages.__anext__()
+    statuses = [await messages.__anext__(), await messages.__anext__()]
+    assert all("event: status" in m for m in statuses)
+
+    hub._dispatch(client._key("ws:jobs:j2"), '{"event_id": "6-0", "type": "done", "status": "succeeded"}')
+    hub._dispatch(client._key("ws:jobs:j1"), '{"event_id": "7-0", "type": "done", "status": "failed"}')
+    rest = [m async for m in messages]
+
+    assert rest[0].startswith("id: j1:5-0,j2:6-0\nevent: done\n")
+    assert '"job_id": "j2"' in rest[0]
+    assert rest[1].startswith("id: j1:7-0,j2:6-0\n")
+    assert hub.subscriber_count == 0
+
+
+async def test_sse_resume_after_done_returns_no_content(monkeypatch):
+    from apps.api.routers import events as sse_router
+    from apps.api.services import redis_client as redis_module
+
+    client = redis_module.redis_client
+    hub = JobEventHub(client)
+    hub._task = object()
+    monkeypatch.setattr(sse_router, "job_event_hub", hub)
+
+    async def get_job(job_id):
+        return {"job_id": job_id, "status": "succeeded", "progress": "1.0"}
+
+    async def read_events(job_id, since="0"):
+        return []
+
+    monkeypatch.setattr(client, "get_job", get_job)
+    monkeypatch.setattr(client, "read_events", read_events)
+
+    response = await sse_router.stream_job_events("j1", last_event_id="9-0")
+
+    assert response.status_code == 204
+    assert hub.subscriber_count == 0
+
+
+async def test_wait_for_change_blocks_until_status_or_progress_event(hub, monkeypatch):
+    reads = []
+
+    async def get_job(job_id):
+        reads.append(job_id)
+        return {"job_id": job_id, "status": "running", "read": len(reads)}
+
+    monkeypatch.setattr(hub.redis, "get_job", get_job)
+
+    # Status already differs from what the caller saw: no wait
+    assert (await hub.wait_for_change("j1", timeout=5, since_status="queued"))["status"] == "running"
+
+    waiter = asyncio.create_task(hub.wait_for_change("j1", timeout=5, since_status="running"))
+    await asyncio.sleep(0)
+    hub._dispatch("t:ws:jobs:j1", '{"type": "log", "message": "loading"}')
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+
+    hub._dispatch("t:ws:jobs:j1", '{"type": "progress", "progress": 0.5}')
+    job = await asyncio.wait_for(waiter, timeout=1)
+
+    assert job["read"] == 3  # re-read after the event
+    assert hub.subscriber_count == 0
+
+
+async def test_wait_for_change_times_out_with_snapshot(hub, monkeypatch):
+    async def get_job(job_id):
+        return {"job_id": job_id, "status": "queued", "progress": "0.0"}
+
+    monkeypatch.setattr(hub.redis, "get_job", get_job)
+
+    job = await hub.wait_for_change("j1", timeout=0.05, since_status="queued")
+
+    assert job["status"] == "queued"
+    assert hub.subscriber_count == 0
@@ -0,0 +1,147 @@
+"""
+Unit tests for batched job submission in JobQueueService.
+"""
+
+import pytest
+
+from apps.api.models.requests import GenerateImageRequest
+from apps.api.services import job_queue as job_queue_module
+from apps.api.services.job_queue import JobQueueService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """JobQueueService with Redis calls recorded instead of sent."""
+    calls = {"claims": [], "created": {}, "enqueued": [], "replaced": {}}
+    redis_client = job_queue_module.redis_client
+
+    taken = {"dup": "j_existing", "stale": "j_gone"}
+
+    async def claim_idempotency_many(token, claims, ttl=86400):
+        # SET NX GET: the first claim wins, later ones get its job ID
+        calls["claims"].append(claims)
+        replies = []
+        for key, job_id in claims:
+            replies.append(taken.get(key))
+            taken.setdefault(key, job_id)
+        return replies
+
+    async def get_jobs_many(job_ids):
+        return {
+            job_id: {"job_id": job_id, "status": "succeeded", "queued_at": "2026-01-01T00:00:00+00:00"}
+            for job_id in job_ids
+            if job_id != "j_gone"  # expired
+        }
+
+    async def replace_idempotency_many(token, mappings):
+        calls["replaced"].update(mappings)
+        taken.update(mappings)
+
+    async def create_jobs_many(jobs):
+        calls["created"].update(jobs)
+
+    async def enqueue_many(job_ids):
+        calls["enqueued"].append(job_ids)
+        return {}
+
+    monkeypatch.setattr(redis_client, "claim_idempotency_many", claim_idempotency_many)
+    monkeypatch.setattr(redis_client, "get_jobs_many", get_jobs_many)
+    monkeypatch.setattr(redis_client, "create_jobs_many", create_jobs_many)
+    monkeypatch.setattr(redis_client, "replace_idempotency_many", replace_idempotency_many)
+    monkeypatch.setattr(job_queue_module.settings, "job_batch_chunk_size", 2)
+
+    service = JobQueueService()
+    service._pool = object()
+    monkeypatch.setattr(service, "_enqueue_many", enqueue_many)
+    return service, calls
+
+
+async def test_submit_jobs_dedupes_and_batches_per_chunk(service):
+    service, calls = service
+    items = [
+        (GenerateImageRequest(prompt="a"), "k1"),
+        (GenerateImageRequest(prompt="b"), "k1"),   # same key, same chunk
+        (GenerateImageRequest(prompt="c"), "dup"),  # submitted earlier
+        (GenerateImageRequest(prompt="d"), "k1"),   # same key, next chunk
+        (GenerateImageRequest(prompt="e"), None),
+    ]
+
+    results = await service.submit_jobs(items, token="u1")
+
+    # Chunks of 2: one claim pipeline per chunk, enqueue only for new jobs
+    assert [len(claims) for claims in calls["claims"]] == [2, 2, 1]
+    assert [len(job_ids) for job_ids in calls["enqueued"]] == [1, 1]
+    assert list(calls["created"]) == [results[0].job_id, results[4].job_id]
+    assert calls["created"][results[0].job_id]["owner_token"] == "u1"
+
+    assert results[1].job_id == results[0].job_id and results[1].status == "queued"
+    assert results[2].job_id == "j_existing" and results[2].status == "succeeded"
+    assert results[3].job_id == results[0].job_id
+
+
+async def test_key_of_an_expired_job_is_repointed_at_its_replacement(service):
+    service, calls = service
+    items = [
+        (GenerateImageRequest(prompt="a"), "stale"),
+        (GenerateImageRequest(prompt="a"), "stale"),  # same key, same chunk
+    ]
+
+    first = await service.submit_jobs(items, token="u1")
+    retry = await service.submit_jobs(items[:1], token="u1")
+
+    replacement = first[0].job_id
+    assert replacement != "j_gone" and first[1].job_id == replacement
+    assert calls["replaced"] == {"stale": replacement}
+    assert list(calls["created"]) == [replacement]  # one replacement job
+    assert retry[0].job_id == replacement
+
+
+async def test_submit_jobs_reports_jobs_that_failed_to_enqueue(service, monkeypatch):
+    service, calls = service
+
+    rejected = []
+
+    async def failing_enqueue(job_ids):
+        rejected.append(job_ids[0])
+        return {job_ids[0]: ConnectionError("redis down")}
+
+    statuses = []
+
+    async def update_job_status(job_id, status, **kwargs):
+        statuses.append((job_id, status))
+
+    monkeypatch.setattr(service, "_enqueue_many", failing_enqueue)
+    monkeypatch.setattr(job_queue_module.redis_client, "update_job_status", update_job_status)
+
+    results = await service.submit_jobs([
+        (GenerateImageRequest(prompt="a"), None),
+        (GenerateImageRequest(prompt="b"), None),
+    ])
+
+    assert isinstance(results[0], ConnectionError)
+    assert results[1].status == "queued"
+    assert statuses == [(rejected[0], "failed")]
+
+
+async def test_enqueue_many_uses_enqueue_job_and_counts_once(monkeypatch):
+    enqueued, metrics = [], []
+
+    class FakeArq:
+        async def enqueue_job(self, function, job_id, _queue_name=None):
+            if job_id == "j_bad":
+                raise ConnectionError("redis down")
+            enqueued.append((function, job_id, _queue_name))
+
+    async def increment_metric(metric, labels=None, amount=1):
+        metrics.append((metric, labels, amount))
+
+    monkeypatch.setattr(job_queue_module.redis_client, "increment_metric", increment_metric)
+
+    service = JobQueueService()
+    service._pool = FakeArq()
+    failed = await service._enqueue_many(["j_1", "j_bad", "j_2"])
+
+    queue = job_queue_module.settings.arq_queue_name
+    assert enqueued == [("generate_task", "j_1", queue), ("generate_task", "j_2", queue)]
+    assert list(failed) == ["j_bad"]
+    assert metrics == [("jobs_total", {"status": "queued"}, 2)]
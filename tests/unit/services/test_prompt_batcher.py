@@ -0,0 +1,144 @@
+"""
+Unit tests for worker-side micro-batching of ComfyUI prompts.
+
+ComfyUI is stood in by an httpx MockTransport: /prompt records the
+workflow, /history returns one image per latent in every SaveImage node.
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from apps.api.models.requests import GenerateImageRequest
+from apps.api.services.comfyui_client import ComfyUIClient
+from apps.api.services.comfyui_events import ComfyUIEventListener
+from apps.api.services.prompt_batcher import PromptBatcher
+from apps.api.services.workflow_templates import workflow_registry
+
+
+pytestmark = pytest.mark.asyncio
+
+
+class StandInComfyUI:
+    """Records submitted workflows and answers /history for them."""
+
+    def __init__(self):
+        self.prompts = {}
+        self.deleted = []
+
+    def history(self, workflow: dict) -> dict:
+        outputs = {}
+        for node_id, node in workflow.items():
+            if node["class_type"] != "SaveImage":
+                continue
+            # SaveImage <- VAEDecode <- KSampler <- EmptyLatentImage
+            decoder = workflow[node["inputs"]["images"][0]]
+            sampler = workflow[decoder["inputs"]["samples"][0]]
+            latent = workflow[sampler["inputs"]["latent_image"][0]]
+            outputs[node_id] = {"images": [
+                {"filename": f"{node_id}_{i}.png", "subfolder": "", "type": "output"}
+                for i in range(latent["inputs"]["batch_size"])
+            ]}
+        return {"status": {"completed": True, "status_str": "success"}, "outputs": outputs}
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/prompt":
+            prompt_id = f"p{len(self.prompts) + 1}"
+            self.prompts[prompt_id] = json.loads(request.content)["prompt"]
+            return httpx.Response(200, json={"prompt_id": prompt_id})
+        if request.url.path == "/queue":
+            self.deleted += json.loads(request.content)["delete"]
+            return httpx.Response(200, json={})
+        prompt_id = request.url.path.rsplit("/", 1)[1]
+        return httpx.Response(200, json={prompt_id: self.history(self.prompts[prompt_id])})
+
+
+@pytest.fixture
+def comfy():
+    return StandInComfyUI()
+
+
+def make_batcher(comfy: StandInComfyUI, listener=None, routed=None) -> PromptBatcher:
+    http = httpx.AsyncClient(base_url="http://comfy", transport=httpx.MockTransport(comfy.handler))
+
+    def client_factory(checkpoint=None):
+        if routed is not None:
+            routed.append(checkpoint)
+        client = ComfyUIClient(base_url="http://comfy", poll_interval=0.01, http_client=http, events=listener)
+        client._workflow_template = workflow_registry.default()
+        return client
+
+    return PromptBatcher(client_factory, window=0.05, max_jobs=4)
+
+
+def image_names(result) -> list[str]:
+    return [url.split("filename=")[1].split("&")[0] for url in result.image_urls]
+
+
+async def test_compatible_jobs_share_one_prompt_and_get_their_own_images(comfy):
+    routed = []
+    batcher = make_batcher(comfy, routed=routed)
+
+    outcomes = await asyncio.gather(
+        batcher.generate(GenerateImageRequest(prompt="a cat", batch_size=1)),
+        batcher.generate(GenerateImageRequest(prompt="a cat", batch_size=2)),
+        batcher.generate(GenerateImageRequest(prompt="a dog", seed=7)),
+        batcher.generate(GenerateImageRequest(prompt="a cat", steps=50)),  # incompatible
+    )
+    results = [result for result, _ in outcomes]
+    clients = [client for _, client in outcomes]
+
+    assert len(comfy.prompts) == 2
+    # Routed once per prompt, and every job knows the client it ran on
+    assert len(routed) == 2
+    assert clients[0] is clients[1] is clients[2] is not clients[3]
+    batched = comfy.prompts["p1"]
+    # Random-seed cats share one latent batch, the seeded dog gets a branch
+    assert batched["5"]["inputs"]["batch_size"] == 3
+    assert batched["b1_3"]["inputs"]["seed"] == 7
+    assert batched["b1_6"]["inputs"]["text"] == "a dog"
+    assert "b1_4" not in batched  # one checkpoint loader
+
+    assert [image_names(r) for r in results[:3]] == [["9_0.png"], ["9_1.png", "9_2.png"], ["b1_9_0.png"]]
+    assert all(r.status == "completed" and r.job_id == "p1" for r in results[:3])
+    assert results[2].metadata.seed == 7
+    assert results[3].job_id == "p2" and image_names(results[3]) == ["9_0.png"]
+
+
+async def test_cancelled_job_leaves_the_batch_running(comfy):
+    listener = ComfyUIEventListener("http://comfy")
+    listener._connected = True
+    batcher = make_batcher(comfy, listener)
+    steps = []
+
+    async def cancel(step, total):
+        raise asyncio.CancelledError("Job cancelled by user")
+
+    async def record(step, total):
+        steps.append((step, total))
+
+    cancelled = asyncio.create_task(
+        batcher.generate(GenerateImageRequest(prompt="a cat", steps=2, seed=1), progress_callback=cancel)
+    )
+    kept = asyncio.create_task(
+        batcher.generate(GenerateImageRequest(prompt="a dog", steps=2, seed=2), progress_callback=record)
+    )
+    while not comfy.prompts:
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.01)
+
+    for node, value in [("3", 1), ("3", 2), ("b1_3", 1), ("b1_3", 2)]:
+        listener._dispatch(json.dumps({"type": "progress", "data": {
+            "prompt_id": "p1", "node": node, "value": value, "max": 2
+        }}))
+    listener._dispatch(json.dumps({"type": "executing", "data": {"prompt_id": "p1", "node": None}}))
+
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+    result, _ = await asyncio.wait_for(kept, timeout=1)
+
+    assert steps == [(1, 4), (2, 4), (3, 4), (4, 4)]  # progress across both branches
+    assert image_names(result) == ["b1_9_0.png"]
+    assert comfy.deleted == []
@@ -0,0 +1,112 @@
+"""
+Unit tests for RateLimiter paths that don't reach Redis.
+"""
+
+import pytest
+
+from apps.api.config import settings
+from apps.api.services.rate_limiter import RateLimiter, get_role_burst
+
+
+class FailingRedis:
+    """Redis stand-in whose scripts always fail."""
+
+    def __init__(self):
+        self.registered = 0
+
+    def register_script(self, script):
+        self.registered += 1
+
+        async def run(keys=None, args=None):
+            raise ConnectionError("redis down")
+
+        return run
+
+
+@pytest.fixture(autouse=True)
+def enabled(monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_enabled", True)
+
+
+async def test_unlimited_roles_skip_redis():
+    redis = FailingRedis()
+    limiter = RateLimiter(redis_conn=redis)
+
+    info = await limiter.check_rate_limit("u", limit=-1, burst=get_role_burst("internal"))
+
+    assert info.allowed
+    assert redis.registered == 0
+
+
+async def test_fails_open_and_registers_script_once():
+    redis = FailingRedis()
+    limiter = RateLimiter(redis_conn=redis)
+
+    for _ in range(3):
+        info = await limiter.check_rate_limit("u", limit=5, burst=10)
+        assert info.allowed
+
+    assert redis.registered == 1
+
+
+def test_role_bursts_come_from_role_quotas():
+    assert get_role_burst("free") == 10
+    assert get_role_burst("pro") == 40
+    assert get_role_burst("unknown") is None
+
+
+async def test_batch_requests_take_one_token_per_job():
+    calls = []
+
+    class RecordingRedis:
+        def register_script(self, script):
+            async def run(keys=None, args=None):
+                calls.append(args)
+                capacity, _, requested = args
+                allowed = int(requested <= capacity)
+                return [allowed, capacity - requested if allowed else capacity, "0" if allowed else "60", "0"]
+            return run
+
+    limiter = RateLimiter(redis_conn=RecordingRedis())
+
+    allowed = await limiter.check_rate_limit("u", limit=5, burst=10, requested=10)
+    denied = await limiter.check_rate_limit("u", limit=5, burst=10, requested=11)
+
+    assert [args[2] for args in calls] == [10, 11]
+    assert allowed.allowed and allowed.remaining == 0
+    assert not denied.allowed and denied.retry_after == 60
+
+
+async def test_batch_larger_than_burst_is_rejected_up_front(monkeypatch):
+    from types import SimpleNamespace
+
+    from fastapi import HTTPException
+
+    from apps.api.models.auth import AuthenticatedUser
+    from apps.api.routers import jobs as jobs_router
+
+    charged = []
+
+    class RecordingLimiter:
+        async def check_rate_limit(self, user_id, limit, burst=None, requested=1):
+            charged.append((user_id, requested))
+            return SimpleNamespace(allowed=True)
+
+    monkeypatch.setattr(jobs_router, "get_rate_limiter", lambda: RecordingLimiter())
+    user = AuthenticatedUser(
+        user_id="u1", email="u@example.com", role="pro",
+        quota_daily=100, quota_concurrent=3, rate_limit_per_minute=20
+    )
+    http_request = SimpleNamespace(client=SimpleNamespace(host="10.0.0.1"))
+
+    with pytest.raises(HTTPException) as excinfo:
+        await jobs_router._charge_batch(user, http_request, 41)  # pro burst is 40
+    assert excinfo.value.status_code == 400
+    assert excinfo.value.detail["error"]["code"] == "BATCH_EXCEEDS_RATE_LIMIT_BURST"
+    assert "Retry-After" not in (excinfo.value.headers or {})
+
+    await jobs_router._charge_batch(user, http_request, 40)
+    await jobs_router._charge_batch(None, http_request, 10)
+
+    # The middleware already took the request's token from authenticated users
+    assert charged == [("u1", 39), ("anonymous:10.0.0.1", 10)]
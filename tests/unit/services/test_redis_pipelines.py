@@ -0,0 +1,223 @@
+"""
+Unit tests for pipelined job-state transitions in RedisClient.
+
+Pipelines are captured instead of executed, so these check which commands
+are batched into each round trip without a Redis server.
+"""
+
+import json
+
+import pytest
+import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
+
+from apps.api.services.redis_client import APPEND_EVENT_LUA, RedisClient, event_offset
+
+# Status index move queued by every transition
+INDEX_STATUS = ["ZREM"] * 5 + ["ZADD"]
+
+
+@pytest.fixture
+def captured(monkeypatch):
+    """Record each executed pipeline and reply with canned results."""
+    calls = []
+    replies = []
+
+    async def execute(self, raise_on_error=True):
+        calls.append({
+            "transaction": self.is_transaction,
+            "commands": [args for args, _ in self.command_stack],
+        })
+        return replies.pop(0) if replies else [0] * len(self.command_stack)
+
+    async def no_command(self, *args, **kwargs):
+        raise AssertionError(f"unexpected standalone command {args}")
+
+    monkeypatch.setattr(Pipeline, "execute", execute)
+    monkeypatch.setattr(redis.Redis, "execute_command", no_command)
+    return calls, replies
+
+
+@pytest.fixture
+def client():
+    client = RedisClient(url="redis://unused", prefix="t")
+    client._client = client._raw = redis.Redis()
+    return client
+
+
+async def test_start_job_is_one_transaction(client, captured):
+    calls, replies = captured
+    replies.append([1, 2, 1, {"job_id": "j1", "status": "running", "params_json": '{"prompt": "x"}'}, 1])
+
+    job, cancelled = await client.start_job("j1", {"type": "status", "status": "running"})
+
+    assert len(calls) == 1 and calls[0]["transaction"]
+    names = [cmd[0] for cmd in calls[0]["commands"]]
+    assert names == ["SADD", "HSET", "EVAL", "HGETALL", "EXISTS"] + INDEX_STATUS
+    assert calls[0]["commands"][-1][:2] == ("ZADD", "t:jobs:status:running")
+    assert job["params"] == {"prompt": "x"}
+    assert cancelled is True
+
+
+async def test_report_progress_returns_cancel_flag(client, captured):
+    calls, replies = captured
+    replies.append([0, 0, 1])
+
+    cancelled = await client.report_progress("j1", 0.5, {"type": "progress", "progress": 0.5})
+
+    assert cancelled is False
+    assert [cmd[0] for cmd in calls[0]["commands"]] == ["EXISTS", "HSET", "EVAL"]
+    assert calls[0]["commands"][1] == ("HSET", "t:jobs:j1", "progress", "0.5")
+
+
+async def test_finish_job_batches_status_event_metrics_and_unmark(client, captured):
+    calls, _ = captured
+
+    await client.finish_job(
+        "j1", "failed", {"type": "done", "status": "failed"},
+        clear_cancel=True,
+        extra_metrics=[("jobs_recovered", {"outcome": "failed"})],
+        error={"message": "boom"},
+    )
+
+    assert len(calls) == 1
+    commands = calls[0]["commands"]
+    assert [cmd[0] for cmd in commands] == ["HSET", "EVAL", "INCRBY", "INCRBY", "SREM", "DEL"] + INDEX_STATUS
+
+    hset = dict(zip(commands[0][2::2], commands[0][3::2]))
+    assert hset["status"] == "failed"
+    assert json.loads(hset["error_json"]) == {"message": "boom"}
+    assert "finished_at" in hset
+    assert commands[2][1] == "t:metrics:jobs_total{status=failed}"
+    assert commands[3][1] == "t:metrics:jobs_recovered{outcome=failed}"
+    assert commands[4] == ("SREM", "t:jobs:inprogress", "j1")
+
+
+async def test_publish_events_single_round_trip(client, captured):
+    calls, _ = captured
+
+    await client.publish_events("j1", [{"type": "artifact", "n": i} for i in range(3)])
+
+    assert len(calls) == 1
+    commands = calls[0]["commands"]
+    assert [cmd[:4] for cmd in commands] == [("EVAL", APPEND_EVENT_LUA, 1, "t:jobs:j1:events")] * 3
+    # event, stream cap, stream TTL, channel
+    assert commands[0][4:] == ('{"type": "artifact", "n": 0}', 1000, 86400, "t:ws:jobs:j1")
+
+
+async def test_read_events_replays_after_offset(client, monkeypatch):
+    ranges = []
+
+    async def xrange(name, min="-", max="+", count=None):
+        ranges.append((name, min, max))
+        return [
+            ("1700000000000-1", {"data": '{"type": "progress", "progress": 0.5}'}),
+            ("1700000000001-0", {"data": "not json"}),
+            ("1700000000002-0", {"data": '{"type": "done", "status": "succeeded"}'}),
+        ]
+
+    monkeypatch.setattr(client._client, "xrange", xrange)
+
+    events = await client.read_events("j1", since="1700000000000-0")
+
+    assert ranges == [("t:jobs:j1:events", "(1700000000000-0", "+")]
+    assert [(e["event_id"], e["type"]) for e in events] == [
+        ("1700000000000-1", "progress"),
+        ("1700000000002-0", "done"),
+    ]
+    with pytest.raises(ValueError):
+        await client.read_events("j1", since="$")
+
+
+def test_event_offsets_order_numerically():
+    assert event_offset("0") == (0, 0)
+    assert event_offset("1700000000000-10") > event_offset("1700000000000-9")
+    with pytest.raises(ValueError):
+        event_offset("1-x")
+
+
+async def test_create_job_indexes_in_one_transaction(client, captured):
+    calls, _ = captured
+
+    await client.create_job("j1", {"owner_token": "u1", "params": {"prompt": "x"}})
+
+    assert len(calls) == 1 and calls[0]["transaction"]
+    commands = calls[0]["commands"]
+    zadds = {cmd[1] for cmd in commands if cmd[0] == "ZADD"}
+    assert zadds == {"t:jobs:index", "t:jobs:owner:u1", "t:jobs:status:queued"}
+    assert ("EXPIRE", "t:jobs:owner:u1", 86400) in commands
+
+
+async def test_list_jobs_is_two_round_trips(client, captured):
+    calls, replies = captured
+    page = [(f"j{i}", 1000.0 - i) for i in range(101)]
+    replies.append([500, page])
+    replies.append([{"job_id": f"j{i}", "status": "queued"} for i in range(100)])
+
+    jobs, total, next_cursor = await client.list_jobs(owner="u1", limit=100)
+
+    assert len(calls) == 2
+    assert calls[0]["commands"][0] == ("ZCARD", "t:jobs:owner:u1")
+    assert [cmd[0] for cmd in calls[1]["commands"]] == ["HGETALL"] * 100
+    assert total == 500 and len(jobs) == 100
+    assert client._decode_cursor(next_cursor) == (901.0, "j99")
+
+
+async def test_list_jobs_status_filter_and_cursor_ties(client, captured):
+    calls, replies = captured
+    cursor = client._encode_cursor(900.0, "j_b")
+    # Members tied at the cursor score, then strictly older jobs
+    replies.append([3, ["j_a", "j_b", "j_c"], [("j_z", 899.0)], 1])
+    replies.append([{"job_id": "j_a", "status": "failed"}, {}])
+
+    jobs, total, next_cursor = await client.list_jobs(status="failed", limit=5, cursor=cursor)
+
+    commands = calls[0]["commands"]
+    assert commands[0][0] == "ZINTERSTORE"
+    assert "t:jobs:status:failed" in commands[0]
+    assert commands[-1][0] == "DEL" and commands[-1][1] == commands[0][1]
+    # j_c sorts before the cursor in descending ID order; j_z expired
+    assert [cmd[1] for cmd in calls[1]["commands"]] == ["t:jobs:j_a", "t:jobs:j_z"]
+    assert [job["job_id"] for job in jobs] == ["j_a"]
+    assert next_cursor is None
+
+
+async def test_get_jobs_many_is_one_pipeline(client, captured):
+    calls, replies = captured
+    replies.append([{"job_id": "j1", "status": "queued"}, {}])
+
+    jobs = await client.get_jobs_many(["j1", "j2", "j1"])
+
+    assert len(calls) == 1 and not calls[0]["transaction"]
+    assert calls[0]["commands"] == [("HGETALL", "t:jobs:j1"), ("HGETALL", "t:jobs:j2")]
+    assert list(jobs) == ["j1", "j2"]
+    assert jobs["j1"]["status"] == "queued" and jobs["j2"] is None
+
+
+async def test_list_jobs_rejects_bad_cursor(client, captured):
+    with pytest.raises(ValueError):
+        await client.list_jobs(cursor="not-a-cursor")
+
+
+async def test_msgpack_records_round_trip_alongside_json(captured):
+    msgpack = pytest.importorskip("msgpack")
+    calls, _ = captured
+    client = RedisClient(url="redis://unused", prefix="t", encoding="msgpack")
+    client._client = client._raw = redis.Redis()
+    params = {"prompt": "a sunset", "width": 1024, "seed": None}
+
+    await client.create_job("j1", {"owner_token": "u1", "params": params})
+
+    hset = calls[0]["commands"][0]
+    stored = dict(zip(hset[2::2], hset[3::2]))
+    assert stored["v"] == "2" and "job_id" not in stored
+    assert msgpack.unpackb(stored["params_mp"]) == params
+
+    # Raw (undecoded) replies of both encodings parse to the same shape
+    v2 = {k.encode(): v if isinstance(v, bytes) else v.encode() for k, v in stored.items()}
+    v1 = {b"job_id": b"j1", b"status": b"queued", b"params_json": json.dumps(params).encode()}
+    for raw in (v2, v1):
+        job = client._parse_job("j1", raw)
+        assert job["job_id"] == "j1"
+        assert job["status"] == "queued"
+        assert job["params"] == params
@@ -0,0 +1,124 @@
+"""
+Unit tests for the workflow template registry.
+"""
+
+import copy
+import json
+
+import pytest
+
+from apps.api.services.workflow_templates import (
+    DEFAULT_WORKFLOW,
+    WORKFLOWS_DIR,
+    WorkflowRegistry,
+    WorkflowTemplate,
+    WorkflowValidationError,
+)
+
+
+class TestBindings:
+    """Bindings are derived from the graph, not fixed node IDs."""
+
+    def test_default_graph_bindings(self):
+        template = WorkflowTemplate("built-in", DEFAULT_WORKFLOW)
+
+        assert template.bindings["prompt"] == ("6", "text")
+        assert template.bindings["negative_prompt"] == ("7", "text")
+        assert template.bindings["seed"] == ("3", "seed")
+        assert template.bindings["width"] == ("5", "width")
+        assert template.bindings["ckpt_name"] == ("4", "ckpt_name")
+        assert template.bindings["filename_prefix"] == ("9", "filename_prefix")
+        assert template.sampler_nodes == {"3"}
+
+    def test_renumbered_graph_with_lora(self):
+        graph = {
+            "10": {"class_type": "KSampler", "inputs": {
+                "seed": 0, "steps": 1, "cfg": 1.0, "sampler_name": "euler",
+                "model": ["30", 0], "positive": ["12", 0], "negative": ["11", 0],
+                "latent_image": ["13", 0]}},
+            "11": {"class_type": "CLIPTextEncode", "inputs": {"text": "", "clip": ["20", 1]}},
+            "12": {"class_type": "CLIPTextEncode", "inputs": {"text": "", "clip": ["20", 1]}},
+            "13": {"class_type": "EmptyLatentImage", "inputs": {"width": 1, "height": 1, "batch_size": 1}},
+            "20": {"class_type": "CheckpointLoaderSimple", "inputs": {"ckpt_name": "x"}},
+            "30": {"class_type": "LoraLoader", "inputs": {"model": ["20", 0], "clip": ["20", 1]}},
+        }
+        template = WorkflowTemplate("custom", graph)
+
+        assert template.bindings["prompt"] == ("12", "text")
+        assert template.bindings["negative_prompt"] == ("11", "text")
+        assert template.bindings["ckpt_name"] == ("20", "ckpt_name")
+        assert "filename_prefix" not in template.bindings
+
+
+class TestBuild:
+    """Per-request workflow construction."""
+
+    def test_build_copies_only_mutated_nodes(self):
+        pristine = copy.deepcopy(DEFAULT_WORKFLOW)
+        template = WorkflowTemplate("built-in", copy.deepcopy(DEFAULT_WORKFLOW))
+
+        workflow = template.build({"prompt": "a cat", "seed": 7})
+
+        assert workflow["6"]["inputs"]["text"] == "a cat"
+        assert workflow["3"]["inputs"]["seed"] == 7
+        assert workflow["8"] is template.graph["8"]  # untouched node shared
+        assert template.graph == pristine  # template never mutated
+
+    def test_builds_are_independent(self):
+        template = WorkflowTemplate("built-in", DEFAULT_WORKFLOW)
+
+        first = template.build({"prompt": "one"})
+        second = template.build({"prompt": "two"})
+
+        assert first["6"]["inputs"]["text"] == "one"
+        assert second["6"]["inputs"]["text"] == "two"
+
+    def test_branches_share_identical_nodes(self):
+        template = WorkflowTemplate("built-in", DEFAULT_WORKFLOW)
+
+        workflow, outputs = template.build_branches([
+            {"prompt": "one", "negative_prompt": "blurry", "seed": 1},
+            {"prompt": "two", "negative_prompt": "blurry", "seed": 2},
+        ])
+
+        # Checkpoint, negative prompt and empty latent are shared
+        assert sorted(workflow) == sorted(["3", "4", "5", "6", "7", "8", "9", "b1_3", "b1_6", "b1_8", "b1_9"])
+        assert workflow["b1_3"]["inputs"]["positive"] == ["b1_6", 0]
+        assert workflow["b1_3"]["inputs"]["negative"] == ["7", 0]
+        assert workflow["b1_3"]["inputs"]["model"] == ["4", 0]
+        assert workflow["b1_3"]["inputs"]["seed"] == 2
+        assert workflow["b1_9"]["inputs"]["images"] == ["b1_8", 0]
+        assert outputs == [["9"], ["b1_9"]]
+
+
+class TestValidation:
+    """Malformed graphs are rejected at load time."""
+
+    def test_missing_class_type(self):
+        with pytest.raises(WorkflowValidationError):
+            WorkflowTemplate("bad", {"1": {"inputs": {}}})
+
+    def test_dangling_link(self):
+        graph = {"1": {"class_type": "VAEDecode", "inputs": {"samples": ["99", 0]}}}
+        with pytest.raises(WorkflowValidationError, match="missing node 99"):
+            WorkflowTemplate("bad", graph)
+
+
+class TestRegistry:
+    """Loading templates from disk."""
+
+    def test_load_all_shipped_workflows(self):
+        registry = WorkflowRegistry(WORKFLOWS_DIR)
+        assert registry.load_all() >= 3
+
+    def test_invalid_files_are_skipped(self, tmp_path):
+        (tmp_path / "good.json").write_text(json.dumps(DEFAULT_WORKFLOW))
+        (tmp_path / "bad.json").write_text("{not json")
+
+        registry = WorkflowRegistry(str(tmp_path))
+        assert registry.load_all() == 1
+        assert registry.get(str(tmp_path / "good.json")).name == "good.json"
+
+    def test_get_missing_file_raises(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            WorkflowRegistry(str(tmp_path)).get(str(tmp_path / "nope.json"))